@@ -1,20 +1,115 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import requests
-import json
-import threading
 import time
-from datetime import datetime
-import webbrowser
-import queue
+# Taken before any other import so the startup report covers import time
+_IMPORT_STARTED = time.perf_counter()
+
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk, messagebox
+import asyncio
+import logging
+import os
+import platform
 import sys
+import threading
+
+from echovr import records
+from echovr.cache import SnapshotCache
+from echovr.core import MATCHES_URL, SUPPORTED_MODES, BrowserCore, snapshot_signature
+from echovr.deltas import DeltaEngine
+from echovr.http_client import HttpClient, HttpStatusError
+from echovr.metrics import JOIN_BUCKETS, STAGES, LatencyHistogram, MetricsRecorder, ProfileCapture, RefreshTrace
+from echovr.netcore import NetCore
+from echovr.polling import PollScheduler, parse_retry_after
+from echovr.ranking import DEFAULT_ORDER, ORDERS, Ranking, longest_increasing
+from echovr.search import SearchIndex
+from echovr.startup import StartupTimer
+
+# Base poll intervals (seconds); PollScheduler adapts them at runtime
+SERVER_POLL_INTERVAL = 30
+API_POLL_INTERVAL = 10
+# Upper bounds on a whole fetch / API check, on top of the socket timeouts
+FETCH_TIMEOUT = 15
+API_CHECK_TIMEOUT = 3
+# How often the Tk thread drains results from the network loop (ms)
+NET_PUMP_INTERVAL = 30
+
+# Period of the Tk stall watchdog (ms)
+STALL_TICK_MS = 100
+# Start loading content this long after launch even if no Expose arrived (ms)
+STARTUP_FALLBACK_MS = 500
+
+# /session poll rates offered in the live session panel (Hz)
+SESSION_RATES = (10, 20, 30, 60)
+SESSION_DEFAULT_RATE = 30
+# Arena half extents in metres: z runs goal to goal, x across
+ARENA_HALF_LENGTH = 40
+ARENA_HALF_WIDTH = 16
+SESSION_MAP_MARGIN = 20
+SESSION_DOT_RADIUS = 6
+
+# Periods the history view can summarize (days)
+HISTORY_RANGES = (7, 30, 90, 180)
+HISTORY_WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+# Latency results arriving within this window are applied together (ms)
+LATENCY_APPLY_DELAY_MS = 250
+
+OS_TYPE = platform.system()
+
+log = logging.getLogger("echovr.browser")
+
+# Height of one server card row, including its padding, when the list is virtualized
+CARD_ROW_HEIGHT = 122
+# Time the card renderer may spend per chunk before yielding to Tk (seconds)
+RENDER_FRAME_BUDGET = 0.008
+
+def count_widgets(widget):
+    """Number of live Tk widgets under (and including) widget"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+def mix_colors(low, high, t):
+    """Hex colour t of the way from low to high"""
+    t = max(0.0, min(1.0, t))
+    a = [int(low[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(high[i:i + 2], 16) for i in (1, 3, 5)]
+    return '#' + ''.join(f"{round(x + (y - x) * t):02x}" for x, y in zip(a, b))
+
+def format_duration(seconds):
+    """5400 -> '1h 30m'"""
+    minutes = int(seconds // 60)
+    return f"{minutes // 60}h {minutes % 60}m" if minutes >= 60 else f"{minutes}m"
+
+def card_players_text(server):
+    """'👥 8 players', with the measured latency once there is one"""
+    text = f"👥 {server.player_count} players"
+    if server.latency is not None:
+        # Only set once the prober, and so echovr.latency, is loaded
+        from echovr.latency import format_latency
+        text += f"  ·  📶 {format_latency(server.latency)}"
+    return text
 
 class VerticalScrolledFrame(ttk.Frame):
-    """A scrollable frame that properly handles background colors"""
+    """A scrollable frame that properly handles background colors
+    
+    In virtual mode (see enable_virtual) the interior frame is hidden and a
+    small pool of fixed-height rows is placed directly on the canvas and
+    rebound to whichever items are currently in view.
+    """
     def __init__(self, parent, bg_color='#2c3e50', *args, **kw):
         super().__init__(parent, *args, **kw)
         self.bg_color = bg_color
         
+        self.virtual = False
+        self.virtual_items = []
+        self.row_height = 0
+        self.row_padx = 0
+        self.row_pady = 0
+        self.overscan = 0
+        self.create_row = None
+        self.bind_row = None
+        self.row_pool = []
+        self.row_windows = []
+        
         self.canvas = tk.Canvas(self, 
                                bg=bg_color,
                                highlightthickness=0,
@@ -22,7 +117,7 @@ class VerticalScrolledFrame(ttk.Frame):
         self.vscrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL)
         
         self.vscrollbar.config(command=self.canvas.yview)
-        self.canvas.config(yscrollcommand=self.vscrollbar.set)
+        self.canvas.config(yscrollcommand=self._on_yscroll)
         
         self.vscrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
@@ -38,13 +133,18 @@ class VerticalScrolledFrame(ttk.Frame):
         self.canvas.bind('<Enter>', self._bind_to_mousewheel)
         self.canvas.bind('<Leave>', self._unbind_from_mousewheel)
         
-        import platform
-        self.os_type = platform.system()
-        
         self.canvas.bind('<Configure>', lambda e: self._configure_canvas(None))
         
+    def _on_yscroll(self, first, last):
+        """Forward view changes to the scrollbar and re-layout virtual rows"""
+        self.vscrollbar.set(first, last)
+        if self.virtual:
+            self._layout_virtual()
+    
     def _configure_interior(self, event):
         """Update scroll region when interior frame changes size"""
+        if self.virtual:
+            return
         if self.interior.winfo_reqwidth() != self.canvas.winfo_width():
             self.canvas.itemconfigure(self.interior_id, width=self.canvas.winfo_width())
         
@@ -54,13 +154,107 @@ class VerticalScrolledFrame(ttk.Frame):
     
     def _configure_canvas(self, event):
         """Update canvas when resized"""
+        if self.virtual:
+            self._update_virtual_scrollregion()
+            self._layout_virtual()
+            return
         if self.interior.winfo_reqwidth() != self.canvas.winfo_width():
             self.canvas.itemconfigure(self.interior_id, width=self.canvas.winfo_width())
         self.canvas.config(scrollregion=self.canvas.bbox("all"))
     
+    def enable_virtual(self, row_height, create_row, bind_row, overscan=2, padx=0, pady=0):
+        """Switch to virtual mode
+        
+        create_row(parent, item) builds an unmanaged row widget and
+        bind_row(row, item) repoints an existing row at another item.
+        Every row is assumed to be row_height pixels tall, including the
+        padx/pady gap left around it.
+        """
+        self.virtual = True
+        self.row_height = row_height
+        self.row_padx = padx
+        self.row_pady = pady
+        self.create_row = create_row
+        self.bind_row = bind_row
+        self.overscan = overscan
+        self.canvas.itemconfigure(self.interior_id, state='hidden')
+        self.canvas.yview_moveto(0)
+    
+    def disable_virtual(self):
+        """Return to the regular interior frame, dropping the row pool"""
+        for row in self.row_pool:
+            row.destroy()
+        for window_id in self.row_windows:
+            self.canvas.delete(window_id)
+        self.row_pool = []
+        self.row_windows = []
+        self.virtual_items = []
+        self.virtual = False
+        self.canvas.itemconfigure(self.interior_id, state='normal')
+        self.canvas.yview_moveto(0)
+        self.canvas.config(scrollregion=(0, 0,
+                                        self.interior.winfo_reqwidth(),
+                                        self.interior.winfo_reqheight()))
+    
+    def set_virtual_items(self, items):
+        """Replace the items shown in virtual mode"""
+        self.virtual_items = items
+        for row in self.row_pool:
+            row.virtual_index = None
+        self._update_virtual_scrollregion()
+        self._layout_virtual()
+    
+    def _update_virtual_scrollregion(self):
+        """Size the scroll region to the full virtual list"""
+        self.canvas.config(scrollregion=(0, 0,
+                                        self.canvas.winfo_width(),
+                                        len(self.virtual_items) * self.row_height))
+    
+    def _layout_virtual(self):
+        """Bind pooled rows to the items inside the visible window"""
+        item_count = len(self.virtual_items)
+        visible_rows = max(self.canvas.winfo_height(), self.row_height) // self.row_height + 1
+        pool_size = min(item_count, visible_rows + 2 * self.overscan)
+        
+        while len(self.row_pool) < pool_size:
+            row = self.create_row(self.canvas, self.virtual_items[len(self.row_pool)])
+            row.virtual_index = None
+            self.row_pool.append(row)
+            self.row_windows.append(self.canvas.create_window(0, 0,
+                                                              window=row,
+                                                              anchor=tk.NW,
+                                                              state='hidden'))
+        
+        first, _ = self.canvas.yview()
+        top_index = int(first * item_count * self.row_height) // self.row_height
+        start = max(0, min(top_index - self.overscan, item_count - pool_size))
+        width = max(self.canvas.winfo_width(), 2 * self.row_padx + 1)
+        
+        # Item i always lives in pool slot i % len(pool), so scrolling by one
+        # row only rebinds the row that wrapped around.
+        shown = set()
+        for index in range(start, start + pool_size):
+            slot = index % len(self.row_pool)
+            row = self.row_pool[slot]
+            window_id = self.row_windows[slot]
+            if row.virtual_index != index:
+                self.bind_row(row, self.virtual_items[index])
+                row.virtual_index = index
+                self.canvas.coords(window_id, self.row_padx, index * self.row_height + self.row_pady)
+            self.canvas.itemconfigure(window_id,
+                                      width=width - 2 * self.row_padx,
+                                      height=self.row_height - 2 * self.row_pady,
+                                      state='normal')
+            shown.add(slot)
+        
+        for slot, window_id in enumerate(self.row_windows):
+            if slot not in shown:
+                self.row_pool[slot].virtual_index = None
+                self.canvas.itemconfigure(window_id, state='hidden')
+    
     def _on_mousewheel(self, event):
         """Handle mousewheel scrolling"""
-        if self.os_type == "Linux":
+        if OS_TYPE == "Linux":
             if event.num == 4:
                 self.canvas.yview_scroll(-1, "units")
             elif event.num == 5:
@@ -70,7 +264,7 @@ class VerticalScrolledFrame(ttk.Frame):
     
     def _bind_to_mousewheel(self, event):
         """Bind mousewheel events"""
-        if self.os_type == "Linux":
+        if OS_TYPE == "Linux":
             self.canvas.bind_all("<Button-4>", self._on_mousewheel)
             self.canvas.bind_all("<Button-5>", self._on_mousewheel)
         else:
@@ -78,15 +272,316 @@ class VerticalScrolledFrame(ttk.Frame):
     
     def _unbind_from_mousewheel(self, event):
         """Unbind mousewheel events"""
-        if self.os_type == "Linux":
+        if OS_TYPE == "Linux":
             self.canvas.unbind_all("<Button-4>")
             self.canvas.unbind_all("<Button-5>")
         else:
             self.canvas.unbind_all("<MouseWheel>")
 
+class DrawnCard:
+    """Canvas items making up one server card in a CanvasCardList"""
+    __slots__ = ('tag', 'server', 'index', 'displayed', 'bg', 'title', 'badge', 'badge_text',
+                 'players', 'blue', 'dash', 'orange', 'button', 'button_label')
+
+    def __init__(self, tag, server):
+        self.tag = tag
+        self.server = server
+        self.index = None
+        self.displayed = {}
+
+class CanvasCardList(VerticalScrolledFrame):
+    """Server cards drawn as items on the scroll canvas instead of widgets
+    
+    Every card is about ten canvas items sharing a per-card tag, so the
+    whole list costs one widget. Mouse handling is bound once on shared
+    tags: hover recolours a single rectangle and a click is hit-tested
+    against the item under the pointer to tell Quick Join from select.
+    Right-aligned items carry the 'right' tag and follow a resize with one
+    move() call. button_text(server) gives the button's label, which the
+    browser switches between joining now and waiting for a slot.
+    """
+    CARD_HEIGHT = CARD_ROW_HEIGHT - 12
+    PADX = 10
+    PADY = 6
+    HOVER_BG = '#2d3348'
+    BUTTON_ACTIVE_BG = '#4a90e2'
+
+    def __init__(self, parent, colors, on_select, on_join, button_text=None):
+        super().__init__(parent, bg_color=colors['bg_light'])
+        self.colors = colors
+        self.on_select = on_select
+        self.on_join = on_join
+        self.button_text = button_text or (lambda server: "Quick Join →")
+        self.cards = {}
+        self.cards_by_tag = {}
+        self.card_order = []
+        self.next_tag = 0
+        self.hovered = None
+        self.width = 0
+        self.message_item = None
+        # Score parts are laid out from measured widths: items are drawn
+        # hidden, and bbox() of a hidden item is None
+        self.score_font = tkfont.Font(family='Segoe UI', size=9, weight='bold')
+        self.dash_width = tkfont.Font(family='Segoe UI', size=9).measure(" - ")
+        self.canvas.itemconfigure(self.interior_id, state='hidden')
+        
+        canvas = self.canvas
+        canvas.tag_bind('card', '<Enter>', self._on_card_enter)
+        canvas.tag_bind('card', '<Leave>', self._on_card_leave)
+        canvas.tag_bind('card', '<Button-1>', self._on_card_click)
+        canvas.tag_bind('join', '<Enter>', self._on_button_enter)
+        canvas.tag_bind('join', '<Leave>', self._on_button_leave)
+
+    def _configure_interior(self, event):
+        pass
+
+    def _configure_canvas(self, event):
+        """Stretch the cards to the new canvas width"""
+        width = max(self.canvas.winfo_width(), 2 * self.PADX + 200)
+        if width == self.width:
+            return
+        dx = width - self.width
+        self.width = width
+        self.canvas.move('right', dx, 0)
+        for card in self.cards.values():
+            x0, y0, x1, y1 = self.canvas.coords(card.bg)
+            self.canvas.coords(card.bg, x0, y0, x1 + dx, y1)
+        if self.message_item is not None:
+            self.canvas.coords(self.message_item, width / 2, 30)
+        self._update_scrollregion()
+
+    def _update_scrollregion(self):
+        self.canvas.config(scrollregion=(0, 0, self.width,
+                                         len(self.card_order) * CARD_ROW_HEIGHT))
+
+    def reconcile(self, servers):
+        """Bring the drawn cards in line with servers, keyed by server id
+        
+        A generator in the style of reconcile_server_cards. New cards are
+        drawn hidden and only shown by the final pass that moves every card
+        to its slot, so a partly finished run never shows overlapping cards.
+        """
+        if not self.width:
+            self._configure_canvas(None)
+        wanted = {}
+        for server in servers:
+            wanted.setdefault(server.id, server)
+        
+        for server_id in [sid for sid in self.card_order if sid not in wanted]:
+            card = self.cards.pop(server_id)
+            del self.cards_by_tag[card.tag]
+            if card is self.hovered:
+                self.hovered = None
+            self.canvas.delete(card.tag)
+            self.card_order.remove(server_id)
+            yield
+        
+        for server_id, server in wanted.items():
+            card = self.cards.get(server_id)
+            if card is None:
+                self.cards[server_id] = self.create_card(server)
+                self.card_order.append(server_id)
+                yield
+            elif card.server is not server:
+                self.update_card(card, server)
+                yield
+        
+        canvas = self.canvas
+        for index, server_id in enumerate(wanted):
+            card = self.cards[server_id]
+            if card.index is None:
+                canvas.move(card.tag, 0, index * CARD_ROW_HEIGHT)
+                canvas.itemconfigure(card.tag, state='normal')
+            elif card.index != index:
+                canvas.move(card.tag, 0, (index - card.index) * CARD_ROW_HEIGHT)
+            card.index = index
+        self.card_order = list(wanted)
+        self._update_scrollregion()
+
+    def create_card(self, server):
+        """Draw a hidden card at the top slot; reconcile moves it into place"""
+        tag = f"c{self.next_tag}"
+        self.next_tag += 1
+        card = DrawnCard(tag, server)
+        self.cards_by_tag[tag] = card
+        
+        canvas = self.canvas
+        colors = self.colors
+        x0 = self.PADX
+        x1 = self.width - self.PADX
+        y0 = self.PADY
+        tags = ('card', tag)
+        right = ('card', tag, 'right')
+        
+        card.bg = canvas.create_rectangle(x0, y0, x1, y0 + self.CARD_HEIGHT,
+                                          fill=colors['card_bg'], width=0,
+                                          tags=tags, state='hidden')
+        card.title = canvas.create_text(x0 + 15, y0 + 12, anchor=tk.NW,
+                                        font=('Segoe UI', 11, 'bold'),
+                                        fill=colors['text_primary'],
+                                        tags=tags, state='hidden')
+        card.badge = canvas.create_rectangle(x1 - 79, y0 + 12, x1 - 15, y0 + 30,
+                                             width=0, tags=right, state='hidden')
+        card.badge_text = canvas.create_text(x1 - 47, y0 + 21,
+                                             font=('Segoe UI', 8, 'bold'), fill='white',
+                                             tags=right, state='hidden')
+        card.players = canvas.create_text(x0 + 15, y0 + 44, anchor=tk.NW,
+                                          font=('Segoe UI', 9),
+                                          fill=colors['text_secondary'],
+                                          tags=tags, state='hidden')
+        card.orange = canvas.create_text(x1 - 15, y0 + 44, anchor=tk.NE,
+                                         fill=colors['orange_team'],
+                                         tags=right, state='hidden')
+        card.dash = canvas.create_text(x1 - 15, y0 + 44, anchor=tk.NE, text="",
+                                       font=('Segoe UI', 9),
+                                       fill=colors['text_primary'],
+                                       tags=right, state='hidden')
+        card.blue = canvas.create_text(x1 - 15, y0 + 44, anchor=tk.NE,
+                                       fill=colors['blue_team'],
+                                       tags=right, state='hidden')
+        join = ('card', tag, 'right', 'join')
+        card.button = canvas.create_rectangle(x1 - 125, y0 + 72, x1 - 15, y0 + 100,
+                                              fill=colors['accent_blue'], width=0,
+                                              tags=join, state='hidden')
+        card.button_label = canvas.create_text(x1 - 70, y0 + 86,
+                                               font=('Segoe UI', 9), fill='white',
+                                               tags=join, state='hidden')
+        
+        self.update_card(card, server)
+        return card
+
+    def update_card(self, card, server):
+        """Point a card at new server data, touching only changed items"""
+        card.server = server
+        displayed = card.displayed
+        canvas = self.canvas
+        
+        if displayed.get('title') != server.title:
+            canvas.itemconfigure(card.title, text=server.title)
+            displayed['title'] = server.title
+        
+        is_open = server.open
+        if displayed.get('open') != is_open:
+            canvas.itemconfigure(card.badge,
+                                 fill=self.colors['accent_green'] if is_open else self.colors['accent_red'])
+            canvas.itemconfigure(card.badge_text, text="OPEN" if is_open else "LOCKED")
+            displayed['open'] = is_open
+        
+        players = card_players_text(server)
+        if displayed.get('players') != players:
+            canvas.itemconfigure(card.players, text=players)
+            displayed['players'] = players
+        
+        button = self.button_text(server)
+        if displayed.get('button') != button:
+            canvas.itemconfigure(card.button_label, text=button)
+            displayed['button'] = button
+        
+        score = server.score
+        if displayed.get('score', ()) == score:
+            return
+        displayed['score'] = score
+        
+        if score is None:
+            for item in (card.blue, card.dash, card.orange):
+                canvas.itemconfigure(item, text="")
+            return
+        
+        # Right to left: orange, the dash, then blue, each butted against
+        # the left edge of the previous one
+        blue_score, orange_score = score
+        orange_text = f"{orange_score} "
+        canvas.itemconfigure(card.orange, text=orange_text,
+                             font=('Segoe UI', 9, 'bold', 'underline') if orange_score > blue_score
+                             else ('Segoe UI', 9, 'bold'))
+        canvas.itemconfigure(card.dash, text=" - ")
+        canvas.itemconfigure(card.blue, text=f" {blue_score}",
+                             font=('Segoe UI', 9, 'bold', 'underline') if blue_score > orange_score
+                             else ('Segoe UI', 9, 'bold'))
+        x, y = canvas.coords(card.orange)
+        dash_x = x - self.score_font.measure(orange_text)
+        canvas.coords(card.dash, dash_x, y)
+        canvas.coords(card.blue, dash_x - self.dash_width, y)
+
+    def show_message(self, text):
+        """Centre text over the empty list, or remove it when text is None"""
+        if text is None:
+            if self.message_item is not None:
+                self.canvas.delete(self.message_item)
+                self.message_item = None
+            return
+        if self.message_item is None:
+            self.message_item = self.canvas.create_text(self.width / 2, 30,
+                                                        font=('Segoe UI', 12),
+                                                        fill=self.colors['text_muted'])
+        self.canvas.itemconfigure(self.message_item, text=text)
+
+    def card_at_pointer(self):
+        """The card under the pointer, from the tags of the 'current' item"""
+        for tag in self.canvas.gettags('current'):
+            card = self.cards_by_tag.get(tag)
+            if card is not None:
+                return card
+        return None
+
+    def _on_card_enter(self, event):
+        card = self.card_at_pointer()
+        if card is self.hovered:
+            return
+        if self.hovered is not None:
+            self.canvas.itemconfigure(self.hovered.bg, fill=self.colors['card_bg'])
+        self.hovered = card
+        if card is not None:
+            self.canvas.itemconfigure(card.bg, fill=self.HOVER_BG)
+
+    def _on_card_leave(self, event):
+        # Moving between items of the same card leaves one and enters the
+        # next; only un-hover when the pointer is no longer over this card
+        card = self.hovered
+        if card is None:
+            return
+        x = self.canvas.canvasx(event.x)
+        y = self.canvas.canvasy(event.y)
+        if card.tag in self._tags_at(x, y):
+            return
+        self.canvas.itemconfigure(card.bg, fill=self.colors['card_bg'])
+        self.hovered = None
+
+    def _tags_at(self, x, y):
+        tags = set()
+        for item in self.canvas.find_overlapping(x, y, x, y):
+            tags.update(self.canvas.gettags(item))
+        return tags
+
+    def _on_button_enter(self, event):
+        card = self.card_at_pointer()
+        if card is not None:
+            self.canvas.itemconfigure(card.button, fill=self.BUTTON_ACTIVE_BG)
+            self.canvas.config(cursor='hand2')
+
+    def _on_button_leave(self, event):
+        card = self.card_at_pointer()
+        if card is not None:
+            self.canvas.itemconfigure(card.button, fill=self.colors['accent_blue'])
+        self.canvas.config(cursor='')
+
+    def _on_card_click(self, event):
+        card = self.card_at_pointer()
+        if card is None:
+            return
+        if 'join' in self.canvas.gettags('current'):
+            self.on_join(card.server)
+        else:
+            self.on_select(card.server)
+
 class EchoVRSpectatorGUI:
-    def __init__(self):
+    def __init__(self, autostart=True):
+        """Build the window; with autostart=False no network work is started"""
+        self.startup = StartupTimer(_IMPORT_STARTED)
+        self.startup.mark('imports')
+        self.startup_job = None
         self.root = tk.Tk()
+        self.startup.mark('tk_root')
         self.root.title("EchoVR Spectator - Server Browser")
         self.root.geometry("1400x900")
         
@@ -109,23 +604,126 @@ class EchoVRSpectatorGUI:
         
         self.root.configure(bg=self.colors['bg_dark'])
         
-        self.echo_api_ip = "127.0.0.1"
-        self.echo_api_port = 6721
-        self.api_base_url = f"http://{self.echo_api_ip}:{self.echo_api_port}"
+        self.http = HttpClient()
+        # ECHOVR_MATCHES_URL points the browser at another list, e.g. benchmarks.standin
+        self.core = BrowserCore(self.http, matches_url=os.environ.get('ECHOVR_MATCHES_URL', MATCHES_URL))
+        self.net = NetCore()
+        self.net_pump_job = None
+        
+        self.server_poller = PollScheduler(SERVER_POLL_INTERVAL,
+                                           fast=10,
+                                           idle=60,
+                                           unfocused=90,
+                                           hidden=300,
+                                           max_backoff=600)
+        self.api_poller = PollScheduler(API_POLL_INTERVAL,
+                                        unfocused=20,
+                                        hidden=60,
+                                        max_backoff=60)
+        self.server_poll_wakeup = None
+        self.api_poll_wakeup = None
+        self.last_signature = None
+        self.api_connected = None
+        self.window_state = (True, True, False)
+        self.window_state_job = None
+        
+        self.metrics = MetricsRecorder()
+        self.profiler = ProfileCapture()
+        # Click on a join button to the API's answer
+        self.join_timings = LatencyHistogram(JOIN_BUCKETS)
+        self.pending_trace = None
+        self.render_started = 0.0
+        self.stall_max = 0.0
+        self.stall_expected = None
+        self.metrics_window = None
+        self.metrics_job = None
+        self.session_window = None
+        self.session_job = None
+        self.session_stream = None
+        self.session_rate = SESSION_DEFAULT_RATE
+        self.session_recorder = None
+        self.history_window = None
 
         self.servers = []
+        self.shown_servers = []
+        self.ranking = Ranking()
+        self.deltas = DeltaEngine()
+        # Callables run with every non-empty Delta after the list is updated
+        self.delta_listeners = []
+        self.sort_order = DEFAULT_ORDER
+        self.search_index = SearchIndex()
+        self.search_query = ""
+        self.search_matches = None
+        # 'widgets' (a frame per card) or 'canvas' (cards drawn on one canvas)
+        self.card_renderer = os.environ.get('ECHOVR_CARD_RENDERER', 'widgets')
+        self.server_cards = {}
+        self.card_order = []
+        self.empty_placeholder = None
+        self.virtual_list_threshold = 100
+        self.render_steps = None
+        self.render_job = None
         self.selected_server = None
+        self.details_view = None
         self.current_session = None
         self.last_update = None
-        self.running = True
+        self.cache = SnapshotCache()
+        # Opened by history_store() on first use; sqlite3 is not imported at startup
+        self.history = None
+        self.history_lock = threading.Lock()
+        # Measures the round trip to each server's region in the background;
+        # results come back through the net pump and are applied in batches.
+        # Created by latency_prober() before the first fetched list is shown
+        self.prober = None
+        self.prober_lock = threading.Lock()
+        self.latency_job = None
+        # Servers to join as soon as a slot opens, polled by watch_task;
+        # created by watch_server() the first time one is asked for
+        self.watcher = None
+        self.watch_running = False
+        self.showing_cached = False
         
         self.create_widgets()
-        
-        self.start_background_threads()
+        self.startup.mark('widgets')
         
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.bind('<F12>', self.toggle_metrics_window)
         
         self.center_window()
+        
+        if autostart:
+            # Let the empty skeleton paint before the cached list is
+            # rendered and the network loop is started
+            self.startup_job = self.root.after(STARTUP_FALLBACK_MS, self.finish_startup)
+            self.root.bind('<Expose>', self.on_first_expose)
+
+    def on_first_expose(self, event):
+        """Queue the rest of startup behind the first paint's redraws"""
+        if event.widget is self.root:
+            self.root.unbind('<Expose>')
+            self.root.after_idle(self.finish_startup)
+
+    def finish_startup(self):
+        """Load the cached list and start networking once the window is up"""
+        if self.startup.has('first_paint'):
+            return
+        self.root.unbind('<Expose>')
+        if self.startup_job is not None:
+            self.root.after_cancel(self.startup_job)
+            self.startup_job = None
+        self.startup.mark('first_paint')
+        
+        self.load_cached_snapshot()
+        self.startup.mark('cached_list')
+        self.start_network()
+        self.startup.mark('network')
+        self.root.after_idle(self.startup_complete)
+
+    def startup_complete(self):
+        """The event loop went idle after startup: the window is interactive"""
+        self.startup.mark('interactive')
+        if os.environ.get('ECHOVR_STARTUP_REPORT'):
+            print(self.startup.report(), file=sys.stderr)
+        log.info("Startup timings\n%s", self.startup.report())
 
     def center_window(self):
         """Center the window on screen"""
@@ -196,6 +794,42 @@ class EchoVRSpectatorGUI:
                                 cursor='hand2')
         settings_btn.pack(side=tk.LEFT, padx=5)
         
+        live_btn = tk.Button(controls_frame,
+                            text="📡 Live",
+                            command=self.toggle_session_window,
+                            bg=self.colors['bg_light'],
+                            fg=self.colors['text_primary'],
+                            font=('Segoe UI', 10),
+                            relief='flat',
+                            padx=20,
+                            pady=8,
+                            cursor='hand2')
+        live_btn.pack(side=tk.LEFT, padx=5)
+        
+        history_btn = tk.Button(controls_frame,
+                               text="📈 History",
+                               command=self.toggle_history_window,
+                               bg=self.colors['bg_light'],
+                               fg=self.colors['text_primary'],
+                               font=('Segoe UI', 10),
+                               relief='flat',
+                               padx=20,
+                               pady=8,
+                               cursor='hand2')
+        history_btn.pack(side=tk.LEFT, padx=5)
+        
+        stats_btn = tk.Button(controls_frame,
+                             text="📊 Stats",
+                             command=self.toggle_metrics_window,
+                             bg=self.colors['bg_light'],
+                             fg=self.colors['text_primary'],
+                             font=('Segoe UI', 10),
+                             relief='flat',
+                             padx=20,
+                             pady=8,
+                             cursor='hand2')
+        stats_btn.pack(side=tk.LEFT, padx=5)
+        
         self.status_indicator = tk.Label(controls_frame,
                                         text="●",
                                         font=('Segoe UI', 14),
@@ -235,14 +869,74 @@ class EchoVRSpectatorGUI:
                                           bg=self.colors['bg_dark'])
         self.server_count_label.pack(side=tk.RIGHT)
         
+        # Shown while the list comes from the on-disk cache
+        self.stale_label = tk.Label(list_header,
+                                   text="",
+                                   font=('Segoe UI', 9, 'bold'),
+                                   fg=self.colors['bg_dark'],
+                                   bg=self.colors['accent_orange'],
+                                   padx=8,
+                                   pady=2)
+        
+        order_labels = {label: name for name, (label, _) in ORDERS.items()}
+        self.sort_var = tk.StringVar(value=ORDERS[self.sort_order][0])
+        sort_menu = tk.OptionMenu(list_header,
+                                  self.sort_var,
+                                  *order_labels,
+                                  command=lambda label: self.set_sort_order(order_labels[label]))
+        sort_menu.config(font=('Segoe UI', 10),
+                        bg=self.colors['bg_medium'],
+                        fg=self.colors['text_primary'],
+                        activebackground=self.colors['bg_light'],
+                        activeforeground=self.colors['text_primary'],
+                        relief=tk.FLAT,
+                        highlightthickness=0,
+                        cursor='hand2')
+        sort_menu['menu'].config(font=('Segoe UI', 10),
+                                 bg=self.colors['bg_medium'],
+                                 fg=self.colors['text_primary'],
+                                 activebackground=self.colors['accent_blue'])
+        sort_menu.pack(side=tk.RIGHT, padx=(0, 15))
+        
+        search_frame = tk.Frame(left_column, bg=self.colors['bg_dark'])
+        search_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        search_icon = tk.Label(search_frame,
+                              text="🔍",
+                              font=('Segoe UI', 11),
+                              fg=self.colors['text_secondary'],
+                              bg=self.colors['bg_dark'])
+        search_icon.pack(side=tk.LEFT, padx=(0, 8))
+        
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame,
+                                    textvariable=self.search_var,
+                                    font=('Segoe UI', 11),
+                                    bg=self.colors['card_bg'],
+                                    fg=self.colors['text_primary'],
+                                    insertbackground=self.colors['text_primary'],
+                                    relief=tk.FLAT,
+                                    highlightbackground=self.colors['border'],
+                                    highlightthickness=1)
+        self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, ipady=4)
+        self.search_entry.bind('<Escape>', lambda e: self.search_var.set(""))
+        self.search_var.trace_add('write', self.on_search_changed)
+        
         list_container = tk.Frame(left_column, 
                                  bg=self.colors['bg_light'],
                                  highlightbackground=self.colors['border'],
                                  highlightthickness=1)
         list_container.pack(fill=tk.BOTH, expand=True)
         
-        self.server_scroll_frame = VerticalScrolledFrame(list_container, 
-                                                        bg_color=self.colors['bg_light'])
+        if self.card_renderer == 'canvas':
+            self.server_scroll_frame = CanvasCardList(list_container,
+                                                      self.colors,
+                                                      on_select=self.select_server,
+                                                      on_join=self.card_action,
+                                                      button_text=self.card_button_text)
+        else:
+            self.server_scroll_frame = VerticalScrolledFrame(list_container, 
+                                                            bg_color=self.colors['bg_light'])
         self.server_scroll_frame.pack(fill=tk.BOTH, expand=True)
         
         self.server_scroll_frame.interior.update_idletasks()
@@ -269,12 +963,20 @@ class EchoVRSpectatorGUI:
                                     highlightthickness=1)
         self.details_card.pack(fill=tk.BOTH, expand=True)
         
-        empty_label = tk.Label(self.details_card,
-                              text="Select a server to view details",
-                              font=('Segoe UI', 14),
-                              fg=self.colors['text_secondary'],
-                              bg=self.colors['card_bg'])
-        empty_label.pack(expand=True)
+        self.details_placeholder = tk.Label(self.details_card,
+                                           font=('Segoe UI', 14),
+                                           fg=self.colors['text_secondary'],
+                                           bg=self.colors['card_bg'],
+                                           wraplength=320)
+        self.show_details_placeholder("Select a server to view details")
+
+    def show_details_placeholder(self, text):
+        """Hide the server details and show a single message instead"""
+        if self.details_view is not None:
+            self.details_view.pack_forget()
+        self.details_placeholder.config(text=text)
+        if not self.details_placeholder.winfo_manager():
+            self.details_placeholder.pack(expand=True)
 
     def create_footer(self, parent):
         """Create footer section"""
@@ -294,6 +996,13 @@ class EchoVRSpectatorGUI:
                                     bg=self.colors['bg_medium'])
         self.update_label.pack(side=tk.LEFT)
         
+        self.poll_label = tk.Label(left_footer,
+                                  text=f"Refresh: {SERVER_POLL_INTERVAL}s",
+                                  font=('Segoe UI', 9),
+                                  fg=self.colors['text_muted'],
+                                  bg=self.colors['bg_medium'])
+        self.poll_label.pack(side=tk.LEFT, padx=(15, 0))
+        
         right_footer = tk.Frame(footer_frame, bg=self.colors['bg_medium'])
         right_footer.pack(side=tk.RIGHT, fill=tk.Y, padx=20)
         
@@ -304,97 +1013,79 @@ class EchoVRSpectatorGUI:
                                         bg=self.colors['bg_medium'])
         self.api_status_label.pack(side=tk.RIGHT)
 
-    def create_server_card(self, server):
-        """Create a server card widget with proper team colors"""
-        card_frame = tk.Frame(self.server_scroll_frame.interior,
+    def create_server_card(self, server, parent=None):
+        """Create a server card widget with proper team colors
+        
+        Cards built for a given parent (virtual list rows) are left
+        unmanaged so the caller can place them.
+        """
+        card_frame = tk.Frame(parent or self.server_scroll_frame.interior,
                              bg=self.colors['card_bg'],
                              padx=15,
                              pady=12)
-        card_frame.pack(fill=tk.X, pady=6, padx=10)
+        if parent is None:
+            card_frame.pack(fill=tk.X, pady=6, padx=10)
         
         card_frame.server_data = server
+        card_frame.displayed = {}
         card_bg = self.colors['card_bg']
         
-        card_frame.bind("<Button-1>", lambda e, s=server: self.select_server(s))
+        select = lambda e, c=card_frame: self.select_server(c.server_data)
+        card_frame.bind("<Button-1>", select)
         
         header_frame = tk.Frame(card_frame, bg=card_bg)
         header_frame.pack(fill=tk.X, pady=(0, 8))
         
-        mode = server.get('mode', 'unknown').replace('_', ' ').title()
-        server_id = server.get('id', 'N/A').split('.')[0].upper()
-        
-        title_label = tk.Label(header_frame,
-                              text=f"{mode} - {server_id}",
-                              font=('Segoe UI', 11, 'bold'),
-                              fg=self.colors['text_primary'],
-                              bg=card_bg,
-                              cursor='hand2')
-        title_label.pack(side=tk.LEFT)
-        title_label.bind("<Button-1>", lambda e, s=server: self.select_server(s))
+        card_frame.title_label = tk.Label(header_frame,
+                                          font=('Segoe UI', 11, 'bold'),
+                                          fg=self.colors['text_primary'],
+                                          bg=card_bg,
+                                          cursor='hand2')
+        card_frame.title_label.pack(side=tk.LEFT)
         
         # Status badge
-        is_open = server.get('open', False)
-        status_text = "OPEN" if is_open else "LOCKED"
-        status_color = self.colors['accent_green'] if is_open else self.colors['accent_red']
-        
         status_badge = tk.Label(header_frame,
-                              text=status_text,
                               font=('Segoe UI', 8, 'bold'),
                               fg='white',
-                              bg=status_color,
                               padx=6,
                               pady=2)
         status_badge.pack(side=tk.RIGHT)
+        card_frame.status_badge = status_badge
         
         info_frame = tk.Frame(card_frame, bg=card_bg)
         info_frame.pack(fill=tk.X)
         
-        players = server.get('players', [])
-        player_count = len(players)
-        player_label = tk.Label(info_frame,
-                              text=f"👥 {player_count} players",
-                              font=('Segoe UI', 9),
-                              fg=self.colors['text_secondary'],
-                              bg=card_bg)
-        player_label.pack(side=tk.LEFT)
-        
-        game_state = server.get('game_state', {})
-        if game_state:
-            blue_score = game_state.get('blue_score', 0)
-            orange_score = game_state.get('orange_score', 0)
-            
-            score_frame = tk.Frame(info_frame, bg=card_bg)
-            score_frame.pack(side=tk.RIGHT)
-            
-            blue_label = tk.Label(score_frame,
-                                text=f" {blue_score}",
-                                font=('Segoe UI', 9, 'bold'),
-                                fg=self.colors['blue_team'],  # Blue color
-                                bg=card_bg)
-            blue_label.pack(side=tk.LEFT)
-            
-            separator = tk.Label(score_frame,
-                               text=" - ",
-                               font=('Segoe UI', 9),
-                               fg=self.colors['text_primary'],
-                               bg=card_bg)
-            separator.pack(side=tk.LEFT)
-            
-            orange_label = tk.Label(score_frame,
-                                  text=f"{orange_score} ",
-                                  font=('Segoe UI', 9, 'bold'),
-                                  fg=self.colors['orange_team'],  # Orange color
-                                  bg=card_bg)
-            orange_label.pack(side=tk.LEFT)
-            
-            if blue_score > orange_score:
-                blue_label.config(font=('Segoe UI', 9, 'bold', 'underline'))
-            elif orange_score > blue_score:
-                orange_label.config(font=('Segoe UI', 9, 'bold', 'underline'))
+        card_frame.player_label = tk.Label(info_frame,
+                                           font=('Segoe UI', 9),
+                                           fg=self.colors['text_secondary'],
+                                           bg=card_bg)
+        card_frame.player_label.pack(side=tk.LEFT)
+        
+        # Score widgets always exist so a server gaining a game state later
+        # only needs the frame packed, not rebuilt.
+        card_frame.score_frame = tk.Frame(info_frame, bg=card_bg)
+        
+        card_frame.blue_label = tk.Label(card_frame.score_frame,
+                                         font=('Segoe UI', 9, 'bold'),
+                                         fg=self.colors['blue_team'],  # Blue color
+                                         bg=card_bg)
+        card_frame.blue_label.pack(side=tk.LEFT)
+        
+        separator = tk.Label(card_frame.score_frame,
+                           text=" - ",
+                           font=('Segoe UI', 9),
+                           fg=self.colors['text_primary'],
+                           bg=card_bg)
+        separator.pack(side=tk.LEFT)
+        
+        card_frame.orange_label = tk.Label(card_frame.score_frame,
+                                           font=('Segoe UI', 9, 'bold'),
+                                           fg=self.colors['orange_team'],  # Orange color
+                                           bg=card_bg)
+        card_frame.orange_label.pack(side=tk.LEFT)
         
         quick_btn = tk.Button(card_frame,
-                            text="Quick Join →",
-                            command=lambda s=server: self.join_server(s),
+                            command=lambda c=card_frame: self.card_action(c.server_data),
                             bg=self.colors['accent_blue'],
                             fg='white',
                             font=('Segoe UI', 9),
@@ -405,14 +1096,17 @@ class EchoVRSpectatorGUI:
                             activebackground='#4a90e2',
                             activeforeground='white')
         quick_btn.pack(anchor=tk.E, pady=(8, 0))
+        card_frame.join_button = quick_btn
         
         for child in card_frame.winfo_children():
             if child != quick_btn:
-                child.bind("<Button-1>", lambda e, s=server: self.select_server(s))
+                child.bind("<Button-1>", select)
                 if isinstance(child, tk.Frame):
                     for grandchild in child.winfo_children():
                         if grandchild != quick_btn:
-                            grandchild.bind("<Button-1>", lambda e, s=server: self.select_server(s))
+                            grandchild.bind("<Button-1>", select)
+        for label in card_frame.score_frame.winfo_children():
+            label.bind("<Button-1>", select)
         
         def on_enter(e):
             card_frame.config(bg='#2d3348')
@@ -441,108 +1135,222 @@ class EchoVRSpectatorGUI:
         card_frame.bind("<Enter>", on_enter)
         card_frame.bind("<Leave>", on_leave)
         
-        self.server_scroll_frame.interior.update_idletasks()
-        self.server_scroll_frame.canvas.config(scrollregion=self.server_scroll_frame.canvas.bbox("all"))
+        self.update_server_card(card_frame, server)
+        
+        return card_frame
+
+    def update_server_card(self, card_frame, server):
+        """Point an existing card at new server data, touching only changed labels"""
+        card_frame.server_data = server
+        displayed = card_frame.displayed
+        
+        if displayed.get('title') != server.title:
+            card_frame.title_label.config(text=server.title)
+            displayed['title'] = server.title
+        
+        is_open = server.open
+        if displayed.get('open') != is_open:
+            card_frame.status_badge.config(
+                text="OPEN" if is_open else "LOCKED",
+                bg=self.colors['accent_green'] if is_open else self.colors['accent_red'])
+            displayed['open'] = is_open
+        
+        players = card_players_text(server)
+        if displayed.get('players') != players:
+            card_frame.player_label.config(text=players)
+            displayed['players'] = players
+        
+        button = self.card_button_text(server)
+        if displayed.get('button') != button:
+            card_frame.join_button.config(text=button)
+            displayed['button'] = button
+        
+        score = server.score
+        if displayed.get('score', ()) == score:
+            return
+        displayed['score'] = score
+        
+        if score is None:
+            card_frame.score_frame.pack_forget()
+            return
+        
+        blue_score, orange_score = score
+        card_frame.blue_label.config(text=f" {blue_score}",
+                                     font=('Segoe UI', 9, 'bold', 'underline') if blue_score > orange_score
+                                     else ('Segoe UI', 9, 'bold'))
+        card_frame.orange_label.config(text=f"{orange_score} ",
+                                       font=('Segoe UI', 9, 'bold', 'underline') if orange_score > blue_score
+                                       else ('Segoe UI', 9, 'bold'))
+        if not card_frame.score_frame.winfo_manager():
+            card_frame.score_frame.pack(side=tk.RIGHT)
 
     def select_server(self, server):
         """Handle server selection"""
         self.selected_server = server
         self.update_server_details(server)
+        self.update_window_state()
 
     def update_server_details(self, server):
-        """Update the details panel with server information"""
-        for widget in self.details_card.winfo_children():
-            widget.destroy()
+        """Show server in the details panel, reusing its widgets
+        
+        The panel skeleton is built on first use and then only re-configured;
+        player rows come from a per-team pool that grows to the largest team
+        seen and hides rows it does not need. Labels whose text or colour
+        did not change are left alone, so refreshing the selected server is
+        a handful of config calls.
+        """
+        view = self.details_view
+        if view is None:
+            view = self.details_view = self.build_server_details()
+        if self.details_placeholder.winfo_manager():
+            self.details_placeholder.pack_forget()
+        if not view.winfo_manager():
+            view.pack(fill=tk.BOTH, expand=True)
+        
+        is_open = server.open
+        self.set_detail(view.title_label, text=server.mode_title)
+        self.set_detail(view.id_label, text=f"ID: {server.short_id}")
+        self.set_detail(view.status_value,
+                        text="Open" if is_open else "Locked",
+                        fg=self.colors['accent_green'] if is_open else self.colors['accent_red'])
+        self.set_detail(view.players_value, text=f"{server.player_count}/14")
+        self.set_detail(view.player_title, text=f"Players ({server.player_count})")
+        self.set_detail(view.latency_value, text=self.describe_latency(server))
+        
+        if server.score is not None:
+            blue_score, orange_score = server.score
+            self.set_detail(view.score_value, text=f"🔵 {blue_score} - {orange_score} 🟠")
+            if not view.score_frame.winfo_manager():
+                view.score_frame.pack(fill=tk.X, pady=(0, 20), before=view.button_frame)
+        elif view.score_frame.winfo_manager():
+            view.score_frame.pack_forget()
+        
+        teams = {'blue': [], 'orange': [], '': []}
+        for player in server.players:
+            teams[player.team if player.team in ('blue', 'orange') else ''].append(player.display_name)
+        
+        shown = []
+        for team, names in teams.items():
+            section = view.sections[team]
+            rows = section.rows
+            while len(rows) < len(names):
+                row = tk.Label(section,
+                               text="",
+                               font=('Segoe UI', 9),
+                               fg=self.colors['text_primary'],
+                               bg=self.colors['card_bg'])
+                row.displayed = None
+                rows.append(row)
+            for row, name in zip(rows, names):
+                text = f"• {name}"
+                if row.displayed != text:
+                    row.config(text=text)
+                    row.displayed = text
+                if not row.winfo_manager():
+                    row.pack(anchor=tk.W, padx=10)
+            for row in rows[len(names):]:
+                if row.winfo_manager():
+                    row.pack_forget()
+            if names:
+                shown.append(section)
+        
+        # Sections only need re-packing when one appears or disappears
+        if shown != view.shown_sections:
+            for section in view.shown_sections:
+                section.pack_forget()
+            for section in shown:
+                section.pack(fill=tk.X, anchor=tk.W, pady=(0, 10))
+            view.shown_sections = shown
+        if shown:
+            view.no_players_label.pack_forget()
+        elif not view.no_players_label.winfo_manager():
+            view.no_players_label.pack(pady=20)
+
+    def set_detail(self, widget, **options):
+        """config() widget only with the options that differ from what it shows"""
+        displayed = widget.displayed
+        changed = {key: value for key, value in options.items() if displayed.get(key) != value}
+        if changed:
+            widget.config(**changed)
+            displayed.update(changed)
+
+    def build_server_details(self):
+        """Create the details panel skeleton once; update_server_details fills it"""
+        bg = self.colors['card_bg']
+        content = tk.Frame(self.details_card, bg=bg)
+        
+        def label(parent, **options):
+            widget = tk.Label(parent, bg=bg, **options)
+            widget.displayed = {}
+            return widget
+        
+        content.title_label = label(content,
+                                    font=('Segoe UI', 18, 'bold'),
+                                    fg=self.colors['text_primary'])
+        content.title_label.pack(anchor=tk.W, pady=(0, 5))
+        
+        content.id_label = label(content,
+                                 font=('Segoe UI', 11),
+                                 fg=self.colors['text_secondary'])
+        content.id_label.pack(anchor=tk.W, pady=(0, 20))
+        
+        status_frame = tk.Frame(content, bg=bg)
+        status_frame.pack(fill=tk.X, pady=(0, 15))
         
-        content = tk.Frame(self.details_card, bg=self.colors['card_bg'])
-        content.pack(fill=tk.BOTH, expand=True)
+        label(status_frame,
+              text="Status:",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_secondary']).pack(side=tk.LEFT)
         
-        mode = server.get('mode', 'unknown').replace('_', ' ').title()
-        server_id = server.get('id', 'N/A').split('.')[0].upper()
+        content.status_value = label(status_frame, font=('Segoe UI', 10, 'bold'))
+        content.status_value.pack(side=tk.RIGHT)
         
-        title_label = tk.Label(content,
-                              text=mode,
-                              font=('Segoe UI', 18, 'bold'),
-                              fg=self.colors['text_primary'],
-                              bg=self.colors['card_bg'])
-        title_label.pack(anchor=tk.W, pady=(0, 5))
+        players_frame = tk.Frame(content, bg=bg)
+        players_frame.pack(fill=tk.X, pady=(0, 15))
         
-        id_label = tk.Label(content,
-                           text=f"ID: {server_id}",
-                           font=('Segoe UI', 11),
-                           fg=self.colors['text_secondary'],
-                           bg=self.colors['card_bg'])
-        id_label.pack(anchor=tk.W, pady=(0, 20))
+        label(players_frame,
+              text="Players:",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_secondary']).pack(side=tk.LEFT)
         
-        is_open = server.get('open', False)
-        status_text = "Open" if is_open else "Locked"
-        status_color = self.colors['accent_green'] if is_open else self.colors['accent_red']
+        content.players_value = label(players_frame,
+                                      font=('Segoe UI', 10, 'bold'),
+                                      fg=self.colors['text_primary'])
+        content.players_value.pack(side=tk.RIGHT)
         
-        status_frame = tk.Frame(content, bg=self.colors['card_bg'])
-        status_frame.pack(fill=tk.X, pady=(0, 15))
+        latency_frame = tk.Frame(content, bg=bg)
+        latency_frame.pack(fill=tk.X, pady=(0, 15))
         
-        status_title = tk.Label(status_frame,
-                               text="Status:",
-                               font=('Segoe UI', 10, 'bold'),
-                               fg=self.colors['text_secondary'],
-                               bg=self.colors['card_bg'])
-        status_title.pack(side=tk.LEFT)
+        label(latency_frame,
+              text="Latency:",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_secondary']).pack(side=tk.LEFT)
         
-        status_value = tk.Label(status_frame,
-                               text=status_text,
-                               font=('Segoe UI', 10, 'bold'),
-                               fg=status_color,
-                               bg=self.colors['card_bg'])
-        status_value.pack(side=tk.RIGHT)
+        content.latency_value = label(latency_frame,
+                                      font=('Segoe UI', 10, 'bold'),
+                                      fg=self.colors['text_primary'])
+        content.latency_value.pack(side=tk.RIGHT)
         
-        players = server.get('players', [])
-        player_count = len(players)
+        # Packed only while the server reports a score
+        content.score_frame = tk.Frame(content, bg=bg)
         
-        players_frame = tk.Frame(content, bg=self.colors['card_bg'])
-        players_frame.pack(fill=tk.X, pady=(0, 15))
+        label(content.score_frame,
+              text="Score:",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_secondary']).pack(side=tk.LEFT)
         
-        players_title = tk.Label(players_frame,
-                                text="Players:",
-                                font=('Segoe UI', 10, 'bold'),
-                                fg=self.colors['text_secondary'],
-                                bg=self.colors['card_bg'])
-        players_title.pack(side=tk.LEFT)
+        content.score_value = label(content.score_frame,
+                                    font=('Segoe UI', 10, 'bold'),
+                                    fg=self.colors['text_primary'])
+        content.score_value.pack(side=tk.RIGHT)
         
-        players_value = tk.Label(players_frame,
-                                text=f"{player_count}/14",
-                                font=('Segoe UI', 10, 'bold'),
-                                fg=self.colors['text_primary'],
-                                bg=self.colors['card_bg'])
-        players_value.pack(side=tk.RIGHT)
-        
-        game_state = server.get('game_state', {})
-        if game_state:
-            blue_score = game_state.get('blue_score', 0)
-            orange_score = game_state.get('orange_score', 0)
-            
-            score_frame = tk.Frame(content, bg=self.colors['card_bg'])
-            score_frame.pack(fill=tk.X, pady=(0, 20))
-            
-            score_title = tk.Label(score_frame,
-                                  text="Score:",
-                                  font=('Segoe UI', 10, 'bold'),
-                                  fg=self.colors['text_secondary'],
-                                  bg=self.colors['card_bg'])
-            score_title.pack(side=tk.LEFT)
-            
-            score_value = tk.Label(score_frame,
-                                  text=f"🔵 {blue_score} - {orange_score} 🟠",
-                                  font=('Segoe UI', 10, 'bold'),
-                                  fg=self.colors['text_primary'],
-                                  bg=self.colors['card_bg'])
-            score_value.pack(side=tk.RIGHT)
-        
-        button_frame = tk.Frame(content, bg=self.colors['card_bg'])
-        button_frame.pack(fill=tk.X, pady=(0, 25))
-        
-        join_btn = tk.Button(button_frame,
+        content.button_frame = tk.Frame(content, bg=bg)
+        content.button_frame.pack(fill=tk.X, pady=(0, 25))
+        
+        # The buttons act on whatever is selected when they are clicked
+        join_btn = tk.Button(content.button_frame,
                            text="🚀 JOIN SERVER",
-                           command=lambda s=server: self.join_server(s),
+                           command=lambda: self.selected_server and self.join_server(self.selected_server),
                            bg=self.colors['accent_green'],
                            fg='white',
                            font=('Segoe UI', 12, 'bold'),
@@ -552,9 +1360,9 @@ class EchoVRSpectatorGUI:
                            cursor='hand2')
         join_btn.pack(fill=tk.X, pady=(0, 10))
         
-        spectate_btn = tk.Button(button_frame,
+        spectate_btn = tk.Button(content.button_frame,
                                 text="👁 SPECTATE",
-                                command=lambda s=server: self.spectate_server(s),
+                                command=lambda: self.selected_server and self.spectate_server(self.selected_server),
                                 bg=self.colors['accent_blue'],
                                 fg='white',
                                 font=('Segoe UI', 11),
@@ -564,21 +1372,19 @@ class EchoVRSpectatorGUI:
                                 cursor='hand2')
         spectate_btn.pack(fill=tk.X)
         
-        player_header = tk.Frame(content, bg=self.colors['card_bg'])
+        player_header = tk.Frame(content, bg=bg)
         player_header.pack(fill=tk.X, pady=(0, 10))
         
-        player_title = tk.Label(player_header,
-                               text=f"Players ({player_count})",
-                               font=('Segoe UI', 12, 'bold'),
-                               fg=self.colors['text_primary'],
-                               bg=self.colors['card_bg'])
-        player_title.pack(side=tk.LEFT)
+        content.player_title = label(player_header,
+                                     font=('Segoe UI', 12, 'bold'),
+                                     fg=self.colors['text_primary'])
+        content.player_title.pack(side=tk.LEFT)
         
-        player_container = tk.Frame(content, bg=self.colors['card_bg'], height=200)
+        player_container = tk.Frame(content, bg=bg, height=200)
         player_container.pack(fill=tk.BOTH, expand=True)
         
         player_canvas = tk.Canvas(player_container,
-                                 bg=self.colors['card_bg'],
+                                 bg=bg,
                                  highlightthickness=0)
         player_scrollbar = tk.Scrollbar(player_container,
                                        orient=tk.VERTICAL,
@@ -588,7 +1394,7 @@ class EchoVRSpectatorGUI:
         player_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         player_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        player_inner = tk.Frame(player_canvas, bg=self.colors['card_bg'])
+        player_inner = tk.Frame(player_canvas, bg=bg)
         player_canvas.create_window((0, 0), window=player_inner, anchor=tk.NW)
         
         def configure_scrollregion(event):
@@ -596,213 +1402,602 @@ class EchoVRSpectatorGUI:
         
         player_inner.bind("<Configure>", configure_scrollregion)
         
-        if players:
-            blue_players = [p for p in players if p.get('team') == 'blue']
-            orange_players = [p for p in players if p.get('team') == 'orange']
-            no_team = [p for p in players if p.get('team') not in ['blue', 'orange']]
-            
-            if blue_players:
-                blue_header = tk.Label(player_inner,
-                                      text="🔵 BLUE TEAM",
-                                      font=('Segoe UI', 10, 'bold'),
-                                      fg=self.colors['blue_team'],
-                                      bg=self.colors['card_bg'])
-                blue_header.pack(anchor=tk.W, pady=(0, 5))
-                
-                for player in blue_players:
-                    player_label = tk.Label(player_inner,
-                                          text=f"• {player.get('display_name', 'Unknown')}",
-                                          font=('Segoe UI', 9),
-                                          fg=self.colors['text_primary'],
-                                          bg=self.colors['card_bg'])
-                    player_label.pack(anchor=tk.W, padx=10)
-            
-            if orange_players:
-                if blue_players:
-                    tk.Frame(player_inner, height=10, bg=self.colors['card_bg']).pack()
-                
-                orange_header = tk.Label(player_inner,
-                                        text="🟠 ORANGE TEAM",
-                                        font=('Segoe UI', 10, 'bold'),
-                                        fg=self.colors['orange_team'],
-                                        bg=self.colors['card_bg'])
-                orange_header.pack(anchor=tk.W, pady=(0, 5))
-                
-                for player in orange_players:
-                    player_label = tk.Label(player_inner,
-                                          text=f"• {player.get('display_name', 'Unknown')}",
-                                          font=('Segoe UI', 9),
-                                          fg=self.colors['text_primary'],
-                                          bg=self.colors['card_bg'])
-                    player_label.pack(anchor=tk.W, padx=10)
-            
-            if no_team:
-                if blue_players or orange_players:
-                    tk.Frame(player_inner, height=10, bg=self.colors['card_bg']).pack()
-                
-                no_team_header = tk.Label(player_inner,
-                                         text="⚪ NO TEAM",
-                                         font=('Segoe UI', 10, 'bold'),
-                                         fg=self.colors['text_muted'],
-                                         bg=self.colors['card_bg'])
-                no_team_header.pack(anchor=tk.W, pady=(0, 5))
-                
-                for player in no_team:
-                    player_label = tk.Label(player_inner,
-                                          text=f"• {player.get('display_name', 'Unknown')}",
-                                          font=('Segoe UI', 9),
-                                          fg=self.colors['text_primary'],
-                                          bg=self.colors['card_bg'])
-                    player_label.pack(anchor=tk.W, padx=10)
-        else:
-            empty_label = tk.Label(player_inner,
-                                  text="No players in server",
-                                  font=('Segoe UI', 10),
-                                  fg=self.colors['text_muted'],
-                                  bg=self.colors['card_bg'])
-            empty_label.pack(pady=20)
+        content.sections = {}
+        for team, text, color in (('blue', "🔵 BLUE TEAM", self.colors['blue_team']),
+                                  ('orange', "🟠 ORANGE TEAM", self.colors['orange_team']),
+                                  ('', "⚪ NO TEAM", self.colors['text_muted'])):
+            section = tk.Frame(player_inner, bg=bg)
+            tk.Label(section,
+                     text=text,
+                     font=('Segoe UI', 10, 'bold'),
+                     fg=color,
+                     bg=bg).pack(anchor=tk.W, pady=(0, 5))
+            section.rows = []
+            content.sections[team] = section
+        content.shown_sections = []
+        
+        content.no_players_label = tk.Label(player_inner,
+                                            text="No players in server",
+                                            font=('Segoe UI', 10),
+                                            fg=self.colors['text_muted'],
+                                            bg=bg)
+        return content
 
     def refresh_servers(self):
         """Manually refresh server list"""
         self.status_label.config(text="Fetching servers...")
-        threading.Thread(target=self.fetch_servers, daemon=True).start()
+        self.net.submit(self.refresh_servers_task(), name='refresh')
 
-    def fetch_servers(self):
-        """Fetch servers from EchoVRCE API"""
+    async def refresh_servers_task(self):
+        """Fetch the server list once and hand the result to the UI"""
+        trace = RefreshTrace()
         try:
-            response = requests.get("https://g.echovrce.com/status/matches", timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                servers = data.get('labels', [])
-                
-                print(f"Raw data received. Total labels: {len(servers)}")
-                
-                filtered_servers = []
-                arena_count = 0
-                combat_count = 0
-                
-                for i, server in enumerate(servers):
-                    mode = server.get('mode', '')
-                    print(f"Server {i}: mode='{mode}', open={server.get('open', False)}, players={len(server.get('players', []))}")
-                    
-                    if mode in ['echo_arena', 'echo_combat']:
-                        filtered_servers.append(server)
-                        if mode == 'echo_arena':
-                            arena_count += 1
-                        else:
-                            combat_count += 1
-                
-                print(f"Filtered servers: {len(filtered_servers)} (Arena: {arena_count}, Combat: {combat_count})")
-                
-                self.servers = filtered_servers
-                self.last_update = datetime.now()
-                
-                self.root.after(0, self.update_server_display)
-                self.root.after(0, self.update_status, True, f"Found {len(filtered_servers)} servers")
-                
-            else:
-                print(f"API Error: {response.status_code}")
-                self.root.after(0, self.update_status, False, f"API Error: {response.status_code}")
-                
+            servers = await self.net.run_blocking(self.core.fetch_servers, trace, timeout=FETCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            log.warning("Error fetching servers: timed out")
+            trace.error = "timed out"
+            self.metrics.record(trace)
+            self.server_poller.record_failure()
+            self.net.post(self.update_status, False, "Error: timed out")
+            return
+        except HttpStatusError as e:
+            log.warning(str(e))
+            trace.error = str(e)
+            self.metrics.record(trace)
+            self.server_poller.record_failure(parse_retry_after(e.headers.get('Retry-After')))
+            self.net.post(self.update_status, False, str(e))
+            return
         except Exception as e:
-            print(f"Error fetching servers: {str(e)}")
-            self.root.after(0, self.update_status, False, f"Error: {str(e)}")
+            log.warning("Error fetching servers: %s", e)
+            trace.error = str(e)
+            self.metrics.record(trace)
+            self.server_poller.record_failure()
+            self.net.post(self.update_status, False, f"Error: {str(e)}")
+            return
+        
+        if servers is None:
+            self.metrics.record(trace)
+            self.server_poller.record_success(changed=False)
+            await self.record_history(None)
+            return
+        
+        signature = snapshot_signature(servers)
+        changed = signature != self.last_signature
+        self.server_poller.record_success(changed=changed)
+        self.last_signature = signature
+        if self.prober is None:
+            await self.net.run_blocking(self.latency_prober)
+        self.net.post(self.apply_servers, servers, trace)
+        if changed:
+            try:
+                await self.net.run_blocking(self.cache.save, servers)
+            except Exception as e:
+                # save() handles OSError itself; anything else must not end the poll loop
+                log.warning("Could not save the server cache: %s", e)
+        await self.record_history(servers if changed else None)
+
+    async def record_history(self, servers):
+        """Add a changed list to the history, or extend the current one (servers None)"""
+        try:
+            await self.net.run_blocking(self.store_history, servers, time.time())
+        except Exception as e:
+            # The history is a side record; polling goes on without it
+            log.warning("Could not record history: %s", e)
+
+    def store_history(self, servers, when):
+        """Worker thread"""
+        history = self.history_store()
+        if servers is None:
+            history.touch(when)
+        else:
+            history.append(servers, when)
+
+    def history_store(self):
+        """The HistoryStore, created on first use (any thread)"""
+        with self.history_lock:
+            if self.history is None:
+                from echovr.history import HistoryStore
+                self.history = HistoryStore()
+            return self.history
+
+    def load_cached_snapshot(self):
+        """Paint the last saved server list, marked stale, before the first fetch"""
+        start = time.perf_counter()
+        snapshot = self.cache.load()
+        if snapshot is None:
+            return
+        log.debug("Loaded %d cached servers in %.1fms", len(snapshot.servers),
+                  (time.perf_counter() - start) * 1000)
+        
+        self.apply_servers(snapshot.servers)
+        self.showing_cached = True
+        self.last_update = snapshot.saved
+        self.update_label.config(text=f"Cached list from {time.strftime('%H:%M:%S', time.localtime(snapshot.saved))}")
+        
+        self.stale_label.config(text=f"STALE · {format_duration(snapshot.age)} old")
+        self.stale_label.pack(side=tk.LEFT, padx=(12, 0))
+        self.status_indicator.config(text="●", fg=self.colors['accent_orange'])
+        self.status_label.config(text=f"Showing {len(snapshot.servers)} cached servers, refreshing...")
+
+    def clear_stale_marker(self):
+        """Drop the cached-list marker once live data has arrived"""
+        self.showing_cached = False
+        self.stale_label.pack_forget()
+
+    def apply_servers(self, servers, trace=None):
+        """Install a freshly fetched server list (Tk thread)"""
+        delta = self.deltas.apply(servers)
+        self.last_update = time.time()
+        if self.showing_cached:
+            self.clear_stale_marker()
+        if not delta and delta.version > 1:
+            # Nothing shown changed: keep the cards as drawn, but move
+            # everything else to the new records the engine now holds, and
+            # let latencies that have gone stale be measured again
+            if self.prober is not None:
+                self.prober.annotate(servers)
+                self.prober.probe(servers)
+            self.ranking.update(servers)
+            self.search_index.update(servers)
+            self.servers = self.ranking.ordered(self.sort_order)
+            self.show_servers_quietly()
+            if trace is not None:
+                self.metrics.record(trace)
+            self.update_label.config(text=f"Last update: {time.strftime('%H:%M:%S')}")
+            self.update_status(True, f"Found {len(self.servers)} servers")
+            return
+        
+        if self.pending_trace is not None:
+            self.pending_trace.superseded = True
+            self.metrics.record(self.pending_trace)
+        self.pending_trace = trace
+        self.render_started = time.perf_counter()
+        self.stall_max = 0.0
+        
+        self.servers = servers
+        if self.prober is not None:
+            # None while the cached list is shown at startup
+            self.prober.annotate(servers)
+            self.prober.probe(servers)
+        start = time.perf_counter()
+        self.ranking.update(servers)
+        if trace is not None:
+            trace.add('sort', time.perf_counter() - start)
+        self.search_index.update(servers)
+        if self.search_query:
+            self.search_matches = self.search_index.search(self.search_query)
+        self.update_server_display()
+        self.apply_delta(delta)
+        
+        summary = delta.summary() if delta.version > 1 else ""
+        self.update_status(True, f"Found {len(servers)} servers" + (f" · {summary}" if summary else ""))
+
+    def apply_delta(self, delta):
+        """React to what changed since the last snapshot"""
+        if self.selected_server is not None:
+            selected_id = self.selected_server.id
+            if selected_id in delta.removed:
+                self.selected_server = None
+                self.show_details_placeholder("The selected server is no longer listed")
+                self.update_window_state()
+            elif selected_id in delta.changed:
+                self.update_server_details(self.selected_server)
+        
+        for listener in self.delta_listeners:
+            try:
+                listener(delta)
+            except Exception:
+                log.exception("Delta listener %r failed", listener)
+
+    def on_latency_measured(self):
+        """A probe finished (Tk thread); apply it with any that follow shortly"""
+        if self.latency_job is None:
+            self.latency_job = self.root.after(LATENCY_APPLY_DELAY_MS, self.apply_latencies)
+
+    def apply_latencies(self):
+        """Put the latencies measured since the last call on the records and cards"""
+        self.latency_job = None
+        snapshot = self.ranking.snapshot
+        if self.prober is None or not self.prober.annotate(snapshot):
+            return
+        # The records changed in place, so re-key them and refresh the
+        # cards showing them directly instead of reconciling the list
+        self.ranking.update(snapshot)
+        self.refresh_cards()
+        if self.sort_order == 'lowest_latency':
+            self.servers = self.ranking.ordered(self.sort_order)
+            self.show_servers()
+        if self.selected_server is not None:
+            self.update_server_details(self.selected_server)
+
+    def show_servers_quietly(self):
+        """Point the selection and shown cards at the current records without redrawing"""
+        by_id = {server.id: server for server in self.servers}
+        if self.selected_server is not None:
+            self.selected_server = by_id.get(self.selected_server.id, self.selected_server)
+        if self.search_matches is None:
+            self.shown_servers = self.servers
+        else:
+            self.shown_servers = [s for s in self.servers if s.id in self.search_matches]
+        scroll = self.server_scroll_frame
+        if self.card_renderer == 'canvas':
+            for card in scroll.cards.values():
+                card.server = by_id.get(card.server.id, card.server)
+        elif scroll.virtual:
+            scroll.virtual_items = self.shown_servers
+            for row in scroll.row_pool:
+                if row.virtual_index is not None:
+                    row.server_data = by_id.get(row.server_data.id, row.server_data)
+        else:
+            for card_frame in self.server_cards.values():
+                card_frame.server_data = by_id.get(card_frame.server_data.id, card_frame.server_data)
+
+    def refresh_cards(self):
+        """Re-apply every shown card's server, for state that changed in place"""
+        scroll = self.server_scroll_frame
+        if self.card_renderer == 'canvas':
+            for card in scroll.cards.values():
+                scroll.update_card(card, card.server)
+        elif scroll.virtual:
+            scroll.set_virtual_items(self.shown_servers)
+        else:
+            for card_frame in self.server_cards.values():
+                self.update_server_card(card_frame, card_frame.server_data)
+
+    def describe_latency(self, server):
+        """Latency line of the details panel"""
+        result = None if self.prober is None else self.prober.result(server)
+        if result is None:
+            return "not measured"
+        if result.rtt is None:
+            return "unreachable"
+        region = f" ({server.region})" if server.region else ""
+        from echovr.latency import format_latency
+        return f"{format_latency(result.rtt)}{region}"
+
+    def latency_prober(self):
+        """The LatencyProber, created on first use (worker thread)"""
+        with self.prober_lock:
+            if self.prober is None:
+                from echovr.latency import LatencyProber
+                self.prober = LatencyProber(os.environ.get('ECHOVR_PROBE_URL'),
+                                            on_result=lambda key, result: self.net.post(self.on_latency_measured))
+            return self.prober
 
     def update_server_display(self):
         """Update server display in GUI"""
-        print(f"Updating server display with {len(self.servers)} servers")
-        
-        for widget in self.server_scroll_frame.interior.winfo_children():
-            widget.destroy()
+        log.debug("Updating server display with %d servers", len(self.servers))
         
-        self.servers.sort(key=lambda x: (not x.get('open', False), -len(x.get('players', []))))
+        start = time.perf_counter()
+        self.servers = self.ranking.ordered(self.sort_order)
+        if self.pending_trace is not None:
+            self.pending_trace.add('sort', time.perf_counter() - start)
         
-        for server in self.servers:
-            self.create_server_card(server)
-            print(f"Created card for server: {server.get('id', 'N/A')} - Open: {server.get('open', False)}")
+        if self.selected_server is not None:
+            selected_id = self.selected_server.id
+            for server in self.servers:
+                if server.id == selected_id:
+                    self.selected_server = server
+                    break
         
-        self.server_count_label.config(text=f"{len(self.servers)} servers")
+        self.show_servers()
         
         if self.last_update:
-            time_str = self.last_update.strftime("%H:%M:%S")
+            time_str = time.strftime("%H:%M:%S", time.localtime(self.last_update))
             self.update_label.config(text=f"Last update: {time_str}")
-            
-        if len(self.servers) == 0:
-            placeholder = tk.Label(self.server_scroll_frame.interior,
-                                 text="No servers found",
-                                 font=('Segoe UI', 12),
-                                 fg=self.colors['text_muted'],
-                                 bg=self.colors['bg_light'],
-                                 pady=30)
-            placeholder.pack()
-            print("No servers found, showing placeholder")
+
+    def set_sort_order(self, order):
+        """Switch the card list to another of ranking.ORDERS"""
+        if order == self.sort_order:
+            return
+        self.sort_order = order
+        self.servers = self.ranking.ordered(order)
+        self.show_servers()
+
+    def on_search_changed(self, *args):
+        """Re-filter the card list as the search text changes"""
+        query = self.search_var.get().strip()
+        if query == self.search_query:
+            return
+        self.search_query = query
+        self.search_matches = self.search_index.search(query)
+        self.show_servers()
+
+    def show_servers(self):
+        """Render the sorted servers that match the current search"""
+        if self.search_matches is None:
+            self.shown_servers = self.servers
+        else:
+            matches = self.search_matches
+            self.shown_servers = [s for s in self.servers if s.id in matches]
+        
+        if self.card_renderer == 'canvas':
+            # Drawn cards are cheap enough that the whole list is kept
+            self.schedule_render(self.server_scroll_frame.reconcile(list(self.shown_servers)))
+        elif len(self.shown_servers) > self.virtual_list_threshold:
+            self.cancel_render()
+            if not self.server_scroll_frame.virtual:
+                for _ in self.reconcile_server_cards([]):
+                    pass
+                self.server_scroll_frame.enable_virtual(CARD_ROW_HEIGHT,
+                                                        lambda parent, server: self.create_server_card(server, parent),
+                                                        self.update_server_card,
+                                                        padx=10,
+                                                        pady=6)
+            start = time.perf_counter()
+            self.server_scroll_frame.set_virtual_items(self.shown_servers)
+            if self.pending_trace is not None:
+                self.pending_trace.add('render', time.perf_counter() - start)
+            self.finish_render()
+        else:
+            if self.server_scroll_frame.virtual:
+                self.server_scroll_frame.disable_virtual()
+            self.schedule_render(self.reconcile_server_cards(list(self.shown_servers)))
         
-        self.server_scroll_frame.interior.update_idletasks()
-        self.server_scroll_frame.canvas.config(scrollregion=self.server_scroll_frame.canvas.bbox("all"))
+        if self.search_matches is None:
+            self.server_count_label.config(text=f"{len(self.servers)} servers")
+        else:
+            self.server_count_label.config(text=f"{len(self.shown_servers)} of {len(self.servers)} servers")
+
+    def schedule_render(self, steps):
+        """Run a render generator in time-boxed chunks on the Tk thread
+        
+        Each chunk advances the generator until RENDER_FRAME_BUDGET is used
+        up and then yields back to the event loop. Scheduling new work
+        supersedes whatever render is still pending.
+        """
+        self.cancel_render()
+        self.render_steps = steps
+        self.render_job = self.root.after(0, self._render_chunk)
+
+    def cancel_render(self):
+        """Drop any partially completed render"""
+        if self.render_job is not None:
+            self.root.after_cancel(self.render_job)
+            self.render_job = None
+        if self.render_steps is not None:
+            self.render_steps.close()
+            self.render_steps = None
+
+    def _render_chunk(self):
+        """Advance the pending render until this frame's budget is spent"""
+        self.render_job = None
+        start = time.perf_counter()
+        deadline = start + RENDER_FRAME_BUDGET
+        finished = False
+        try:
+            while time.perf_counter() < deadline:
+                next(self.render_steps)
+        except StopIteration:
+            finished = True
+        if self.pending_trace is not None:
+            self.pending_trace.add('render', time.perf_counter() - start)
+        if finished:
+            self.render_steps = None
+            self.finish_render()
+            return
+        self.render_job = self.root.after(1, self._render_chunk)
+
+    def finish_render(self):
+        """Show the placeholder if needed and update the scroll region once"""
+        empty_text = "No servers match your search" if self.search_matches is not None else "No servers found"
+        if self.card_renderer == 'canvas':
+            self.server_scroll_frame.show_message(None if self.shown_servers else empty_text)
+        elif len(self.shown_servers) == 0:
+            if self.empty_placeholder is None:
+                self.empty_placeholder = tk.Label(self.server_scroll_frame.interior,
+                                                 text="No servers found",
+                                                 font=('Segoe UI', 12),
+                                                 fg=self.colors['text_muted'],
+                                                 bg=self.colors['bg_light'],
+                                                 pady=30)
+            self.empty_placeholder.config(text=empty_text)
+            self.empty_placeholder.pack()
+            log.debug("No servers found, showing placeholder")
+        elif self.empty_placeholder is not None:
+            self.empty_placeholder.pack_forget()
+        
+        if not self.server_scroll_frame.virtual and self.card_renderer != 'canvas':
+            self.server_scroll_frame.interior.update_idletasks()
+            self.server_scroll_frame.canvas.config(scrollregion=self.server_scroll_frame.canvas.bbox("all"))
+        
+        log.debug("Server display updated: %d servers", len(self.servers))
+        
+        trace, self.pending_trace = self.pending_trace, None
+        if trace is not None:
+            trace.render_wall = time.perf_counter() - self.render_started
+            trace.stall = self.stall_max
+            if self.metrics_window is not None:
+                trace.widgets = count_widgets(self.root)
+            self.metrics.record(trace)
+
+    def reconcile_server_cards(self, servers):
+        """Bring the card list in line with servers, keyed by server id
+        
+        This is a generator that yields after each card it touches, so it
+        can be driven by schedule_render. server_cards and card_order stay
+        consistent between steps, so a superseded run can simply be dropped.
+        """
+        wanted = {}
+        for server in servers:
+            wanted.setdefault(server.id, server)
+        
+        for server_id in [sid for sid in self.card_order if sid not in wanted]:
+            self.server_cards.pop(server_id).destroy()
+            self.card_order.remove(server_id)
+            log.debug("Removed card for server: %s", server_id)
+            yield
+        
+        for server_id, server in wanted.items():
+            card_frame = self.server_cards.get(server_id)
+            if card_frame is None:
+                self.server_cards[server_id] = self.create_server_card(server)
+                self.card_order.append(server_id)
+                log.debug("Created card for server: %s - Open: %s", server_id, server.open)
+                yield
+            elif card_frame.server_data is not server:
+                self.update_server_card(card_frame, server)
+                yield
+        
+        # Move only the cards that are out of place: the longest run of
+        # cards already in the right relative order stays, the rest are
+        # re-packed next to their new predecessor. pack(after=...) keeps the
+        # card's other pack options, so nothing else gets re-laid out.
+        order = self.card_order
+        new_order = list(wanted)
+        if order != new_order:
+            position = {server_id: index for index, server_id in enumerate(order)}
+            stay = longest_increasing([position[server_id] for server_id in new_order])
+            previous = None
+            for server_id in new_order:
+                if position[server_id] not in stay:
+                    card_frame = self.server_cards[server_id]
+                    if previous is not None:
+                        card_frame.pack(after=self.server_cards[previous])
+                    elif order[0] != server_id:
+                        card_frame.pack(before=self.server_cards[order[0]])
+                previous = server_id
+            self.card_order = new_order
+
+    def card_button_text(self, server):
+        """Label of a card's button: join now, wait for a slot, or stop waiting"""
+        if self.watcher is not None and self.watcher.watching(server):
+            return "Stop waiting ✕"
+        return "Quick Join →" if server.joinable else "Join when open ⏳"
+
+    def card_action(self, server):
+        """A card's button: join an open server, watch a full or locked one"""
+        if self.watcher is not None and self.watcher.watching(server):
+            self.unwatch_server(server)
+        elif server.joinable:
+            self.join_server(server)
+        else:
+            self.watch_server(server)
+
+    def watch_server(self, server):
+        """Join server as soon as it has a free slot"""
+        from echovr.watcher import JoinWatcher, WatchError
+        if self.watcher is None:
+            self.watcher = JoinWatcher(self.core)
+        try:
+            self.watcher.add(server)
+        except WatchError as e:
+            messagebox.showwarning("Join when open", f"{e}. Stop waiting on one of them first.")
+            return
+        self.update_status(True, f"Waiting for a slot on {server.short_id} "
+                                 f"({len(self.watcher)} of {self.watcher.max_watches} watches)")
+        self.refresh_cards()
+        if not self.watch_running:
+            self.watch_running = True
+            self.net.submit(self.watch_task(), name='watch')
+
+    def unwatch_server(self, server):
+        """Stop waiting on server; the poll loop ends once nothing is watched"""
+        if self.watcher.remove(server) is not None:
+            self.update_status(True, f"Stopped waiting on {server.short_id}")
+            self.refresh_cards()
+
+    async def watch_task(self):
+        """Poll the watched servers until no watch is left
         
-        print(f"Server display updated. Server count label should show: {len(self.servers)} servers")
+        The poll runs on the regular workers, so a join clicked meanwhile
+        still has the urgent one to itself.
+        """
+        try:
+            while len(self.watcher):
+                events = await self.net.run_blocking(self.watcher.poll)
+                if events:
+                    self.net.post(self.on_watch_events, events)
+                await asyncio.sleep(self.watcher.next_interval())
+        finally:
+            self.net.post(self.watch_task_finished)
+
+    def watch_task_finished(self):
+        """Restart the poll loop if a watch was added as it was ending"""
+        self.watch_running = False
+        if len(self.watcher):
+            self.watch_running = True
+            self.net.submit(self.watch_task(), name='watch')
+
+    def on_watch_events(self, events):
+        """Report the watches a poll ended (Tk thread)"""
+        from echovr.watcher import GONE, JOIN_FAILED, JOINED, SUPERSEDED
+        for watch, outcome, detail in events:
+            if outcome == JOINED:
+                self.update_api_status(True)
+                self.on_joined(detail, f"A slot opened, joining server: {watch.short_id}")
+            elif outcome == JOIN_FAILED:
+                messagebox.showerror("Error", f"Failed to join server {watch.short_id}: {detail}")
+            elif outcome != SUPERSEDED:
+                reason = "is no longer listed" if outcome == GONE else "did not open in time"
+                self.update_status(True, f"Stopped waiting on {watch.short_id}: it {reason}")
+        self.refresh_cards()
 
     def join_server(self, server):
         """Join a specific server"""
-        threading.Thread(target=self._join_server_thread, args=(server,), daemon=True).start()
+        self.net.submit(self.join_server_task(server, time.perf_counter()), name='join')
 
-    def _join_server_thread(self, server):
-        """Thread for joining server"""
-        server_id = server.get('id', '').split('.')[0].upper()
+    async def join_server_task(self, server, clicked):
+        """Ask the local API to join server straight away
         
-        if not self.check_api_connection():
-            self.root.after(0, messagebox.showerror, 
+        There is no separate /session check first: the POST goes out on the
+        connection the API checker keeps warm, on the urgent worker, and its
+        outcome updates the API status. While the checker last saw the API
+        up, a broken connection is taken for a stale keep-alive socket and
+        the join is sent once more.
+        """
+        server_id = server.short_id
+        
+        try:
+            response = await self.net.run_urgent(self.core.join_session, server.id,
+                                                 retry_stale=bool(self.api_connected))
+        except Exception as e:
+            self.join_timings.record(time.perf_counter() - clicked, ok=False)
+            self.net.post(self.update_api_status, False)
+            self.net.post(messagebox.showerror, 
                           "API Error", 
-                          "Cannot connect to EchoVR API. Make sure EchoVR is running.")
+                          f"Cannot connect to EchoVR API. Make sure EchoVR is running.\n\n{str(e)}")
             return
         
-        join_data = {
-            "session_id": server_id,
-            "password": ""
-        }
+        self.join_timings.record(time.perf_counter() - clicked, ok=response.status_code == 200)
+        if not self.api_connected:
+            self.net.post(self.update_api_status, True)
         
-        try:
-            response = requests.post(f"{self.api_base_url}/join_session", 
-                                    json=join_data, 
-                                    timeout=5)
-            
-            if response.status_code == 200:
-                self.current_session = server
-                self.root.after(0, messagebox.showinfo, 
-                              "Success", 
-                              f"Joining server: {server_id}")
-            else:
-                self.root.after(0, messagebox.showerror, 
-                              "Error", 
-                              f"Failed to join server: {response.text}")
-                
-        except Exception as e:
-            self.root.after(0, messagebox.showerror, 
-                          "Connection Error", 
-                          f"Failed to connect to EchoVR API:\n{str(e)}")
+        if response.status_code == 200:
+            self.net.post(self.on_joined, server, f"Joining server: {server_id}")
+        else:
+            self.net.post(messagebox.showerror, 
+                          "Error", 
+                          f"Failed to join server: {response.text}")
+
+    def on_joined(self, server, message):
+        """The API accepted a join (Tk thread)"""
+        self.current_session = server
+        messagebox.showinfo("Success", message)
 
     def spectate_server(self, server):
-        """Spectate a specific server"""
+        """Spectate a specific server and follow it in the live session panel"""
         self.join_server(server)
+        self.open_session_window()
         self.root.after(0, messagebox.showinfo, 
                       "Spectator Mode", 
                       "Joining as spectator. Use in-game controls to adjust camera.")
 
-    def check_api_connection(self):
-        """Check if EchoVR API is reachable"""
+    async def check_api_task(self):
+        """Check the local API once and show the result"""
         try:
-            response = requests.get(f"{self.api_base_url}/session", timeout=2)
-            if response.status_code == 200:
-                self.root.after(0, self.update_api_status, True)
-                return True
-        except:
-            pass
-        
-        self.root.after(0, self.update_api_status, False)
-        return False
+            connected = await self.net.run_blocking(self.core.check_api_connection, timeout=API_CHECK_TIMEOUT)
+        except asyncio.TimeoutError:
+            connected = False
+        if connected:
+            self.api_poller.record_success(changed=connected != self.api_connected)
+        else:
+            self.api_poller.record_failure()
+        self.net.post(self.update_api_status, connected)
 
     def update_api_status(self, connected):
-        """Update API status display"""
+        """Record and show whether the local API answers (Tk thread)"""
+        self.api_connected = connected
         if connected:
             self.api_status_label.config(text="API: Connected", fg=self.colors['accent_green'])
             self.status_indicator.config(text="●", fg=self.colors['accent_green'])
@@ -861,7 +2056,7 @@ class EchoVRSpectatorGUI:
                            fg=self.colors['text_primary'],
                            insertbackground=self.colors['text_primary'])
         ip_entry.pack(fill=tk.X)
-        ip_entry.insert(0, self.echo_api_ip)
+        ip_entry.insert(0, self.core.api_ip)
         
         port_frame = tk.Frame(settings_frame, bg=self.colors['bg_medium'])
         port_frame.pack(fill=tk.X, pady=10)
@@ -879,7 +2074,7 @@ class EchoVRSpectatorGUI:
                             fg=self.colors['text_primary'],
                             insertbackground=self.colors['text_primary'])
         port_entry.pack(fill=tk.X)
-        port_entry.insert(0, str(self.echo_api_port))
+        port_entry.insert(0, str(self.core.api_port))
         
         test_btn = tk.Button(settings_window,
                            text="Test Connection",
@@ -903,47 +2098,773 @@ class EchoVRSpectatorGUI:
 
     def test_connection(self, ip, port):
         """Test API connection"""
+        self.net.submit(self.test_connection_task(ip, port), name='test_connection')
+
+    async def test_connection_task(self, ip, port):
+        """Probe an API address from the settings dialog"""
         try:
-            response = requests.get(f"http://{ip}:{port}/session", timeout=2)
+            response = await self.net.run_blocking(self.core.probe_api, ip, port)
             if response.status_code == 200:
-                messagebox.showinfo("Success", "Connection successful!")
+                self.net.post(messagebox.showinfo, "Success", "Connection successful!")
             else:
-                messagebox.showerror("Error", f"API responded with status: {response.status_code}")
+                self.net.post(messagebox.showerror, "Error", f"API responded with status: {response.status_code}")
         except Exception as e:
-            messagebox.showerror("Error", f"Connection failed: {str(e)}")
+            self.net.post(messagebox.showerror, "Error", f"Connection failed: {str(e)}")
 
     def save_settings(self, ip, port, window):
         """Save API settings"""
         try:
-            self.echo_api_ip = ip
-            self.echo_api_port = int(port)
-            self.api_base_url = f"http://{self.echo_api_ip}:{self.echo_api_port}"
+            self.core.set_api_address(ip, port)
+            if self.session_stream is not None:
+                self.start_session_stream()
             window.destroy()
             messagebox.showinfo("Success", "Settings saved successfully!")
         except ValueError:
             messagebox.showerror("Error", "Port must be a valid number!")
 
-    def start_background_threads(self):
-        """Start background update threads"""
-        def periodic_fetch():
-            while self.running:
-                self.fetch_servers()
-                time.sleep(30)
+    def start_network(self):
+        """Start the network loop, its pollers and the UI result pump"""
+        self.net.start()
+        self.net.submit(self.poll_servers(), name='poll_servers')
+        self.net.submit(self.poll_api(), name='poll_api')
+        self.process_net_results()
+        self.watch_stalls()
+        
+        for sequence in ('<Map>', '<Unmap>', '<FocusIn>', '<FocusOut>'):
+            self.root.bind(sequence, self.on_window_state_event, add='+')
+
+    async def poll_servers(self):
+        """Refresh the server list on the adaptive server_poller schedule"""
+        self.server_poll_wakeup = asyncio.Event()
+        while True:
+            await self.refresh_servers_task()
+            await self.wait_for_next_poll(self.server_poller, self.server_poll_wakeup,
+                                          self.update_poll_label)
+
+    async def poll_api(self):
+        """Check the local API on the adaptive api_poller schedule"""
+        self.api_poll_wakeup = asyncio.Event()
+        while True:
+            await self.check_api_task()
+            await self.wait_for_next_poll(self.api_poller, self.api_poll_wakeup)
+
+    async def wait_for_next_poll(self, poller, wakeup, on_interval=None):
+        """Sleep until the poller's next deadline
+        
+        Setting wakeup makes the deadline be recomputed from when the last
+        poll finished, so restoring or focusing the window shortens a long
+        background wait instead of sitting it out.
+        """
+        started = self.net.loop.time()
+        while True:
+            interval = poller.next_interval()
+            if on_interval is not None:
+                self.net.post(on_interval, interval, poller.reason)
+            remaining = started + interval - self.net.loop.time()
+            if remaining <= 0:
+                return
+            wakeup.clear()
+            try:
+                await asyncio.wait_for(wakeup.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def wake_pollers(self):
+        """Make the pollers re-evaluate their deadlines (loop thread)"""
+        for wakeup in (self.server_poll_wakeup, self.api_poll_wakeup):
+            if wakeup is not None:
+                wakeup.set()
+
+    def set_poll_state(self, visible, focused, active):
+        """Apply window/selection state to the pollers (loop thread)"""
+        for poller in (self.server_poller, self.api_poller):
+            poller.set_window_state(visible, focused)
+        self.server_poller.active = active
+        self.wake_pollers()
+
+    def on_window_state_event(self, event):
+        """Coalesce map/unmap/focus events into one state check"""
+        # Every child widget's Map/Unmap also reaches this root binding
+        if event.widget is not self.root and str(event.type) in ('Map', 'Unmap'):
+            return
+        if self.window_state_job is None:
+            self.window_state_job = self.root.after_idle(self.update_window_state)
+
+    def update_window_state(self):
+        """Tell the pollers whether the window is visible and focused"""
+        self.window_state_job = None
+        visible = self.root.state() not in ('iconic', 'withdrawn')
+        try:
+            focused = self.root.focus_get() is not None
+        except KeyError:
+            focused = True
+        state = (visible, focused, self.selected_server is not None)
+        if state != self.window_state:
+            self.window_state = state
+            self.net.call_soon(self.set_poll_state, *state)
+
+    def update_poll_label(self, interval, reason):
+        """Show the current refresh interval in the footer"""
+        text = f"Refresh: {interval:.0f}s"
+        if reason != "normal":
+            text += f" ({reason})"
+        self.poll_label.config(text=text)
+
+    def process_net_results(self):
+        """Run callbacks queued by the network loop (Tk thread)"""
+        for callback, args in self.net.drain():
+            try:
+                callback(*args)
+            except Exception:
+                log.exception("Error handling network result")
+        self.net_pump_job = self.root.after(NET_PUMP_INTERVAL, self.process_net_results)
+
+    def watch_stalls(self):
+        """Track the worst Tk event-loop delay since the last refresh began"""
+        now = time.perf_counter()
+        if self.stall_expected is not None:
+            self.stall_max = max(self.stall_max, now - self.stall_expected)
+        self.stall_expected = now + STALL_TICK_MS / 1000
+        self.root.after(STALL_TICK_MS, self.watch_stalls)
+
+    def toggle_session_window(self, event=None):
+        """Open or close the live session panel"""
+        if self.session_window is not None:
+            self.close_session_window()
+        else:
+            self.open_session_window()
+
+    def open_session_window(self):
+        """Show the live session panel and start streaming /session"""
+        if self.session_window is not None:
+            self.session_window.lift()
+            return
+        
+        bg = self.colors['bg_dark']
+        window = tk.Toplevel(self.root)
+        window.title("Live Session")
+        window.geometry("640x520")
+        window.configure(bg=bg)
+        window.protocol("WM_DELETE_WINDOW", self.close_session_window)
+        self.session_window = window
+        
+        def label(parent, **options):
+            widget = tk.Label(parent, bg=bg, **options)
+            widget.displayed = {}
+            return widget
+        
+        top_frame = tk.Frame(window, bg=bg)
+        top_frame.pack(fill=tk.X, padx=15, pady=(15, 5))
+        
+        window.clock_label = label(top_frame,
+                                   text="--:--.--",
+                                   font=('Consolas', 28, 'bold'),
+                                   fg=self.colors['text_primary'])
+        window.clock_label.pack(side=tk.LEFT)
+        
+        window.score_label = label(top_frame,
+                                   text="🔵 - 🟠",
+                                   font=('Segoe UI', 20, 'bold'),
+                                   fg=self.colors['text_primary'])
+        window.score_label.pack(side=tk.RIGHT)
+        
+        info_frame = tk.Frame(window, bg=bg)
+        info_frame.pack(fill=tk.X, padx=15)
+        
+        window.possession_label = label(info_frame,
+                                        text="Possession: -",
+                                        font=('Segoe UI', 11, 'bold'),
+                                        fg=self.colors['text_secondary'])
+        window.possession_label.pack(side=tk.LEFT)
+        
+        rate_labels = {f"{rate} Hz": rate for rate in SESSION_RATES}
+        rate_var = tk.StringVar(value=f"{self.session_rate} Hz")
+        rate_menu = tk.OptionMenu(info_frame,
+                                  rate_var,
+                                  *rate_labels,
+                                  command=lambda text: self.set_session_rate(rate_labels[text]))
+        rate_menu.config(font=('Segoe UI', 9),
+                        bg=self.colors['bg_medium'],
+                        fg=self.colors['text_primary'],
+                        activebackground=self.colors['bg_light'],
+                        activeforeground=self.colors['text_primary'],
+                        relief=tk.FLAT,
+                        highlightthickness=0)
+        rate_menu.pack(side=tk.RIGHT)
+        
+        window.record_button = tk.Button(info_frame,
+                                         text="⏺ Record",
+                                         command=self.toggle_session_recording,
+                                         bg=self.colors['bg_light'],
+                                         fg=self.colors['text_primary'],
+                                         font=('Segoe UI', 9),
+                                         relief='flat',
+                                         padx=12,
+                                         pady=2,
+                                         cursor='hand2')
+        window.record_button.pack(side=tk.RIGHT, padx=(0, 10))
+        
+        window.map_canvas = tk.Canvas(window,
+                                      bg=self.colors['bg_medium'],
+                                      highlightthickness=0)
+        window.map_canvas.pack(fill=tk.BOTH, expand=True, padx=15, pady=10)
+        window.map_canvas.bind('<Configure>', lambda e: self.draw_session_arena())
+        window.player_dots = []
+        window.dots_shown = 0
+        window.disc_item = window.map_canvas.create_oval(0, 0, 0, 0,
+                                                         fill='white',
+                                                         outline='',
+                                                         state='hidden')
+        
+        window.stream_label = label(window,
+                                    text="Connecting...",
+                                    font=('Segoe UI', 9),
+                                    fg=self.colors['text_muted'])
+        window.stream_label.pack(anchor=tk.W, padx=15, pady=(0, 10))
+        
+        self.start_session_stream()
+        self.refresh_session_status()
+
+    def close_session_window(self):
+        """Close the live session panel and stop streaming"""
+        if self.session_job is not None:
+            self.root.after_cancel(self.session_job)
+            self.session_job = None
+        self.stop_session_recording()
+        self.stop_session_stream()
+        if self.session_window is not None:
+            self.session_window.destroy()
+            self.session_window = None
+
+    def start_session_stream(self):
+        """(Re)start streaming /session from the configured API address"""
+        self.stop_session_stream()
+        # The stream thread only ever queues one callback until take() is
+        # called, so a busy Tk thread skips frames instead of piling them up
+        self.session_stream = self.core.session_stream(rate=self.session_rate,
+                                                       notify=lambda: self.net.post(self.show_session_frame))
+        if self.session_recorder is not None:
+            self.session_stream.taps.append(self.session_recorder.add_frame)
+        self.session_stream.start()
+
+    def stop_session_stream(self):
+        if self.session_stream is not None:
+            self.session_stream.stop()
+            self.session_stream = None
+
+    def toggle_session_recording(self):
+        """Start recording the streamed frames to a file, or stop"""
+        if self.session_recorder is not None:
+            self.stop_session_recording()
+            return
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.session_window,
+                                            title="Record session",
+                                            defaultextension=".echorec",
+                                            initialfile=time.strftime("session-%Y%m%d-%H%M%S.echorec"),
+                                            filetypes=[("Session recordings", "*.echorec")])
+        if not path:
+            return
+        from echovr.recording import Recorder
+        try:
+            recorder = Recorder(path, {'source': self.core.api_base_url, 'rate': self.session_rate})
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not start recording: {str(e)}")
+            return
+        self.session_recorder = recorder
+        if self.session_stream is not None:
+            self.session_stream.taps.append(recorder.add_frame)
+        self.session_window.record_button.config(text="⏹ Stop", bg=self.colors['accent_red'], fg='white')
+
+    def stop_session_recording(self):
+        """Finish the current recording, writing its index"""
+        recorder, self.session_recorder = self.session_recorder, None
+        if recorder is None:
+            return
+        if self.session_stream is not None and recorder.add_frame in self.session_stream.taps:
+            self.session_stream.taps.remove(recorder.add_frame)
+        try:
+            recorder.close()
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not finish recording: {str(e)}")
+        log.info("Recorded %d frames to %s", recorder.frames, recorder.path)
+        if self.session_window is not None:
+            self.session_window.record_button.config(text="⏺ Record",
+                                                     bg=self.colors['bg_light'],
+                                                     fg=self.colors['text_primary'])
+
+    def set_session_rate(self, rate):
+        self.session_rate = rate
+        if self.session_stream is not None:
+            self.session_stream.set_rate(rate)
+
+    def session_map_transform(self):
+        """(scale x, scale y, centre x, centre y) from arena metres to map pixels"""
+        canvas = self.session_window.map_canvas
+        width = max(canvas.winfo_width(), 2 * SESSION_MAP_MARGIN + 1)
+        height = max(canvas.winfo_height(), 2 * SESSION_MAP_MARGIN + 1)
+        return ((width - 2 * SESSION_MAP_MARGIN) / (2 * ARENA_HALF_LENGTH),
+                (height - 2 * SESSION_MAP_MARGIN) / (2 * ARENA_HALF_WIDTH),
+                width / 2,
+                height / 2)
+
+    def draw_session_arena(self):
+        """Redraw the arena outline for the current map size"""
+        canvas = self.session_window.map_canvas
+        canvas.delete('arena')
+        sx, sy, cx, cy = self.session_map_transform()
+        left = cx - ARENA_HALF_LENGTH * sx
+        right = cx + ARENA_HALF_LENGTH * sx
+        top = cy - ARENA_HALF_WIDTH * sy
+        bottom = cy + ARENA_HALF_WIDTH * sy
+        canvas.create_rectangle(left, top, right, bottom, outline=self.colors['border'], width=2, tags='arena')
+        canvas.create_line(cx, top, cx, bottom, fill=self.colors['border'], dash=(4, 4), tags='arena')
+        # Blue defends the -z goal, orange the +z one
+        canvas.create_line(left, cy - 3 * sy, left, cy + 3 * sy, fill=self.colors['blue_team'], width=4, tags='arena')
+        canvas.create_line(right, cy - 3 * sy, right, cy + 3 * sy, fill=self.colors['orange_team'], width=4, tags='arena')
+        canvas.tag_lower('arena')
+
+    def show_session_frame(self):
+        """Draw the newest streamed frame (Tk thread)"""
+        window = self.session_window
+        if window is None or self.session_stream is None:
+            return
+        frame = self.session_stream.take()
+        if frame is None:
+            return
+        
+        self.set_detail(window.clock_label, text=frame.clock_display)
+        self.set_detail(window.score_label, text=f"🔵 {frame.blue_points} - {frame.orange_points} 🟠")
+        possession = frame.possession
+        if possession is None:
+            self.set_detail(window.possession_label, text="Possession: -", fg=self.colors['text_secondary'])
+        else:
+            team, name = possession
+            self.set_detail(window.possession_label,
+                            text=f"Possession: {name}",
+                            fg=self.colors['blue_team'] if team == 'blue' else self.colors['orange_team'])
+        
+        canvas = window.map_canvas
+        sx, sy, cx, cy = self.session_map_transform()
+        positions = frame.positions
+        dots = window.player_dots
+        count = frame.player_count
+        # One dot and one name per player, pooled; only coords change per frame
+        while len(dots) < count:
+            dot = canvas.create_oval(0, 0, 0, 0, outline='', state='hidden')
+            name = canvas.create_text(0, 0,
+                                      anchor=tk.S,
+                                      font=('Segoe UI', 8),
+                                      fill=self.colors['text_secondary'],
+                                      state='hidden')
+            dots.append([dot, name, None])
+        for i in range(count):
+            dot, name, shown = dots[i]
+            x = cx + positions[3 * i + 2] * sx
+            y = cy + positions[3 * i] * sy
+            canvas.coords(dot, x - SESSION_DOT_RADIUS, y - SESSION_DOT_RADIUS,
+                          x + SESSION_DOT_RADIUS, y + SESSION_DOT_RADIUS)
+            canvas.coords(name, x, y - SESSION_DOT_RADIUS - 2)
+            look = (frame.teams[i], frame.names[i], i == frame.possessor)
+            if look != shown:
+                team, player_name, holder = look
+                canvas.itemconfigure(dot,
+                                     fill=self.colors['blue_team'] if team == 'blue' else self.colors['orange_team'],
+                                     outline='white' if holder else '',
+                                     width=2 if holder else 1,
+                                     state='normal')
+                canvas.itemconfigure(name, text=player_name, state='normal')
+                dots[i][2] = look
+        for i in range(count, window.dots_shown):
+            canvas.itemconfigure(dots[i][0], state='hidden')
+            canvas.itemconfigure(dots[i][1], state='hidden')
+            dots[i][2] = None
+        window.dots_shown = count
+        
+        disc = frame.disc
+        x = cx + disc[2] * sx
+        y = cy + disc[0] * sy
+        canvas.coords(window.disc_item, x - 3, y - 3, x + 3, y + 3)
+        canvas.itemconfigure(window.disc_item, state='normal')
+
+    def refresh_session_status(self):
+        """Update the stream status line twice a second while the panel is open"""
+        stream = self.session_stream
+        if stream is not None:
+            stats = stream.stats()
+            state = stats['state']
+            if state == 'streaming':
+                text = (f"Streaming {stats['measured_hz']:.0f}/{stats['rate']} Hz · "
+                        f"{stats['poll_ms']:.1f}ms per poll · {stats['dropped']} frames skipped")
+            elif state == 'idle':
+                text = "EchoVR is running but not in a match"
+            elif state == 'offline':
+                text = f"Cannot reach the EchoVR API at {self.core.api_ip}:{self.core.api_port}"
+            else:
+                text = "Connecting..."
+            recorder = self.session_recorder
+            if recorder is not None:
+                text += f" · recording {recorder.frames} frames, {recorder.size / 1024:.0f} KiB"
+            self.set_detail(self.session_window.stream_label, text=text)
+        self.session_job = self.root.after(500, self.refresh_session_status)
+
+    def toggle_history_window(self, event=None):
+        """Open or close the history view"""
+        if self.history_window is not None:
+            self.close_history_window()
+        else:
+            self.open_history_window()
+
+    def open_history_window(self):
+        """Show population by hour and weekday, server lifetimes and fill times"""
+        bg = self.colors['bg_dark']
+        window = tk.Toplevel(self.root)
+        window.title("History")
+        window.geometry("720x600")
+        window.configure(bg=bg)
+        window.protocol("WM_DELETE_WINDOW", self.close_history_window)
+        self.history_window = window
+        window.summary = None
+        window.days = HISTORY_RANGES[1]
+        window.mode = None
+        
+        def label(parent, **options):
+            widget = tk.Label(parent, bg=bg, justify=tk.LEFT, **options)
+            widget.displayed = {}
+            return widget
+        
+        def option_menu(parent, choices, current, on_change):
+            var = tk.StringVar(value=current)
+            menu = tk.OptionMenu(parent, var, *choices, command=lambda text: on_change(choices[text]))
+            menu.config(font=('Segoe UI', 9),
+                        bg=self.colors['bg_medium'],
+                        fg=self.colors['text_primary'],
+                        activebackground=self.colors['bg_light'],
+                        activeforeground=self.colors['text_primary'],
+                        relief=tk.FLAT,
+                        highlightthickness=0)
+            return menu
+        
+        controls = tk.Frame(window, bg=bg)
+        controls.pack(fill=tk.X, padx=15, pady=(15, 5))
+        
+        tk.Label(controls,
+                 text="Player history",
+                 font=('Segoe UI', 16, 'bold'),
+                 fg=self.colors['text_primary'],
+                 bg=bg).pack(side=tk.LEFT)
+        
+        ranges = {f"Last {days} days": days for days in HISTORY_RANGES}
+        option_menu(controls, ranges, f"Last {window.days} days",
+                    lambda days: self.set_history_filter(days=days)).pack(side=tk.RIGHT)
+        modes = {"All modes": None}
+        modes.update((records.mode_title(mode), mode) for mode in SUPPORTED_MODES)
+        option_menu(controls, modes, "All modes",
+                    lambda mode: self.set_history_filter(mode=mode)).pack(side=tk.RIGHT, padx=(0, 10))
+        
+        window.summary_label = label(window,
+                                     text="",
+                                     font=('Segoe UI', 10),
+                                     fg=self.colors['text_secondary'])
+        window.summary_label.pack(anchor=tk.W, padx=15, pady=(5, 10))
+        
+        label(window,
+              text="Median players by weekday and hour",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_primary']).pack(anchor=tk.W, padx=15)
+        window.heatmap = tk.Canvas(window, height=190, bg=self.colors['bg_medium'], highlightthickness=0)
+        window.heatmap.pack(fill=tk.X, padx=15, pady=(2, 10))
+        
+        label(window,
+              text="Players by hour: 10th to 90th percentile, median marked",
+              font=('Segoe UI', 10, 'bold'),
+              fg=self.colors['text_primary']).pack(anchor=tk.W, padx=15)
+        window.hourly = tk.Canvas(window, bg=self.colors['bg_medium'], highlightthickness=0)
+        window.hourly.pack(fill=tk.BOTH, expand=True, padx=15, pady=(2, 5))
+        window.heatmap.bind('<Configure>', lambda e: self.draw_history())
+        window.hourly.bind('<Configure>', lambda e: self.draw_history())
+        
+        window.status_label = label(window,
+                                    text="",
+                                    font=('Segoe UI', 9),
+                                    fg=self.colors['text_muted'])
+        window.status_label.pack(anchor=tk.W, padx=15, pady=(0, 10))
         
-        def periodic_api_check():
-            while self.running:
-                self.check_api_connection()
-                time.sleep(10)
+        self.load_history()
+
+    def close_history_window(self):
+        self.net.cancel('history')
+        if self.history_window is not None:
+            self.history_window.destroy()
+            self.history_window = None
+
+    def set_history_filter(self, days=None, mode=False):
+        window = self.history_window
+        if days is not None:
+            window.days = days
+        if mode is not False:
+            window.mode = mode
+        self.load_history()
+
+    def load_history(self):
+        """Summarize the history store on a worker thread"""
+        window = self.history_window
+        window.requested = time.perf_counter()
+        self.set_detail(window.status_label, text="Loading history...")
+        self.net.submit(self.load_history_task(window.days, window.mode), name='history')
+
+    async def load_history_task(self, days, mode):
+        try:
+            summary = await self.net.run_blocking(self.summarize_history, days, mode)
+        except Exception as e:
+            log.warning("Could not load history: %s", e)
+            self.net.post(self.show_history, None, str(e))
+            return
+        self.net.post(self.show_history, summary)
+
+    def summarize_history(self, days, mode):
+        """Worker thread; NumPy is imported here on first use, not at startup"""
+        from echovr import analytics
+        return analytics.summarize(self.history_store(), days, mode)
+
+    def show_history(self, summary, error=None):
+        """Fill the history view with a summary from echovr.analytics (Tk thread)"""
+        window = self.history_window
+        if window is None:
+            return
+        window.summary = summary
+        if summary is None:
+            self.set_detail(window.summary_label, text=f"History is not available: {error}")
+            self.set_detail(window.status_label, text="")
+            self.draw_history()
+            return
+        if not summary['watched_hours']:
+            self.set_detail(window.summary_label,
+                            text="No history yet. It builds up while the browser polls the server list.")
+        else:
+            players = summary['players']
+            lifetime = summary['lifetime']['quantiles']
+            fill = summary['fill']
+            peak = time.strftime('%a %d %b %H:%M', time.localtime(players['peak_time']))
+            lines = [f"{players['mean']:.0f} players on average, peak {players['peak']} on {peak} · "
+                     f"{players['servers_mean']:.1f} servers listed, {players['open_mean']:.1f} open"]
+            if lifetime[1] is not None:
+                lines.append(f"Servers run {format_duration(lifetime[1])} (median), "
+                             f"{format_duration(lifetime[2])} for the longest 10% "
+                             f"· {summary['lifetime']['servers']} servers seen from start to end")
+            if fill['filled_share'] is not None and fill['quantiles'][1] is not None:
+                lines.append(f"{fill['filled_share']:.0%} of servers fill up, "
+                             f"taking {format_duration(fill['quantiles'][1])} (median)")
+            self.set_detail(window.summary_label, text="\n".join(lines))
+        self.draw_history()
+        self.set_detail(window.status_label,
+                        text=f"{summary['snapshots']} snapshots, {summary['watched_hours']:.0f} hours watched · "
+                             f"computed in {summary['elapsed'] * 1000:.0f}ms, "
+                             f"shown in {(time.perf_counter() - window.requested) * 1000:.0f}ms")
+
+    def draw_history(self):
+        """Redraw both history charts for the current summary and canvas sizes"""
+        window = self.history_window
+        window.heatmap.delete('all')
+        window.hourly.delete('all')
+        summary = window.summary
+        if summary is None or not summary['watched_hours']:
+            return
+        self.draw_history_heatmap(window.heatmap, summary['weekly'])
+        self.draw_history_hourly(window.hourly, summary['hourly'])
+
+    def draw_history_heatmap(self, canvas, weekly):
+        left, top = 40, 18
+        width = max(canvas.winfo_width() - left - 10, 24)
+        height = max(canvas.winfo_height() - top - 6, 7)
+        cell_w, cell_h = width / 24, height / 7
+        values = [value for row in weekly for value in row if value is not None]
+        peak = max(values, default=0) or 1
+        font = ('Segoe UI', 8)
+        for hour in range(0, 24, 3):
+            canvas.create_text(left + hour * cell_w, top - 4, text=f"{hour:02d}", anchor=tk.SW,
+                               font=font, fill=self.colors['text_muted'])
+        for day, row in enumerate(weekly):
+            y = top + day * cell_h
+            canvas.create_text(left - 6, y + cell_h / 2, text=HISTORY_WEEKDAYS[day], anchor=tk.E,
+                               font=font, fill=self.colors['text_secondary'])
+            for hour, value in enumerate(row):
+                x = left + hour * cell_w
+                fill = (self.colors['bg_light'] if value is None
+                        else mix_colors(self.colors['bg_dark'], self.colors['accent_blue'], value / peak))
+                canvas.create_rectangle(x + 1, y + 1, x + cell_w - 1, y + cell_h - 1, fill=fill, outline='')
+
+    def draw_history_hourly(self, canvas, hourly):
+        left, top, bottom = 40, 12, 18
+        width = max(canvas.winfo_width() - left - 10, 24)
+        height = max(canvas.winfo_height() - top - bottom, 10)
+        base = top + height
+        peak = max((high for _, _, high in hourly if high is not None), default=0) or 1
+        font = ('Segoe UI', 8)
+        slot = width / 24
+        canvas.create_line(left, base, left + width, base, fill=self.colors['border'])
+        canvas.create_text(left - 6, top, text=f"{peak:.0f}", anchor=tk.E, font=font, fill=self.colors['text_muted'])
+        canvas.create_text(left - 6, base, text="0", anchor=tk.E, font=font, fill=self.colors['text_muted'])
+        for hour, (low, median, high) in enumerate(hourly):
+            x = left + hour * slot
+            if hour % 3 == 0:
+                canvas.create_text(x, base + 3, text=f"{hour:02d}", anchor=tk.NW,
+                                   font=font, fill=self.colors['text_muted'])
+            if median is None:
+                continue
+            canvas.create_rectangle(x + slot * 0.2, base - high / peak * height,
+                                    x + slot * 0.8, base - low / peak * height,
+                                    fill=self.colors['accent_blue'], outline='')
+            y = base - median / peak * height
+            canvas.create_line(x + slot * 0.1, y, x + slot * 0.9, y, fill=self.colors['text_primary'], width=2)
+
+    def toggle_metrics_window(self, event=None):
+        """Open or close the performance window"""
+        if self.metrics_window is not None:
+            self.close_metrics_window()
+            return
         
-        threading.Thread(target=periodic_fetch, daemon=True).start()
-        threading.Thread(target=periodic_api_check, daemon=True).start()
+        window = tk.Toplevel(self.root)
+        window.title("Performance")
+        window.geometry("560x520")
+        window.configure(bg=self.colors['bg_dark'])
+        window.protocol("WM_DELETE_WINDOW", self.close_metrics_window)
+        window.bind('<F12>', self.toggle_metrics_window)
+        self.metrics_window = window
+        
+        self.metrics_text = tk.Text(window,
+                                    font=('Consolas', 9),
+                                    bg=self.colors['bg_medium'],
+                                    fg=self.colors['text_primary'],
+                                    relief='flat',
+                                    padx=10,
+                                    pady=10)
+        self.metrics_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=(10, 0))
+        
+        button_frame = tk.Frame(window, bg=self.colors['bg_dark'])
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        
+        self.profile_button = tk.Button(button_frame,
+                                        text="Start cProfile",
+                                        command=self.toggle_profiling,
+                                        bg=self.colors['bg_light'],
+                                        fg=self.colors['text_primary'],
+                                        font=('Segoe UI', 9),
+                                        relief='flat',
+                                        padx=12,
+                                        pady=4)
+        self.profile_button.pack(side=tk.LEFT)
+        
+        export_btn = tk.Button(button_frame,
+                             text="Export JSON",
+                             command=self.export_metrics,
+                             bg=self.colors['accent_blue'],
+                             fg='white',
+                             font=('Segoe UI', 9),
+                             relief='flat',
+                             padx=12,
+                             pady=4)
+        export_btn.pack(side=tk.RIGHT)
+        
+        self.refresh_metrics_window()
+
+    def close_metrics_window(self):
+        """Close the performance window"""
+        if self.metrics_job is not None:
+            self.root.after_cancel(self.metrics_job)
+            self.metrics_job = None
+        if self.metrics_window is not None:
+            self.metrics_window.destroy()
+            self.metrics_window = None
+
+    def refresh_metrics_window(self):
+        """Redraw the p50/p95 table once a second while the window is open"""
+        def fmt(name, value):
+            if value is None:
+                return "-"
+            if name in STAGES or name in ('total', 'render_wall', 'stall'):
+                return f"{value * 1000:.1f}ms"
+            return f"{value:.0f}"
+        
+        summary = self.metrics.summary()
+        lines = [f"{'stage':<13}{'last':>11}{'p50':>11}{'p95':>11}{'n':>6}"]
+        for name, stats in summary.items():
+            lines.append(f"{name:<13}{fmt(name, stats['last']):>11}{fmt(name, stats['p50']):>11}"
+                         f"{fmt(name, stats['p95']):>11}{stats['count']:>6}")
+        lines.append("")
+        lines.append(f"Live widgets: {count_widgets(self.root)}")
+        lines.append(f"Poll interval: {self.server_poller.interval:.0f}s ({self.server_poller.reason})")
+        if self.watcher is not None and len(self.watcher):
+            watch = self.watcher.stats()
+            lines.append(f"Join when open: {len(watch['watching'])} servers, every {watch['interval']:.1f}s "
+                         f"({watch['reason']}), {watch['polls']} polls, {watch['unchanged']} unchanged")
+        lines.append(f"JSON backend: {records.JSON_BACKEND}")
+        lines.append("")
+        joins = self.join_timings.summary()
+        if joins['count']:
+            lines.append(f"Join, click to API answer: last {fmt('total', joins['last'])}  "
+                         f"p50 {fmt('total', joins['p50'])}  p95 {fmt('total', joins['p95'])}  "
+                         f"n {joins['count']}  failed {joins['failures']}")
+            lines.extend(self.join_timings.lines())
+            lines.append("")
+        lines.extend(self.startup.report().splitlines())
+        if self.profiler.running:
+            lines.append("cProfile: recording (Tk thread)")
+        
+        self.metrics_text.config(state=tk.NORMAL)
+        self.metrics_text.delete('1.0', tk.END)
+        self.metrics_text.insert('1.0', "\n".join(lines))
+        self.metrics_text.config(state=tk.DISABLED)
+        self.metrics_job = self.root.after(1000, self.refresh_metrics_window)
+
+    def toggle_profiling(self):
+        """Start or stop a cProfile capture of the Tk thread"""
+        if not self.profiler.running:
+            self.profiler.start()
+            self.profile_button.config(text="Stop cProfile")
+            return
         
-        self.fetch_servers()
-        self.check_api_connection()
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.metrics_window,
+                                            title="Save profile",
+                                            defaultextension=".prof",
+                                            initialfile="echovr-browser.prof")
+        report = self.profiler.stop(path or None)
+        self.profile_button.config(text="Start cProfile")
+        log.info("cProfile capture finished\n%s", report)
+
+    def export_metrics(self):
+        """Save the buffered traces and recent HTTP timings as JSON"""
+        from tkinter import filedialog
+        path = filedialog.asksaveasfilename(parent=self.metrics_window,
+                                            title="Export metrics",
+                                            defaultextension=".json",
+                                            initialfile="echovr-metrics.json")
+        if not path:
+            return
+        try:
+            self.metrics.export_json(path, extra={
+                'requests': [timing._asdict() for timing in list(self.http.timings)],
+                'startup': self.startup.to_dict(),
+                'joins': self.join_timings.summary(),
+            })
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not export metrics: {str(e)}")
 
     def on_closing(self):
         """Handle window closing"""
-        self.running = False
+        self.stop_session_recording()
+        self.stop_session_stream()
+        self.net.stop()
+        if self.prober is not None:
+            self.prober.close()
+        if self.history is not None:
+            self.history.close()
+        if self.net_pump_job is not None:
+            self.root.after_cancel(self.net_pump_job)
+        if self.latency_job is not None:
+            self.root.after_cancel(self.latency_job)
+        self.http.close()
         self.root.destroy()
 
     def run(self):
@@ -952,6 +2873,9 @@ class EchoVRSpectatorGUI:
 
 def main():
     """Main entry point"""
+    # Per-server debug logging is off unless ECHOVR_DEBUG is set
+    logging.basicConfig(level=logging.DEBUG if os.environ.get('ECHOVR_DEBUG') else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     app = EchoVRSpectatorGUI()
     app.run()
 
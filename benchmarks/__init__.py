@@ -0,0 +1 @@
+"""Benchmarks for the EchoVR server browser (run with python -m benchmarks.<name>)"""
@@ -0,0 +1,59 @@
+"""Compare streaming label decoding against response.json() + filter
+
+    python -m benchmarks.bench_match_stream --labels 1000 10000 50000
+"""
+import argparse
+import json
+import time
+import tracemalloc
+
+from echovr.match_stream import iter_labels
+from benchmarks.synthetic import chunked, make_payload
+
+MODES = ('echo_arena', 'echo_combat')
+
+
+def full_decode(chunks):
+    """What fetch_servers used to do: decode everything, then filter"""
+    data = json.loads(b''.join(chunks))
+    return [s for s in data.get('labels', []) if s.get('mode', '') in MODES]
+
+
+def streamed_decode(chunks):
+    """Decode only the wanted labels while reading the body"""
+    return list(iter_labels(chunks, MODES))
+
+
+def measure(func, chunks, repeat):
+    """Best wall time over repeat runs and peak traced memory of one run"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(chunks)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(chunks)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, len(result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--labels', type=int, nargs='+', default=[100, 1000, 10000])
+    parser.add_argument('--chunk-size', type=int, default=65536)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'labels':>8} {'MiB':>7} {'path':>8} {'kept':>6} {'ms':>9} {'peak MiB':>9}")
+    for count in args.labels:
+        body = make_payload(count)
+        chunks = chunked(body, args.chunk_size)
+        for name, func in (('json', full_decode), ('stream', streamed_decode)):
+            seconds, peak, kept = measure(func, chunks, args.repeat)
+            print(f"{count:>8} {len(body) / 2**20:>7.2f} {name:>8} {kept:>6} "
+                  f"{seconds * 1000:>9.2f} {peak / 2**20:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
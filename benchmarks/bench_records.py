@@ -0,0 +1,78 @@
+"""Compare raw label dicts against echovr.records for memory and refresh CPU
+
+    python -m benchmarks.bench_records --labels 1000 10000
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from echovr import records
+from echovr.match_stream import iter_labels
+from echovr.records import Server
+from benchmarks.synthetic import chunked, make_payload
+
+MODES = ('echo_arena', 'echo_combat')
+
+
+def dict_refresh(chunks):
+    """Stdlib decode, keep dicts, derive display strings the old way"""
+    servers = list(iter_labels(chunks, MODES, json.loads))
+    servers.sort(key=lambda x: (not x.get('open', False), -len(x.get('players', []))))
+    for server in servers:
+        mode = server.get('mode', 'unknown').replace('_', ' ').title()
+        server_id = server.get('id', 'N/A').split('.')[0].upper()
+        f"{mode} - {server_id}"
+    return servers
+
+
+def record_refresh(chunks):
+    """Backend decode into Server records with precomputed display fields"""
+    servers = [Server.from_label(label) for label in iter_labels(chunks, MODES, records.loads)]
+    servers.sort(key=lambda x: (not x.open, -x.player_count))
+    for server in servers:
+        server.title
+    return servers
+
+
+def retained(func, chunks):
+    """Bytes still allocated while the result of func is alive"""
+    gc.collect()
+    tracemalloc.start()
+    result = func(chunks)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def best_time(func, chunks, repeat):
+    """Fastest of repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(chunks)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--labels', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"JSON backend: {records.JSON_BACKEND}")
+    print(f"{'labels':>8} {'path':>8} {'ms':>9} {'retained MiB':>13}")
+    for count in args.labels:
+        chunks = chunked(make_payload(count))
+        for name, func in (('dicts', dict_refresh), ('records', record_refresh)):
+            seconds = best_time(func, chunks, args.repeat)
+            kept = retained(func, chunks)
+            print(f"{count:>8} {name:>8} {seconds * 1000:>9.2f} {kept / 2**20:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
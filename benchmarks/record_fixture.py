@@ -0,0 +1,56 @@
+"""Save a live /status/matches response as a benchmark fixture
+
+    python -m benchmarks.record_fixture [--keep-names]
+
+Player names and ids are replaced with stable pseudonyms of the same
+length unless --keep-names is given, so fixtures can be committed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import requests
+
+MATCHES_URL = "https://g.echovrce.com/status/matches"
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def pseudonym(value, prefix):
+    """Deterministic stand-in for value with the same length"""
+    digest = hashlib.sha256(value.encode()).hexdigest()
+    return (prefix + digest)[:max(len(value), len(prefix) + 4)]
+
+
+def anonymize(document):
+    """Replace identifying player fields in place"""
+    for label in document.get('labels', []):
+        for player in label.get('players') or []:
+            for key, prefix in (('display_name', 'Player'), ('username', 'user'), ('user_id', '')):
+                if player.get(key):
+                    player[key] = pseudonym(player[key], prefix)
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=MATCHES_URL)
+    parser.add_argument('--output', help="defaults to fixtures/matches_<timestamp>.json")
+    parser.add_argument('--keep-names', action='store_true')
+    args = parser.parse_args()
+
+    response = requests.get(args.url, timeout=30)
+    response.raise_for_status()
+    document = response.json()
+    if not args.keep_names:
+        anonymize(document)
+
+    path = args.output or os.path.join(FIXTURE_DIR, time.strftime('matches_%Y%m%d_%H%M%S.json'))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, separators=(',', ':'))
+    print(f"Saved {len(document.get('labels', []))} labels to {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,457 @@
+"""Local stand-ins for the matches API and the EchoVR game API
+
+    python -m benchmarks.standin [--labels 200] [--scenario evening] ...
+    python -m echovr --url http://127.0.0.1:8780/status/matches watch
+    ECHOVR_MATCHES_URL=http://127.0.0.1:8780/status/matches python SpecateClient.py
+
+The matches stand-in serves GET /status/matches from a world of synthetic
+labels that evolves over time: players join and leave, scores tick, and a
+scenario can add, fill, close and remove servers at fixed offsets. The
+game API stand-in answers GET /session and POST /join_session the way a
+running EchoVR does on port 6721 (point the browser's settings at it).
+Once a session is joined, /session reports a live match: the clock runs
+down, players move around the arena and possession passes between them,
+so it can be streamed at the same rates as the real API.
+
+The matches stand-in also answers GET /ping/<region> after that region's
+round trip, for the browser's latency probes:
+
+    ECHOVR_PROBE_URL=http://127.0.0.1:8780/ping/{region} python SpecateClient.py
+
+Each region gets a fixed delay of 10-150ms derived from its name, or the
+one given with --region-latency.
+
+Both servers share the network model: fixed latency plus jitter before
+the headers, a bandwidth cap while the body is written, a rate of 500s
+and a rate of 429s carrying Retry-After. Everything random is drawn from
+one seeded generator, so a run with one client is reproducible. Scenario
+steps can change the network model mid-run, to replay an outage or a
+slowdown. --api-latency gives the game API its own, usually much lower,
+latency, as the real one runs on the same machine.
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from benchmarks.synthetic import make_label, make_player
+
+# Built-in scenarios: lists of steps, each applied once `at` seconds into
+# the run. World keys: add, fill, close, remove (server counts). Any
+# NetworkModel field can be set as well.
+SCENARIOS = {
+    'static': [],
+    'evening': [
+        {'at': 10, 'add': 5},
+        {'at': 20, 'fill': 5},
+        {'at': 40, 'add': 10},
+        {'at': 60, 'close': 8},
+        {'at': 90, 'remove': 10},
+    ],
+    'slowdown': [
+        {'at': 10, 'latency': 2.0, 'bandwidth': 20000},
+        {'at': 40, 'latency': 0.05, 'bandwidth': None},
+    ],
+    'outage': [
+        {'at': 10, 'error_rate': 1.0},
+        {'at': 40, 'error_rate': 0.0},
+    ],
+    'ratelimit': [
+        {'at': 5, 'rate_limit': 1.0, 'retry_after': 30},
+        {'at': 45, 'rate_limit': 0.0},
+    ],
+}
+
+WORLD_STEPS = ('add', 'fill', 'close', 'remove')
+# Seconds each player holds the disc in a stand-in session
+POSSESSION_SECONDS = 3.0
+# Length of a stand-in round; the game clock wraps around after it
+ROUND_SECONDS = 300.0
+
+
+def player_position(player, t):
+    """Head position of a stand-in player at t seconds: a smooth, repeatable path"""
+    phase = int(player['user_id'][:8], 16) / 0xffffffff * 2 * math.pi
+    side = -1 if player['team'] == 'blue' else 1
+    return [round(12 * math.sin(0.4 * t + phase), 3),
+            round(1.5 + math.sin(0.9 * t + 2 * phase), 3),
+            round(side * 18 + 20 * math.sin(0.25 * t + 1.3 * phase), 3)]
+
+
+class NetworkModel:
+    """Latency, bandwidth and failure rates applied to every response"""
+    __slots__ = ('latency', 'jitter', 'bandwidth', 'error_rate', 'rate_limit', 'retry_after')
+
+    def __init__(self, latency=0.05, jitter=0.0, bandwidth=None, error_rate=0.0,
+                 rate_limit=0.0, retry_after=30):
+        self.latency = latency
+        self.jitter = jitter
+        # Bytes per second for the body, None for unlimited
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+
+    def update(self, step):
+        for name in self.__slots__:
+            if name in step:
+                setattr(self, name, step[name])
+
+
+class World:
+    """The synthetic server list and the scenario driving it"""
+    def __init__(self, labels=100, seed=0, scenario=(), churn=1.0, pad=0, network=None, region_latency=None):
+        self.rng = random.Random(seed)
+        self.network = network or NetworkModel()
+        self.region_latency = dict(region_latency or {})
+        self.churn = churn
+        self.pad = pad
+        self.lock = threading.Lock()
+        self.next_index = 0
+        self.labels = []
+        self.add(labels)
+        self.steps = sorted(scenario, key=lambda step: step['at'])
+        self.started = time.monotonic()
+        self.last_tick = 0.0
+        self.version = 0
+        self._body = None
+
+    def elapsed(self):
+        return time.monotonic() - self.started
+
+    def add(self, count):
+        for _ in range(count):
+            label = make_label(self.rng, self.next_index)
+            if self.pad:
+                label['metadata'] = 'x' * self.pad
+            self.labels.append(label)
+            self.next_index += 1
+
+    def _public(self, open_only=False):
+        return [label for label in self.labels
+                if label['mode'] in ('echo_arena', 'echo_combat') and (label['open'] or not open_only)]
+
+    def fill(self, count):
+        """Top up count open servers to a full 8 and close them"""
+        for label in self.rng.sample(self._public(True), min(count, len(self._public(True)))):
+            while len(label['players']) < 8:
+                team = 'blue' if len(label['players']) % 2 == 0 else 'orange'
+                label['players'].append(make_player(self.rng, team))
+            label['size'] = len(label['players'])
+            label['open'] = False
+
+    def close(self, count):
+        for label in self.rng.sample(self._public(True), min(count, len(self._public(True)))):
+            label['open'] = False
+
+    def remove(self, count):
+        for label in self.rng.sample(self.labels, min(count, len(self.labels))):
+            self.labels.remove(label)
+
+    def tick(self):
+        """Advance the world to now: due scenario steps, then churn"""
+        with self.lock:
+            now = self.elapsed()
+            changed = False
+            while self.steps and self.steps[0]['at'] <= now:
+                step = self.steps.pop(0)
+                for key in WORLD_STEPS:
+                    if key in step:
+                        getattr(self, key)(step[key])
+                self.network.update(step)
+                changed = True
+            # One random change per churn second since the last tick
+            if self.churn:
+                changes = int((now - self.last_tick) / self.churn)
+                if changes:
+                    self.last_tick = now
+                for _ in range(min(changes, 1000)):
+                    changed |= self._churn_one()
+            if changed:
+                self.version += 1
+                self._body = None
+
+    def _churn_one(self):
+        candidates = self._public()
+        if not candidates:
+            return False
+        label = self.rng.choice(candidates)
+        roll = self.rng.random()
+        if roll < 0.4 and 'game_state' in label:
+            key = self.rng.choice(['blue_score', 'orange_score'])
+            label['game_state'][key] += 1
+        elif roll < 0.7 and len(label['players']) < 14:
+            label['players'].append(make_player(self.rng, self.rng.choice(['blue', 'orange'])))
+        elif label['players']:
+            label['players'].pop(self.rng.randrange(len(label['players'])))
+        else:
+            return False
+        label['size'] = len(label['players'])
+        label['open'] = label['size'] < 8
+        return True
+
+    def body(self):
+        """Encoded /status/matches document and its ETag"""
+        with self.lock:
+            if self._body is None:
+                body = json.dumps({'labels': self.labels}, separators=(',', ':')).encode()
+                self._body = (body, f'"{hashlib.md5(body).hexdigest()}"')
+            return self._body
+
+    def find(self, session_id):
+        """The label whose id starts with session_id (case-insensitive), or None"""
+        wanted = session_id.split('.')[0].lower()
+        with self.lock:
+            for label in self.labels:
+                if label['id'].split('.')[0] == wanted:
+                    return label
+        return None
+
+    def session_document(self, session, t):
+        """/session body for the joined session t seconds into the run"""
+        label = self.find(session) or {}
+        state = label.get('game_state') or {}
+        players = label.get('players', [])
+        playing = [p for p in players if p['team'] in ('blue', 'orange')]
+        holder = playing[int(t / POSSESSION_SECONDS) % len(playing)] if playing else None
+        positions = {p['user_id']: player_position(p, t) for p in playing}
+        clock = (state.get('round_clock', 0.0) - t) % ROUND_SECONDS
+        minutes, seconds = divmod(clock, 60)
+        return {
+            'sessionid': session,
+            'match_type': label.get('mode', ''),
+            'game_status': state.get('status', 'playing'),
+            'game_clock': round(clock, 3),
+            'game_clock_display': f"{int(minutes):02d}:{seconds:05.2f}",
+            'blue_points': state.get('blue_score', 0),
+            'orange_points': state.get('orange_score', 0),
+            'disc': {'position': positions[holder['user_id']] if holder else [0.0, 0.0, 0.0]},
+            'teams': [
+                {'team': name,
+                 'possession': holder is not None and holder['team'] == team,
+                 'players': [{'name': p['display_name'],
+                              'userid': p['user_id'],
+                              'possession': p is holder,
+                              'head': {'position': positions.get(p['user_id'], [0.0, 0.0, 0.0])}}
+                             for p in players if p['team'] == team]}
+                for team, name in (('blue', 'BLUE TEAM'), ('orange', 'ORANGE TEAM'), ('spectator', 'SPECTATORS'))
+            ],
+        }
+
+    def roll(self, rate):
+        with self.lock:
+            return rate and self.rng.random() < rate
+
+    def ping_delay(self, region):
+        """Round trip of region in seconds, with the network model's jitter"""
+        latency = self.region_latency.get(region)
+        if latency is None:
+            latency = 0.010 + int(hashlib.md5(region.encode()).hexdigest()[:4], 16) % 141 / 1000
+        return self.delay(NetworkModel(latency, self.network.jitter))
+
+    def delay(self, network=None):
+        network = network or self.network
+        with self.lock:
+            jitter = self.rng.uniform(-network.jitter, network.jitter) if network.jitter else 0.0
+        return max(0.0, network.latency + jitter)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, delayed
+    # ACKs hold every keep-alive response back by ~40ms
+    disable_nagle_algorithm = True
+    world = None
+    # NetworkModel for this server only; None shares the world's
+    network = None
+    quiet = True
+
+    @property
+    def model(self):
+        return self.network or self.world.network
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def send_body(self, status, body, content_type='application/json', headers=()):
+        """Send a response with the world's latency and bandwidth applied"""
+        time.sleep(self.world.delay(self.model))
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        bandwidth = self.model.bandwidth
+        if not bandwidth or self.command == 'HEAD':
+            if self.command != 'HEAD':
+                self.wfile.write(body)
+            return
+        # Write in 20 slices per second of bandwidth
+        step = max(1, int(bandwidth / 20))
+        for i in range(0, len(body), step):
+            self.wfile.write(body[i:i + step])
+            self.wfile.flush()
+            time.sleep(0.05)
+
+    def send_json(self, status, document, headers=()):
+        self.send_body(status, json.dumps(document).encode(), headers=headers)
+
+    def injected_failure(self):
+        """Answer with a 429 or 500 if the network model says so"""
+        network = self.model
+        if self.world.roll(network.rate_limit):
+            self.send_json(429, {'error': 'rate limited'},
+                           headers=[('Retry-After', str(int(network.retry_after)))])
+            return True
+        if self.world.roll(network.error_rate):
+            self.send_json(500, {'error': 'injected failure'})
+            return True
+        return False
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            return None
+
+
+class MatchesHandler(StandInHandler):
+    """GET /status/matches and GET /ping/<region>"""
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path.startswith('/ping/'):
+            time.sleep(self.world.ping_delay(path[len('/ping/'):]))
+            self.send_response(204)
+            self.end_headers()
+            return
+        if path != '/status/matches':
+            self.send_json(404, {'error': 'not found'})
+            return
+        self.world.tick()
+        if self.injected_failure():
+            return
+        body, etag = self.world.body()
+        if self.headers.get('If-None-Match') == etag:
+            self.send_body(304, b'', headers=[('ETag', etag)])
+            return
+        self.send_body(200, body, headers=[('ETag', etag), ('Cache-Control', 'no-cache')])
+
+    do_HEAD = do_GET
+
+
+class GameApiHandler(StandInHandler):
+    """GET /session and POST /join_session of a running EchoVR"""
+    session = None
+    session_lock = threading.Lock()
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/session':
+            self.send_json(404, {'error': 'not found'})
+            return
+        if self.injected_failure():
+            return
+        with self.session_lock:
+            session = GameApiHandler.session
+        if session is None:
+            # Not in a match yet; still a 200 so the browser's liveness
+            # check passes as it does with the game sitting in the lobby
+            self.send_json(200, {'sessionid': '', 'game_status': 'lobby'})
+            return
+        self.world.tick()
+        self.send_json(200, self.world.session_document(session, self.world.elapsed()))
+
+    def do_POST(self):
+        if self.path.split('?')[0] != '/join_session':
+            self.send_json(404, {'error': 'not found'})
+            return
+        request = self.read_json()
+        if self.injected_failure():
+            return
+        if not request or not request.get('session_id'):
+            self.send_json(400, {'error': 'session_id required'})
+            return
+        label = self.world.find(request['session_id'])
+        if label is None:
+            self.send_json(404, {'error': 'session not found'})
+            return
+        with self.session_lock:
+            GameApiHandler.session = label['id'].split('.')[0].upper()
+        self.send_json(200, {'result': 'joining', 'session_id': GameApiHandler.session})
+
+
+def serve(handler, world, host, port, quiet=True, network=None):
+    """Start handler on host:port in a daemon thread and return the server"""
+    handler_class = type(handler.__name__, (handler,), {'world': world, 'quiet': quiet, 'network': network})
+    server = ThreadingHTTPServer((host, port), handler_class)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name=handler.__name__, daemon=True).start()
+    return server
+
+
+def load_scenario(name):
+    """A built-in scenario by name, or a JSON list of steps from a file"""
+    if name in SCENARIOS:
+        return [dict(step) for step in SCENARIOS[name]]
+    with open(name, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--matches-port', type=int, default=8780)
+    parser.add_argument('--api-port', type=int, default=6721, help="0 to skip the game API stand-in")
+    parser.add_argument('--labels', type=int, default=200, help="labels at start, all modes")
+    parser.add_argument('--pad', type=int, default=0, help="extra bytes per label, to grow the payload")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--scenario', default='static',
+                        help=f"one of {', '.join(SCENARIOS)} or a JSON file of steps")
+    parser.add_argument('--churn', type=float, default=1.0,
+                        help="seconds per random join/leave/score change, 0 to freeze")
+    parser.add_argument('--latency', type=float, default=0.05, help="seconds before the headers")
+    parser.add_argument('--api-latency', type=float,
+                        help="seconds before game API answers (default: same as --latency)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="+/- seconds added to latency")
+    parser.add_argument('--bandwidth', type=int, help="body bytes per second (default unlimited)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="share of requests answered 500")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="share of requests answered 429")
+    parser.add_argument('--retry-after', type=int, default=30, help="Retry-After seconds on a 429")
+    parser.add_argument('--region-latency', action='append', default=[], metavar='REGION=SECONDS',
+                        help="round trip /ping/REGION answers after, repeatable")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    network = NetworkModel(args.latency, args.jitter, args.bandwidth, args.error_rate,
+                           args.rate_limit, args.retry_after)
+    region_latency = {}
+    for item in args.region_latency:
+        region, _, seconds = item.partition('=')
+        region_latency[region] = float(seconds)
+    world = World(args.labels, args.seed, load_scenario(args.scenario), args.churn, args.pad, network,
+                  region_latency)
+    servers = [serve(MatchesHandler, world, args.host, args.matches_port, not args.verbose)]
+    print(f"Matches API: http://{args.host}:{servers[0].server_address[1]}/status/matches")
+    if args.api_port:
+        api_network = NetworkModel(args.api_latency) if args.api_latency is not None else None
+        servers.append(serve(GameApiHandler, world, args.host, args.api_port, not args.verbose, api_network))
+        print(f"Game API:    http://{args.host}:{servers[1].server_address[1]}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for server in servers:
+            server.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    main()
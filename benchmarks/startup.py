@@ -0,0 +1,120 @@
+"""Cold-start timings of the GUI, each run in a fresh interpreter
+
+    python -m benchmarks.startup                      # import time only
+    xvfb-run -a python -m benchmarks.startup --gui    # up to time-to-interactive
+
+With --gui the browser is started against an unreachable matches URL and
+a throwaway cache directory seeded with a synthetic snapshot, so the
+numbers include painting a cached list but never wait on the network.
+The GUI cases run once per card renderer (see ECHOVR_CARD_RENDERER).
+The same cases run as part of benchmarks.suite.
+"""
+import argparse
+import compileall
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_DRIVER = """
+import json, time
+start = time.perf_counter()
+import SpecateClient
+print(json.dumps({'import': time.perf_counter() - start}))
+"""
+
+_GUI_DRIVER = """
+import json, time
+start = time.perf_counter()
+import SpecateClient
+imported = time.perf_counter()
+app = SpecateClient.EchoVRSpectatorGUI()
+
+def check():
+    if app.startup.has('interactive'):
+        report = {name: value['total'] for name, value in app.startup.to_dict().items()}
+        report['import'] = imported - start
+        print(json.dumps(report))
+        app.on_closing()
+    else:
+        app.root.after(5, check)
+
+app.root.after(5, check)
+app.run()
+"""
+
+
+def run_driver(code, env=None):
+    """Run code in a new interpreter; returns (wall seconds, last JSON line it printed)"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=60)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"startup driver failed:\n{result.stderr}")
+    return wall, json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def seeded_cache_dir(count=300):
+    """Temporary cache directory holding a snapshot of count synthetic labels"""
+    from benchmarks.synthetic import make_matches
+    from echovr.cache import SnapshotCache
+    from echovr.records import Server
+
+    directory = tempfile.mkdtemp(prefix='echovr-startup-')
+    servers = [Server.from_label(label) for label in make_matches(count, seed=count)['labels']
+               if label['mode'] in ('echo_arena', 'echo_combat')]
+    SnapshotCache(directory).save(servers)
+    return directory
+
+
+def compile_sources():
+    """Write the bytecode the drivers load, as an installed browser would have it
+
+    Under PYTHONDONTWRITEBYTECODE the drivers would otherwise compile every
+    module from source on each run and time that instead of the import.
+    """
+    compileall.compile_file(os.path.join(ROOT, 'SpecateClient.py'), quiet=1)
+    compileall.compile_dir(os.path.join(ROOT, 'echovr'), quiet=1)
+
+
+def startup_cases(repeat, gui=False):
+    compile_sources()
+    samples = {}
+    for _ in range(repeat):
+        wall, report = run_driver(_IMPORT_DRIVER)
+        samples.setdefault('startup.process', []).append(wall)
+        samples.setdefault('startup.import', []).append(report['import'])
+
+    if gui:
+        cache_dir = seeded_cache_dir()
+        for renderer, prefix in (('widgets', 'startup.gui_'), ('canvas', 'startup.gui_canvas_')):
+            env = dict(os.environ,
+                       ECHOVR_MATCHES_URL='http://127.0.0.1:9/status/matches',
+                       ECHOVR_CACHE_DIR=cache_dir,
+                       ECHOVR_CARD_RENDERER=renderer)
+            for _ in range(repeat):
+                _, report = run_driver(_GUI_DRIVER, env)
+                for name, value in report.items():
+                    samples.setdefault(f"{prefix}{name}", []).append(value)
+
+    return {case: {'median': statistics.median(values), 'best': min(values), 'unit': 's'}
+            for case, values in samples.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gui', action='store_true', help="also start the window (needs a display)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    for case, value in startup_cases(args.repeat, args.gui).items():
+        print(f"{case:<28} median {value['median'] * 1000:8.1f}ms  best {value['best'] * 1000:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
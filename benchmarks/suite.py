@@ -0,0 +1,436 @@
+"""Refresh-path benchmark suite with baseline comparison
+
+    python -m benchmarks.suite                      # headless cases
+    xvfb-run -a python -m benchmarks.suite --gui    # plus Tk rendering
+    python -m benchmarks.suite --update-baseline    # accept current numbers
+
+Every case runs against the recorded fixtures in benchmarks/fixtures and
+synthetic payloads of 10, 100, 1k and 10k labels, plus the cold-start
+cases from benchmarks.startup, decoding of /session frames, session
+recordings, the history store and latency probes against an in-process
+stand-in. Results are written as
+JSON and compared with benchmarks/baseline.json; a case that is slower
+(or uses more memory) than its baseline by more than the tolerance is
+reported as a regression and the exit status is 1. Sources whose timings
+look slower are measured again first (--confirm), so a slow spell of the
+machine is not taken for a regression.
+"""
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from echovr import analytics, records
+from echovr.core import SUPPORTED_MODES as MODES, sort_servers
+from echovr.match_stream import LabelStream
+from echovr.deltas import DeltaEngine
+from echovr.history import HistoryStore
+from echovr.latency import LatencyProber
+from echovr.ranking import ORDERS, Ranking
+from echovr.recording import Recorder, Recording
+from echovr.records import Server
+from echovr.search import SearchIndex
+from echovr.session import SessionRing
+from benchmarks.standin import MatchesHandler, World, serve
+from benchmarks.startup import startup_cases
+from benchmarks.synthetic import chunked, fill_history, make_payload
+
+HERE = os.path.dirname(__file__)
+BASELINE_PATH = os.path.join(HERE, 'baseline.json')
+FIXTURE_DIR = os.path.join(HERE, 'fixtures')
+SYNTHETIC_SIZES = (10, 100, 1000, 10000)
+
+
+def load_sources(sizes):
+    """name -> response body for every fixture and synthetic size"""
+    sources = {}
+    for path in sorted(glob.glob(os.path.join(FIXTURE_DIR, '*.json'))):
+        with open(path, 'rb') as f:
+            sources[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    for size in sizes:
+        sources[f"synthetic-{size}"] = make_payload(size, seed=size)
+    return sources
+
+
+def decode(chunks, sessions=None):
+    """The fetch_servers decode path: stream, drop modes, build records
+
+    With sessions, the fetch_sessions path the join watcher polls.
+    """
+    stream = LabelStream(MODES, loads=records.loads, sessions=sessions)
+    servers = []
+    for chunk in chunks:
+        servers.extend(Server.from_label(label) for label in stream.feed(chunk))
+    return servers
+
+
+def time_case(func, repeat):
+    """Median and best wall time of repeat calls"""
+    samples = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {'median': statistics.median(samples), 'best': min(samples), 'unit': 's'}
+
+
+def memory_case(func):
+    """Peak and retained traced memory of one call"""
+    gc.collect()
+    tracemalloc.start()
+    result = func()
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {'peak': peak, 'retained': retained, 'unit': 'B'}
+
+
+def headless_cases(sources, repeat):
+    results = {}
+    for name, body in sources.items():
+        chunks = chunked(body)
+        servers = decode(chunks)
+        results[f"decode[{name}]"] = time_case(lambda: decode(chunks), repeat)
+        watched = {server.short_id for server in servers[:3]}
+        results[f"decode_watched[{name}]"] = time_case(lambda: decode(chunks, watched), repeat)
+        results[f"sort[{name}]"] = time_case(lambda: sort_servers(list(servers)), repeat)
+        results[f"memory[{name}]"] = memory_case(lambda: sort_servers(decode(chunks)))
+        results.update(search_cases(name, servers, repeat))
+        results.update(ranking_cases(name, servers, repeat))
+        results.update(delta_cases(name, servers, repeat))
+    return results
+
+
+def refreshed(servers):
+    """Same ids as servers in new records, every 20th with one more player"""
+    return [Server(s.id, s.mode, s.open, s.players + s.players[:1] if i % 20 == 0 else s.players,
+                   s.game_state, s.started)
+            for i, s in enumerate(servers)]
+
+
+def delta_cases(name, servers, repeat):
+    """Diffing a snapshot against an identical one and against a churned one"""
+    engine = DeltaEngine()
+    engine.apply(servers)
+    same = [Server(s.id, s.mode, s.open, s.players, s.game_state, s.started) for s in servers]
+    snapshots = [refreshed(servers), servers]
+    return {
+        f"delta.same[{name}]": time_case(lambda: (engine.apply(same), engine.apply(servers)), repeat),
+        f"delta.churn[{name}]": time_case(
+            lambda: engine.apply(snapshots.append(snapshots.pop(0)) or snapshots[0]), repeat),
+    }
+
+
+def ranking_cases(name, servers, repeat):
+    """Keeping every sort order current across a refresh, and switching orders"""
+    ranking = Ranking()
+    ranking.update(servers)
+    for order in ORDERS:
+        ranking.ordered(order)
+    # A typical refresh: same ids, new records, a few with an extra player
+    snapshots = [refreshed(servers), servers]
+    results = {f"rank.refresh[{name}]": time_case(
+        lambda: ranking.update(snapshots.append(snapshots.pop(0)) or snapshots[0]), repeat)}
+    results[f"rank.switch[{name}]"] = time_case(lambda: [ranking.ordered(order) for order in ORDERS], repeat)
+    return results
+
+
+def search_cases(name, servers, repeat):
+    """Index build, refresh with nothing changed, and typing a player name"""
+    index = SearchIndex()
+    results = {f"search.index_cold[{name}]": time_case(lambda: SearchIndex().update(servers), repeat)}
+    index.update(servers)
+    results[f"search.index_warm[{name}]"] = time_case(lambda: index.update(servers), repeat)
+    names = [p.display_name for s in servers for p in s.players if p.display_name]
+    if names:
+        typed = names[len(names) // 2].lower()
+        # Every keystroke of the name, as search-as-you-type would see it
+        results[f"search.typing[{name}]"] = time_case(
+            lambda: [index.search(typed[:i]) for i in range(1, len(typed) + 1)], repeat)
+    return results
+
+
+def session_cases(repeat, frames=1000):
+    """Decoding frames frames of a full 8-player /session answer into the ring"""
+    world = World(labels=50, seed=1, churn=0)
+    label = max(world.labels, key=lambda label: len(label['players']))
+    session = label['id'].split('.')[0].upper()
+    bodies = [json.dumps(world.session_document(session, i / 60)).encode() for i in range(60)]
+    ring = SessionRing()
+
+    def stream(count):
+        loads = records.loads
+        for i in range(count):
+            ring.write(loads(bodies[i % 60]), i / 60)
+        return ring
+
+    return {
+        f"session.decode[{frames}]": time_case(lambda: stream(frames), repeat),
+        f"session.memory[{frames * 10}]": memory_case(lambda: stream(frames * 10)),
+    }
+
+
+def recording_cases(repeat, frames=3600):
+    """Writing a minute of 60 Hz frames, then opening and seeking the file"""
+    world = World(labels=50, seed=1, churn=0)
+    label = max(world.labels, key=lambda label: len(label['players']))
+    session = label['id'].split('.')[0].upper()
+    documents = [world.session_document(session, i / 60) for i in range(frames)]
+    bodies = [json.dumps(document).encode() for document in documents]
+    path = os.path.join(tempfile.mkdtemp(prefix='echovr-recording-'), 'bench.echorec')
+
+    def write():
+        with Recorder(path) as recorder:
+            for i, body in enumerate(bodies):
+                recorder.add(body, i / 60, documents[i]['game_clock'])
+
+    def seek():
+        with Recording(path) as recording:
+            for i in range(0, frames, frames // 20):
+                recording.frame(recording.seek_time(i / 60))
+
+    results = {f"recording.write[{frames}]": time_case(write, repeat)}
+    results[f"recording.open[{frames}]"] = time_case(lambda: Recording(path).close(), repeat)
+    results[f"recording.seek[{frames}]"] = time_case(seek, repeat)
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+    return results
+
+
+def history_cases(repeat, days=90):
+    """Adding six hours of polls to the history store, then summarizing months of it"""
+    directory = tempfile.mkdtemp(prefix='echovr-history-')
+    now = time.time()
+    runs = iter(range(repeat))
+
+    def append():
+        store = HistoryStore(os.path.join(directory, f"append-{next(runs)}.sqlite3"))
+        fill_history(store, 0.25, now)
+        store.close()
+
+    results = {"history.append[720]": time_case(append, repeat)}
+    store = HistoryStore(os.path.join(directory, 'months.sqlite3'))
+    fill_history(store, days, now)
+    results[f"history.compact[{days}d]"] = time_case(lambda: store.compact(now), repeat)
+    if analytics.np is not None:
+        results[f"history.summarize[{days}d]"] = time_case(
+            lambda: analytics.summarize(store, days, None, now), repeat)
+        results[f"history.summarize_mode[{days}d]"] = time_case(
+            lambda: analytics.summarize(store, days, 'echo_arena', now), repeat)
+    store.close()
+    shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def latency_cases(repeat, regions=16, delay=0.02):
+    """Probing regions regions that each answer after delay seconds, in parallel and one at a time"""
+    world = World(labels=10, seed=1, churn=0, region_latency={f"region{i}": delay for i in range(regions)})
+    server = serve(MatchesHandler, world, '127.0.0.1', 0)
+    template = f"http://127.0.0.1:{server.server_address[1]}/ping/{{region}}"
+    servers = [Server(f"{i:032X}.region{i}", 'echo_arena', True, (), None) for i in range(regions)]
+
+    def probe(workers):
+        prober = LatencyProber(template, workers=workers, rate=1000.0, samples=1)
+        prober.probe(servers)
+        prober.wait()
+        prober.close()
+
+    results = {
+        f"latency.parallel[{regions}]": time_case(lambda: probe(8), repeat),
+        f"latency.serial[{regions}]": time_case(lambda: probe(1), repeat),
+    }
+    server.shutdown()
+    server.server_close()
+    return results
+
+
+def gui_cases(sources, repeat):
+    """Render and selection timings with each card renderer; needs a display (e.g. Xvfb)"""
+    results = {}
+    for renderer, prefix in (('widgets', 'gui.'), ('canvas', 'gui.canvas_')):
+        os.environ['ECHOVR_CARD_RENDERER'] = renderer
+        try:
+            results.update(renderer_cases(sources, repeat, prefix))
+        finally:
+            del os.environ['ECHOVR_CARD_RENDERER']
+    return results
+
+
+def renderer_cases(sources, repeat, prefix):
+    import SpecateClient
+
+    results = {}
+    app = SpecateClient.EchoVRSpectatorGUI(autostart=False)
+    app.root.update()
+
+    def render(servers):
+        app.apply_servers(list(servers))
+        while app.render_steps is not None:
+            app.root.update()
+        app.root.update()
+
+    try:
+        for name, body in sources.items():
+            servers = decode(chunked(body))
+            # Cold: start from an empty list every time
+            def cold():
+                render([])
+                render(servers)
+            results[f"{prefix}render_cold[{name}]"] = time_case(cold, repeat)
+            # Warm: same snapshot again, the reconciler should touch nothing
+            render(servers)
+            results[f"{prefix}render_warm[{name}]"] = time_case(lambda: render(servers), repeat)
+            if servers:
+                results[f"{prefix}select[{name}]"] = time_case(
+                    lambda: (app.select_server(servers[0]), app.root.update()), repeat)
+            results[f"{prefix}widgets[{name}]"] = {'count': SpecateClient.count_widgets(app.root), 'unit': 'widgets'}
+            # Cards showing a score after the warm render; most synthetic
+            # arena servers carry one, so this is non-zero for every size
+            # drawn without the virtual list
+            results[f"{prefix}scored[{name}]"] = {'count': painted_scores(app), 'unit': 'cards'}
+    finally:
+        app.on_closing()
+    return results
+
+
+def painted_scores(app):
+    """Number of cards on screen that show a score"""
+    if app.card_renderer == 'canvas':
+        cards = app.server_scroll_frame.cards.values()
+    else:
+        cards = app.server_cards.values()
+    return sum(1 for card in cards if card.displayed.get('score') is not None)
+
+
+def confirm(regressions, sources, repeat, gui=False):
+    """Time the sources and case families with a slower median again; returns the new results
+
+    A shared or throttled machine can run at two thirds speed for seconds
+    to minutes at a time, long enough to cover every sample of a case. A
+    real slowdown shows up again; a slow spell may not.
+    """
+    slower = [case for case, metric, *_ in regressions if metric == 'median']
+    names = {case[case.index('[') + 1:-1] for case in slower if '[' in case}
+    again = {name: body for name, body in sources.items() if name in names}
+    results = headless_cases(again, repeat) if again else {}
+    families = {
+        'session.': session_cases,
+        'recording.': recording_cases,
+        'history.': history_cases,
+        'latency.': latency_cases,
+        'startup.': lambda repeat: startup_cases(repeat, gui),
+    }
+    for prefix, cases in families.items():
+        if any(case.startswith(prefix) for case in slower):
+            results.update(cases(repeat))
+    return results
+
+
+def compare(results, baseline, tolerance, min_time):
+    """Cases that got worse than baseline by more than tolerance
+
+    Timings whose baseline is under min_time seconds are too noisy to
+    compare and are skipped.
+    """
+    regressions = []
+    for case, value in results.items():
+        reference = baseline.get('results', {}).get(case)
+        if reference is None:
+            continue
+        for metric in ('median', 'peak', 'retained', 'count'):
+            if metric not in value or metric not in reference or not reference[metric]:
+                continue
+            if metric == 'median' and reference[metric] < min_time:
+                continue
+            ratio = value[metric] / reference[metric]
+            if ratio > 1 + tolerance:
+                regressions.append((case, metric, reference[metric], value[metric], ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--gui', action='store_true', help="also run Tk rendering cases")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SYNTHETIC_SIZES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="results file (default: benchmarks/results-<timestamp>.json)")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="allowed slowdown/growth before a case counts as a regression")
+    parser.add_argument('--min-time', type=float, default=0.001,
+                        help="ignore timings whose baseline is below this many seconds")
+    parser.add_argument('--confirm', type=int, default=2,
+                        help="times to re-measure a source whose timings regressed before reporting it")
+    parser.add_argument('--update-baseline', action='store_true')
+    args = parser.parse_args()
+
+    sources = load_sources(args.sizes)
+    results = headless_cases(sources, args.repeat)
+    results.update(session_cases(args.repeat))
+    results.update(recording_cases(args.repeat))
+    results.update(history_cases(args.repeat))
+    results.update(latency_cases(args.repeat))
+    results.update(startup_cases(args.repeat, args.gui))
+    if args.gui:
+        results.update(gui_cases(sources, args.repeat))
+
+    baseline = None
+    if not args.update_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for _ in range(args.confirm):
+            retimed = confirm(compare(results, baseline, args.tolerance, args.min_time), sources, args.repeat,
+                              args.gui)
+            if not retimed:
+                break
+            print(f"Re-measured {len(retimed)} cases next to ones that looked slower")
+            for case, value in retimed.items():
+                # The faster of the two runs: noise only ever adds time
+                if 'median' in value and value['median'] < results[case]['median']:
+                    results[case] = value
+
+    document = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'json_backend': records.JSON_BACKEND,
+        'results': results,
+    }
+    output = args.output or os.path.join(HERE, time.strftime('results-%Y%m%d-%H%M%S.json'))
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+    for case, value in results.items():
+        shown = {k: v for k, v in value.items() if k != 'unit'}
+        print(f"{case:<40} {value['unit']:>7} {shown}")
+    print(f"Results written to {output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print("No baseline to compare against (run with --update-baseline)")
+        return 0
+    regressions = compare(results, baseline, args.tolerance, args.min_time)
+    for case, metric, before, after, ratio in regressions:
+        print(f"REGRESSION {case} {metric}: {before:.6g} -> {after:.6g} ({ratio:.2f}x)")
+    if not regressions:
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Synthetic /status/matches payloads for benchmarks"""
+import json
+import math
+import random
+
+# Rough share of each mode in a busy evening's label list
+MODE_WEIGHTS = {
+    'echo_arena': 0.25,
+    'echo_combat': 0.10,
+    'social_2.0': 0.35,
+    'echo_arena_private': 0.20,
+    'echo_combat_private': 0.10,
+}
+
+_NAME_PARTS = ['Echo', 'Disc', 'Boost', 'Nova', 'Orbit', 'Flux', 'Pulse', 'Drift',
+               'Vortex', 'Comet', 'Zero', 'Halo', 'Rift', 'Spark', 'Glide', 'Volt']
+
+
+def make_player(rng, team):
+    """One player entry as the matches API reports it"""
+    name = f"{rng.choice(_NAME_PARTS)}{rng.choice(_NAME_PARTS)}{rng.randint(1, 9999)}"
+    return {
+        'user_id': f"{rng.getrandbits(128):032x}",
+        'display_name': name,
+        'username': name.lower(),
+        'team': team,
+        'party_id': f"{rng.getrandbits(64):016x}" if rng.random() < 0.2 else '',
+    }
+
+
+def make_label(rng, index):
+    """One server label with a realistic player and score distribution"""
+    mode = rng.choices(list(MODE_WEIGHTS), weights=list(MODE_WEIGHTS.values()))[0]
+    player_count = min(14, int(rng.triangular(0, 14, 9)))
+    players = []
+    for slot in range(player_count):
+        if slot < 8:
+            team = 'blue' if slot % 2 == 0 else 'orange'
+        else:
+            team = rng.choice(['blue', 'orange', 'spectator'])
+        players.append(make_player(rng, team))
+    label = {
+        'id': f"{rng.getrandbits(128):032x}.node{index % 16}",
+        'open': player_count < 8 and rng.random() < 0.8,
+        'lobby_type': 'public' if not mode.endswith('private') else 'private',
+        'mode': mode,
+        'level': 'mpl_arena_a' if 'arena' in mode else 'mpl_combat_dyson',
+        'size': player_count,
+        'max_size': 14,
+        'start_time': f"2024-01-01T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+        'players': players,
+    }
+    if rng.random() < 0.85:
+        label['game_state'] = {
+            'blue_score': rng.randint(0, 12),
+            'orange_score': rng.randint(0, 12),
+            'round_clock': rng.uniform(0, 300),
+            'status': rng.choice(['playing', 'round_start', 'score', 'pre_match']),
+        }
+    return label
+
+
+def make_matches(count, seed=0):
+    """A /status/matches document with count labels"""
+    rng = random.Random(seed)
+    return {'labels': [make_label(rng, i) for i in range(count)]}
+
+
+def make_payload(count, seed=0):
+    """The encoded response body for make_matches(count, seed)"""
+    return json.dumps(make_matches(count, seed), separators=(',', ':')).encode()
+
+
+def chunked(body, size=65536):
+    """Split body into chunks the way iter_content would"""
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+class HistoryServer:
+    """The fields HistoryStore.append reads from a Server"""
+    __slots__ = ('id', 'mode', 'open', 'player_count', 'free_slots', 'started')
+
+    def __init__(self, id, mode, started):
+        self.id = id
+        self.mode = mode
+        self.started = started
+        self.open = True
+        self.player_count = 0
+        self.free_slots = 8
+
+
+def fill_history(store, days, now, servers=40, seed=0):
+    """Append days of lists ending at now, at the resolution compaction would leave
+
+    Population follows a daily cycle; servers start, fill up and end.
+    Snapshots are 30s apart for the last week and 10 minutes apart before.
+    """
+    rng = random.Random(seed)
+    live = []
+    when = now - days * 86400
+    while when < now:
+        step = 30 if now - when < 7 * 86400 else 600
+        evening = 0.5 + 0.5 * math.cos((when % 86400 - 20 * 3600) / 86400 * 2 * math.pi)
+        target = int(servers * (0.2 + 0.8 * evening))
+        live = [s for s in live if rng.random() > step / 1800]
+        while len(live) < target:
+            mode = 'echo_arena' if rng.random() < 0.7 else 'echo_combat'
+            live.append(HistoryServer(f"{rng.getrandbits(128):032x}.node{len(live) % 16}", mode, when))
+        for server in live:
+            if rng.random() < step / 120:
+                server.player_count = max(0, min(14, server.player_count + rng.randint(-1, 3)))
+                server.free_slots = max(0, 8 - server.player_count)
+                server.open = server.free_slots > 0
+        store.append(live, when)
+        when += step
+    store.flush()
@@ -0,0 +1 @@
+"""Tkinter-free building blocks for the EchoVR server browser"""
@@ -0,0 +1,5 @@
+import sys
+
+from echovr.cli import main
+
+sys.exit(main())
@@ -0,0 +1,147 @@
+"""Aggregates over the history store, computed with NumPy
+
+Population samples are weighted by their span. Without NumPy, summarize()
+raises HistoryError and the History view says so.
+"""
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from echovr.history import DAY, HistoryError
+
+QUANTILES = (0.1, 0.5, 0.9)
+WEEKDAYS = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+
+def local_hour_weekday(times):
+    """Local hour (0-23) and weekday (Monday is 0) of each epoch time"""
+    days = np.floor_divide(times, DAY).astype(np.int64)
+    unique, inverse = np.unique(days, return_inverse=True)
+    # One UTC offset per calendar day is close enough and keeps this vectorized
+    offsets = np.array([time.localtime(day * DAY + DAY // 2).tm_gmtoff for day in unique.tolist()],
+                       dtype=np.float64)
+    local = times + offsets[inverse]
+    hours = (np.floor_divide(local, 3600) % 24).astype(np.int64)
+    weekdays = ((np.floor_divide(local, DAY) + 3) % 7).astype(np.int64)
+    return hours, weekdays
+
+
+def weighted_quantiles(values, weights, cells, count, quantiles=QUANTILES):
+    """(count, len(quantiles)) array of weighted quantiles of values per cell, NaN for empty cells
+
+    Sorts once by (cell, value) and finds every quantile of every cell
+    with a single searchsorted over the per-cell cumulative weights.
+    """
+    quantiles = np.asarray(quantiles, dtype=np.float64)
+    result = np.full((count, len(quantiles)), np.nan)
+    if not len(values):
+        return result
+    order = np.lexsort((values, cells))
+    values, weights, cells = values[order], weights[order], cells[order]
+    totals = np.bincount(cells, weights, minlength=count)
+    before = np.cumsum(totals) - totals
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = (np.cumsum(weights) - before[cells]) / totals[cells]
+    # Cell c occupies keys (2c, 2c + 1], so cells never overlap
+    keys = 2 * cells + np.nan_to_num(fraction)
+    targets = 2 * np.arange(count)[:, None] + quantiles[None, :]
+    index = np.minimum(np.searchsorted(keys, targets.ravel()), len(values) - 1).reshape(targets.shape)
+    filled = totals > 0
+    result[filled] = values[index[filled]]
+    return result
+
+
+def population_samples(store, since, mode=None):
+    """(time, span, players, servers, open servers) arrays of the snapshots since since"""
+    if mode:
+        rows = store.query(
+            "SELECT s.time, s.span, coalesce(p.players, 0), coalesce(p.servers, 0), coalesce(p.open, 0) "
+            "FROM snapshots s LEFT JOIN populations p ON p.snapshot = s.id AND p.mode = ? WHERE s.time >= ?",
+            (mode, since))
+    else:
+        rows = store.query("SELECT time, span, players, servers, open FROM snapshots WHERE time >= ?", (since,))
+    return np.array(rows, dtype=np.float64).reshape(-1, 5).T
+
+
+def _minutes_histogram(store, expression, where, since, mode=None):
+    """(minutes, servers) arrays: how many servers had expression fall in each whole minute"""
+    rows = store.query(
+        f"SELECT CAST(({expression}) / 60 AS INTEGER), count(*) FROM servers "
+        f"WHERE censored = 0 AND first_seen >= ? AND {where}" + (" AND mode = ?" if mode else "") + " GROUP BY 1",
+        (since,) + ((mode,) if mode else ()))
+    table = np.array(rows, dtype=np.float64).reshape(-1, 2)
+    return np.maximum(table[:, 0], 0.0), table[:, 1]
+
+
+def server_outcomes(store, since, mode=None):
+    """Lifetimes of ended servers and times to fill, as per-minute histograms
+
+    Bucketing in SQLite keeps the rows read in the hundreds even with a
+    hundred thousand servers on record.
+    """
+    lifetimes = _minutes_histogram(store, "last_seen - first_seen", "ended = 1", since, mode)
+    fill_times = _minutes_histogram(store, "first_full - first_seen", "first_full IS NOT NULL", since, mode)
+    counts = store.query(
+        "SELECT count(*), coalesce(sum(ended), 0), coalesce(sum(ended AND first_full IS NOT NULL), 0) "
+        "FROM servers WHERE censored = 0 AND first_seen >= ?" + (" AND mode = ?" if mode else ""),
+        (since,) + ((mode,) if mode else ()))[0]
+    return lifetimes, fill_times, counts
+
+
+def _quantiles(histogram, quantiles=QUANTILES):
+    """Quantiles in seconds of a (minutes, count) histogram, None if it is empty"""
+    minutes, counts = histogram
+    if not counts.sum():
+        return [None] * len(quantiles)
+    cells = np.zeros(len(minutes), dtype=np.int64)
+    return (weighted_quantiles(minutes, counts, cells, 1, quantiles)[0] * 60).tolist()
+
+
+def _listed(array):
+    """Nested lists with NaN as None, for JSON and the Tk view"""
+    return np.where(np.isnan(array), None, np.round(array, 1)).tolist()
+
+
+def summarize(store, days=30, mode=None, now=None):
+    """Population by hour and weekday, server lifetimes and fill times over the last days"""
+    if np is None:
+        raise HistoryError("NumPy is not installed")
+    start = time.perf_counter()
+    now = time.time() if now is None else now
+    since = now - days * DAY
+
+    times, spans, players, servers, open_servers = population_samples(store, since, mode)
+    hours, weekdays = local_hour_weekday(times)
+    hourly = weighted_quantiles(players, spans, hours, 24)
+    weekly = weighted_quantiles(players, spans, weekdays * 24 + hours, 7 * 24, (0.5,)).reshape(7, 24)
+    watched = spans.sum()
+
+    lifetimes, fill_times, (servers_seen, ended, ended_full) = server_outcomes(store, since, mode)
+    return {
+        'days': days,
+        'mode': mode,
+        'snapshots': len(times),
+        'watched_hours': watched / 3600,
+        'players': {
+            'mean': float(np.average(players, weights=spans)) if watched else None,
+            'peak': int(players.max()) if len(players) else None,
+            'peak_time': float(times[players.argmax()]) if len(players) else None,
+            'servers_mean': float(np.average(servers, weights=spans)) if watched else None,
+            'open_mean': float(np.average(open_servers, weights=spans)) if watched else None,
+        },
+        'quantiles': list(QUANTILES),
+        'hourly': _listed(hourly),
+        'weekly': _listed(weekly),
+        'lifetime': {'servers': ended, 'quantiles': _quantiles(lifetimes)},
+        'fill': {
+            'servers': servers_seen,
+            'filled': int(fill_times[1].sum()),
+            # Of the servers that are gone, the share that was ever full
+            'filled_share': ended_full / ended if ended else None,
+            'quantiles': _quantiles(fill_times),
+        },
+        'elapsed': time.perf_counter() - start,
+    }
@@ -0,0 +1,132 @@
+"""Last good server list, kept on disk for an instant first paint
+
+The file is gzip-compressed JSON holding a format version, the time the
+snapshot was fetched and one compact row per server. Writes go to a
+temporary file that is then renamed over the old one, so a crash mid-save
+leaves the previous snapshot intact. Anything unreadable, from another
+format version, or older than max_age is ignored (and a corrupt file is
+removed), so a bad cache only ever costs the instant paint.
+"""
+import gzip
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+
+from echovr.records import GameState, Player, Server
+
+FORMAT_VERSION = 2
+CACHE_FILE = 'snapshot.json.gz'
+# Snapshots older than this are not worth showing, even marked stale
+MAX_AGE = 7 * 24 * 3600
+
+log = logging.getLogger(__name__)
+
+
+def default_cache_dir():
+    """Per-user cache directory; ECHOVR_CACHE_DIR overrides it"""
+    override = os.environ.get('ECHOVR_CACHE_DIR')
+    if override:
+        return override
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+        return os.path.join(base, 'EchoVR-Server-Browser')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Caches/EchoVR-Server-Browser')
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'echovr-server-browser')
+
+
+def _row(server):
+    return [server.id, server.mode, server.open,
+            [[p.user_id, p.display_name, p.team] for p in server.players],
+            list(server.score) if server.score is not None else None,
+            server.started, server.region, server.endpoint]
+
+
+def _server(row):
+    id, mode, open, players, score, started, region, endpoint = row
+    return Server(id, mode, bool(open),
+                  tuple(Player(user_id, name, team) for user_id, name, team in players),
+                  GameState(*score) if score else None,
+                  float(started), region, endpoint)
+
+
+class CachedSnapshot:
+    """Servers loaded from the cache and when they were fetched"""
+    __slots__ = ('servers', 'saved')
+
+    def __init__(self, servers, saved):
+        self.servers = servers
+        self.saved = saved
+
+    @property
+    def age(self):
+        return max(0.0, time.time() - self.saved)
+
+
+class SnapshotCache:
+    """Load and save the last good server list"""
+    def __init__(self, directory=None, max_age=MAX_AGE):
+        self.directory = directory or default_cache_dir()
+        self.path = os.path.join(self.directory, CACHE_FILE)
+        self.max_age = max_age
+
+    def save(self, servers, saved=None):
+        """Write servers as the cached snapshot; returns False if it could not be written"""
+        document = {
+            'format': FORMAT_VERSION,
+            'saved': time.time() if saved is None else saved,
+            'servers': [_row(server) for server in servers],
+        }
+        data = gzip.compress(json.dumps(document, separators=(',', ':')).encode(), compresslevel=5)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("Could not write snapshot cache %s: %s", self.path, e)
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return False
+        return True
+
+    def load(self):
+        """The cached CachedSnapshot, or None if there is no usable one"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            log.warning("Could not read snapshot cache %s: %s", self.path, e)
+            return None
+
+        try:
+            document = json.loads(gzip.decompress(data))
+            if document.get('format') != FORMAT_VERSION:
+                log.info("Ignoring snapshot cache in format %r", document.get('format'))
+                return None
+            saved = float(document['saved'])
+            servers = [_server(row) for row in document['servers']]
+        except (OSError, EOFError, zlib.error, ValueError, TypeError, KeyError, AttributeError) as e:
+            log.warning("Discarding corrupt snapshot cache %s: %s", self.path, e)
+            self.clear()
+            return None
+
+        if time.time() - saved > self.max_age:
+            log.info("Snapshot cache is older than %ds, ignoring it", self.max_age)
+            return None
+        return CachedSnapshot(servers, saved)
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
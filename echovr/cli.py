@@ -0,0 +1,376 @@
+"""Command line front end for the server browser
+
+    python -m echovr [--probe-url URL] list [--json] [--latency]
+    python -m echovr watch [--interval 30] [--deltas] [--history]
+    python -m echovr join <server id> [--ip 127.0.0.1] [--port 6721] [--password PW]
+                          [--when-open [--timeout 600] [--interval 3]]
+    python -m echovr session [--rate 30] [--every 0.5] [--duration 0] [--json]
+    python -m echovr record <file> [--rate 60] [--duration 0]
+    python -m echovr replay <file> [--speed 1] [--start 0 | --clock 180 --round 0] [--loop] [--info]
+    python -m echovr history [--days 30] [--mode echo_arena] [--json]
+
+`list --latency` (or --sort lowest_latency) also measures the round trip
+to each server's region, through --probe-url with {region} in it
+(default $ECHOVR_PROBE_URL), see echovr.latency.
+
+`watch` prints one JSON document per line (NDJSON) whenever the list
+changed. Without --deltas each line is a full snapshot; with it, the
+first line is a snapshot and every later line lists the events since the
+previous one (servers added/removed, open flips, score changes, players
+joining or leaving a team, other shown changes), see echovr.deltas. With --history every
+poll is also added to the history store the browser keeps.
+
+`join --when-open` waits for a full or locked server: it polls only that
+server every --interval seconds and joins the moment a slot opens, giving
+up after --timeout seconds or when the server is gone (see echovr.watcher).
+
+`session` streams /session from the local API at --rate Hz and prints the
+newest frame every --every seconds, with how many frames arrived and how
+many were skipped in between (see echovr.session). `record` writes every
+frame to a recording file and `replay` serves one back as /session on
+--ip:--port, so the browser's live panel (or `session`) can watch it
+as if the game were running (see echovr.recording).
+
+`history` summarizes that store: players by hour of the day, how long
+servers run and how fast they fill (see echovr.analytics, needs NumPy).
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from echovr.core import BrowserCore, DEFAULT_API_IP, DEFAULT_API_PORT, MATCHES_URL, sort_servers
+from echovr.deltas import DeltaEngine
+from echovr.history import HistoryError, HistoryStore
+from echovr.http_client import HttpStatusError
+from echovr.latency import LatencyProber, format_latency
+from echovr.polling import PollScheduler, parse_retry_after
+from echovr.ranking import DEFAULT_ORDER, ORDERS
+from echovr.recording import Recorder, Recording, RecordingError, Replay, serve_replay
+from echovr.session import MAX_RATE, MIN_RATE, STREAMING
+from echovr.watcher import JOINED, MAX_BACKOFF, WATCH_INTERVAL, WATCH_TIMEOUT, JoinWatcher
+
+
+def emit(document, out=sys.stdout):
+    out.write(json.dumps(document, separators=(',', ':')) + '\n')
+    out.flush()
+
+
+def cmd_list(core, args):
+    servers = core.fetch_servers()
+    latency = args.latency or args.sort == 'lowest_latency'
+    if latency:
+        prober = LatencyProber(args.probe_url)
+        if not prober.probe(servers):
+            print("Nothing to probe: the servers carry no endpoint and no --probe-url is set", file=sys.stderr)
+        prober.wait(timeout=30)
+        prober.annotate(servers)
+        prober.close()
+    sort_servers(servers, args.sort)
+    if args.json:
+        emit({'servers': [s.to_dict() for s in servers]})
+        return 0
+    for server in servers:
+        status = "OPEN" if server.open else "CLOSED"
+        score = f"{server.score[0]}-{server.score[1]}" if server.score else ""
+        ping = f"{format_latency(server.latency):>7}  " if latency else ""
+        print(f"{server.short_id:<12} {server.mode_title:<7} {status:<6} {server.player_count:>2} players  {ping}{score}")
+    print(f"{len(servers)} servers")
+    return 0
+
+
+def cmd_watch(core, args):
+    poller = PollScheduler(args.interval, idle=args.interval * 2, max_backoff=600)
+    engine = DeltaEngine()
+    history = HistoryStore() if args.history else None
+    try:
+        while True:
+            try:
+                servers = core.fetch_servers()
+            except HttpStatusError as e:
+                poller.record_failure(parse_retry_after(e.headers.get('Retry-After')))
+                emit({'time': time.time(), 'error': str(e)}, sys.stderr)
+                servers = None
+            except Exception as e:
+                poller.record_failure()
+                emit({'time': time.time(), 'error': str(e)}, sys.stderr)
+                servers = None
+            else:
+                # None means 304: nothing changed since the last poll
+                delta = engine.apply(servers) if servers is not None else None
+                poller.record_success(bool(delta))
+                if history is not None:
+                    if delta:
+                        history.append(servers)
+                    else:
+                        history.touch()
+                # The first snapshot is printed even when empty, so an empty
+                # list does not look like a watch that never got an answer
+                if delta or (delta is not None and delta.version == 1):
+                    if args.deltas and delta.version > 1:
+                        emit(dict(time=time.time(), type='delta', **delta.to_dict()))
+                    else:
+                        sort_servers(servers, args.sort)
+                        emit({'time': time.time(), 'type': 'snapshot', 'version': delta.version,
+                              'servers': [s.to_dict() for s in servers]})
+            time.sleep(poller.next_interval())
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        if history is not None:
+            history.close()
+
+
+def cmd_join(core, args):
+    if not core.check_api_connection():
+        print(f"Cannot connect to EchoVR API at {core.api_base_url}. Make sure EchoVR is running.",
+              file=sys.stderr)
+        return 2
+    if args.when_open:
+        return wait_and_join(core, args)
+    response = core.join_session(args.server_id, args.password)
+    if response.status_code != 200:
+        print(f"Failed to join server: {response.text}", file=sys.stderr)
+        return 1
+    print(f"Joining server: {args.server_id.split('.')[0].upper()}")
+    return 0
+
+
+def wait_and_join(core, args):
+    short_id = args.server_id.split('.')[0].upper()
+    found = core.fetch_sessions({short_id})
+    if short_id not in found:
+        print(f"Server {short_id} is not listed", file=sys.stderr)
+        return 1
+    watcher = JoinWatcher(core, interval=args.interval, timeout=args.timeout, password=args.password)
+    watcher.add(found[short_id])
+    print(f"Waiting for a slot on {short_id} (up to {args.timeout:.0f}s)", file=sys.stderr)
+    try:
+        while True:
+            for event in watcher.poll():
+                if event.outcome == JOINED:
+                    print(f"Joining server: {short_id}")
+                    return 0
+                print(f"Stopped waiting on {short_id}: {event.outcome}"
+                      + (f" ({event.detail})" if event.detail else ""), file=sys.stderr)
+                return 1
+            if watcher.last_error:
+                print(f"Poll failed: {watcher.last_error}", file=sys.stderr)
+            time.sleep(watcher.next_interval())
+    except KeyboardInterrupt:
+        return 130
+
+
+def cmd_session(core, args):
+    stream = core.session_stream(rate=args.rate)
+    stream.start()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    last_state = None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(args.every)
+            frame = stream.take()
+            stats = stream.stats()
+            if frame is None:
+                if stats['state'] != last_state and stats['state'] != STREAMING:
+                    emit({'time': time.time(), 'state': stats['state'], 'error': stream.last_error}, sys.stderr)
+                last_state = stats['state']
+                continue
+            last_state = stats['state']
+            if args.json:
+                emit({'time': time.time(), 'stats': stats, 'frame': frame.to_dict()})
+                continue
+            possession = frame.possession
+            holder = f"{possession[1]} ({possession[0]})" if possession else "-"
+            print(f"{frame.clock_display:>8}  {frame.blue_points:>2}-{frame.orange_points:<2} "
+                  f"{frame.status:<11} {frame.player_count:>2} players  possession: {holder:<24} "
+                  f"{stats['measured_hz']:4.0f} Hz  {stats['poll_ms']:5.1f}ms  {stats['dropped']} skipped",
+                  flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+    return 0
+
+
+def cmd_record(core, args):
+    stream = core.session_stream(rate=args.rate)
+    recorder = Recorder(args.path, {'source': core.api_base_url, 'rate': stream.rate})
+    stream.taps.append(recorder.add_frame)
+    stream.start()
+    deadline = time.monotonic() + args.duration if args.duration else None
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            time.sleep(min(1.0, args.duration) if args.duration else 1.0)
+            print(f"\r{recorder.frames} frames  {recorder.size / 1024:.0f} KiB  ({stream.state})   ",
+                  end='', file=sys.stderr, flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.stop()
+        recorder.close()
+    print(file=sys.stderr)
+    size = recorder.size
+    ratio = recorder.raw_bytes / size if size else 0
+    print(f"{args.path}: {recorder.frames} frames, {recorder.round + 1 if recorder.frames else 0} rounds, "
+          f"{size / 1024:.0f} KiB ({ratio:.1f}x smaller than the raw frames)")
+    return 0
+
+
+def cmd_replay(core, args):
+    try:
+        recording = Recording(args.path)
+    except (OSError, RecordingError) as e:
+        print(f"Cannot open recording: {e}", file=sys.stderr)
+        return 1
+    with recording:
+        if args.info:
+            emit(recording.summary())
+            return 0
+        if args.clock is not None:
+            position = recording.seek_clock(args.clock, args.round)
+        else:
+            position = recording.seek_time(args.start)
+        replay = Replay(recording, args.speed, position, args.loop)
+        server = serve_replay(replay, args.ip, args.port)
+        print(f"Replaying {recording.frames - position} of {recording.frames} frames "
+              f"({recording.duration:.0f}s) at {args.speed:g}x on http://{args.ip}:{args.port}/session",
+              file=sys.stderr)
+        try:
+            while not replay.finished:
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.shutdown()
+    return 0
+
+
+def format_minutes(seconds):
+    return "-" if seconds is None else f"{seconds / 60:.0f} min"
+
+
+def cmd_history(core, args):
+    from echovr import analytics
+    store = HistoryStore()
+    try:
+        summary = analytics.summarize(store, args.days, args.mode)
+        stats = store.stats()
+    except HistoryError as e:
+        print(f"History is not available: {e}", file=sys.stderr)
+        return 1
+    finally:
+        store.close()
+    if args.json:
+        emit(dict(summary, store=stats))
+        return 0
+    print(f"{stats['path']}: {stats['snapshots']} snapshots, {stats['servers']} servers, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MiB")
+    if not summary['watched_hours']:
+        print(f"No history in the last {args.days} days")
+        return 0
+    players = summary['players']
+    print(f"Last {args.days} days, {summary['watched_hours']:.0f} hours watched: "
+          f"{players['mean']:.0f} players on average, peak {players['peak']}")
+    lifetime = summary['lifetime']
+    print(f"Server lifetime over {lifetime['servers']} servers: "
+          + "  ".join(f"p{q * 100:.0f} {format_minutes(value)}"
+                      for q, value in zip(summary['quantiles'], lifetime['quantiles'])))
+    fill = summary['fill']
+    share = f"{fill['filled_share']:.0%}" if fill['filled_share'] is not None else "-"
+    print(f"Time to fill ({share} of servers fill up): "
+          + "  ".join(f"p{q * 100:.0f} {format_minutes(value)}"
+                      for q, value in zip(summary['quantiles'], fill['quantiles'])))
+    print("hour  " + "".join(f"{'p' + format(q * 100, '.0f'):>7}" for q in summary['quantiles']))
+    for hour, values in enumerate(summary['hourly']):
+        print(f"{hour:02d}    " + "".join(f"{'-' if v is None else format(v, '.0f'):>7}" for v in values))
+    print(f"Computed in {summary['elapsed'] * 1000:.0f}ms")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='echovr', description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default=MATCHES_URL, help="server list endpoint")
+    parser.add_argument('--debug', action='store_true', help="debug logging on stderr")
+    parser.add_argument('--sort', choices=list(ORDERS), default=DEFAULT_ORDER, help="server order")
+    parser.add_argument('--probe-url', default=os.environ.get('ECHOVR_PROBE_URL'),
+                        help="latency probe URL with {region} in it")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    list_parser = commands.add_parser('list', help="print the current server list")
+    list_parser.add_argument('--json', action='store_true', help="one JSON document instead of a table")
+    list_parser.add_argument('--latency', action='store_true', help="probe and show the round trip to each region")
+    list_parser.set_defaults(func=cmd_list)
+
+    watch_parser = commands.add_parser('watch', help="poll and print NDJSON snapshots")
+    watch_parser.add_argument('--interval', type=float, default=30, help="base poll interval in seconds")
+    watch_parser.add_argument('--deltas', action='store_true', help="print changes instead of full snapshots")
+    watch_parser.add_argument('--history', action='store_true', help="also add every poll to the history store")
+    watch_parser.set_defaults(func=cmd_watch)
+
+    join_parser = commands.add_parser('join', help="join a server through the local EchoVR API")
+    join_parser.add_argument('server_id')
+    join_parser.add_argument('--ip', default=DEFAULT_API_IP)
+    join_parser.add_argument('--port', type=int, default=DEFAULT_API_PORT)
+    join_parser.add_argument('--password', default="")
+    join_parser.add_argument('--when-open', action='store_true', help="wait for a free slot, then join")
+    join_parser.add_argument('--timeout', type=float, default=WATCH_TIMEOUT, help="seconds to wait for a slot")
+    join_parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                             help=f"seconds between polls while waiting (backs off to {MAX_BACKOFF}s on errors)")
+    join_parser.set_defaults(func=cmd_join)
+
+    session_parser = commands.add_parser('session', help="stream live match state from the local EchoVR API")
+    session_parser.add_argument('--ip', default=DEFAULT_API_IP)
+    session_parser.add_argument('--port', type=int, default=DEFAULT_API_PORT)
+    session_parser.add_argument('--rate', type=int, default=30, help=f"polls per second, {MIN_RATE}-{MAX_RATE}")
+    session_parser.add_argument('--every', type=float, default=0.5, help="seconds between printed frames")
+    session_parser.add_argument('--duration', type=float, default=0, help="stop after this many seconds, 0 to run until ^C")
+    session_parser.add_argument('--json', action='store_true', help="NDJSON frames with stream stats")
+    session_parser.set_defaults(func=cmd_session)
+
+    record_parser = commands.add_parser('record', help="record /session frames from the local EchoVR API")
+    record_parser.add_argument('path')
+    record_parser.add_argument('--ip', default=DEFAULT_API_IP)
+    record_parser.add_argument('--port', type=int, default=DEFAULT_API_PORT)
+    record_parser.add_argument('--rate', type=int, default=MAX_RATE, help=f"frames per second, {MIN_RATE}-{MAX_RATE}")
+    record_parser.add_argument('--duration', type=float, default=0, help="stop after this many seconds, 0 to run until ^C")
+    record_parser.set_defaults(func=cmd_record)
+
+    replay_parser = commands.add_parser('replay', help="serve a recording as /session")
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--ip', default=DEFAULT_API_IP, help="address to serve on")
+    replay_parser.add_argument('--port', type=int, default=DEFAULT_API_PORT)
+    replay_parser.add_argument('--speed', type=float, default=1.0, help="playback speed, 2 for twice as fast")
+    replay_parser.add_argument('--start', type=float, default=0, help="seconds into the recording to start at")
+    replay_parser.add_argument('--clock', type=float, help="start where the game clock reads this (seconds)")
+    replay_parser.add_argument('--round', type=int, default=0, help="round --clock refers to, from 0")
+    replay_parser.add_argument('--loop', action='store_true', help="start over at the end")
+    replay_parser.add_argument('--info', action='store_true', help="print what the recording holds and exit")
+    replay_parser.set_defaults(func=cmd_replay)
+
+    history_parser = commands.add_parser('history', help="summarize the stored server list history")
+    history_parser.add_argument('--days', type=int, default=30, help="how far back to look")
+    history_parser.add_argument('--mode', help="only this mode, e.g. echo_arena")
+    history_parser.add_argument('--json', action='store_true', help="one JSON document instead of a table")
+    history_parser.set_defaults(func=cmd_history)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    debug = args.debug or os.environ.get('ECHOVR_DEBUG')
+    logging.basicConfig(level=logging.DEBUG if debug else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+                        stream=sys.stderr)
+    core = BrowserCore(matches_url=args.url,
+                       api_ip=getattr(args, 'ip', DEFAULT_API_IP),
+                       api_port=getattr(args, 'port', DEFAULT_API_PORT))
+    try:
+        return args.func(core, args)
+    except HttpStatusError as e:
+        print(str(e), file=sys.stderr)
+        return 1
+    finally:
+        core.close()
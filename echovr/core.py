@@ -0,0 +1,191 @@
+"""Server browser logic without any UI
+
+BrowserCore fetches and decodes the public match list, orders it the way
+the browser shows it, and talks to the EchoVR API on the local machine
+(/session and /join_session). Every method blocks; the GUI runs them on
+its network loop, the CLI calls them directly.
+"""
+import logging
+import time
+
+from echovr import records
+from echovr.http_client import HttpClient, HttpStatusError
+from echovr.match_stream import LabelStream
+from echovr.ranking import DEFAULT_ORDER, sort_key
+from echovr.records import Server
+
+MATCHES_URL = "https://g.echovrce.com/status/matches"
+# Modes shown in the browser; everything else is dropped while decoding
+SUPPORTED_MODES = ('echo_arena', 'echo_combat')
+STREAM_CHUNK_SIZE = 65536
+DEFAULT_API_IP = "127.0.0.1"
+DEFAULT_API_PORT = 6721
+
+log = logging.getLogger(__name__)
+
+
+def sort_servers(servers, order=DEFAULT_ORDER):
+    """Sort servers in place by one of ranking.ORDERS (open first by default)"""
+    servers.sort(key=sort_key(order))
+    return servers
+
+
+def snapshot_signature(servers):
+    """Cheap fingerprint of what the list shows, to tell if a poll changed anything"""
+    return hash(tuple((s.id, s.open, s.player_count, s.score) for s in servers))
+
+
+class BrowserCore:
+    """Fetching, filtering, sorting and joining for one browser instance"""
+    def __init__(self, http=None, api_ip=DEFAULT_API_IP, api_port=DEFAULT_API_PORT,
+                 matches_url=MATCHES_URL, modes=SUPPORTED_MODES):
+        self.http = http or HttpClient()
+        self.matches_url = matches_url
+        self.modes = modes
+        self.set_api_address(api_ip, api_port)
+
+    def set_api_address(self, ip, port):
+        """Point the core at the EchoVR API on ip:port"""
+        self.api_ip = ip
+        self.api_port = int(port)
+        self.api_base_url = f"http://{self.api_ip}:{self.api_port}"
+
+    def fetch_servers(self, trace=None):
+        """Fetch, filter and decode the server list
+
+        Returns None when the list is unchanged since the last fetch (304).
+        Raises HttpStatusError for any other non-200 answer. If trace (a
+        metrics.RefreshTrace) is given, the network and decode stages are
+        recorded on it.
+        """
+        clock = time.perf_counter
+        start = clock()
+        response = self.http.get(self.matches_url, timeout=10, conditional=True, stream=True)
+        if trace is not None:
+            trace.add('connect', clock() - start)
+            trace.status = response.status_code
+        with response:
+            if response.status_code == 304:
+                log.debug("Server list unchanged (304), skipping update")
+                return None
+
+            if response.status_code != 200:
+                raise HttpStatusError(response.status_code, response.headers)
+
+            # Labels for other modes are skipped as raw bytes while the
+            # body streams in, so they are never decoded.
+            stream = LabelStream(self.modes, loads=records.loads)
+            servers = []
+            chunks = response.iter_content(chunk_size=STREAM_CHUNK_SIZE)
+            try:
+                while True:
+                    start = clock()
+                    chunk = next(chunks, None)
+                    decoded = clock()
+                    if trace is not None:
+                        trace.add('transfer', decoded - start)
+                    if chunk is None:
+                        break
+                    labels = stream.feed(chunk)
+                    built = clock()
+                    servers.extend(Server.from_label(label) for label in labels)
+                    if trace is not None:
+                        trace.bytes += len(chunk)
+                        trace.add('decode', built - decoded)
+                        trace.add('build', clock() - built)
+                    if stream.done:
+                        break
+                if stream.seen and not stream.done:
+                    raise ValueError("Truncated server list response")
+            except ValueError:
+                self.http.invalidate(self.matches_url)
+                raise
+
+        if trace is not None:
+            trace.labels_seen = stream.seen
+            trace.labels_kept = stream.kept
+        log.debug("Raw data received. Total labels: %d", stream.seen)
+
+        if log.isEnabledFor(logging.DEBUG):
+            arena_count = 0
+            combat_count = 0
+
+            for i, server in enumerate(servers):
+                mode = server.mode
+                log.debug("Server %d: mode='%s', open=%s, players=%d", i, mode, server.open, server.player_count)
+
+                if mode == 'echo_arena':
+                    arena_count += 1
+                else:
+                    combat_count += 1
+
+            log.debug("Filtered servers: %d (Arena: %d, Combat: %d)", len(servers), arena_count, combat_count)
+
+        return servers
+
+    def fetch_sessions(self, sessions, timeout=10, conditional=False):
+        """The listed servers of the given short ids, as {short_id: Server}
+
+        Only the labels of those sessions are decoded. With conditional,
+        returns None if the list is unchanged (304) since the last
+        conditional call for the same sessions. Those validators are kept
+        apart from fetch_servers', so neither swallows the other's change.
+        """
+        key = f"{self.matches_url}#sessions={','.join(sorted(sessions))}"
+        response = self.http.get(self.matches_url, timeout=timeout, conditional=conditional, key=key,
+                                 stream=True)
+        with response:
+            if response.status_code == 304:
+                return None
+            if response.status_code != 200:
+                raise HttpStatusError(response.status_code, response.headers)
+            stream = LabelStream(self.modes, loads=records.loads, sessions=sessions)
+            found = {}
+            # Read to the end even once every session turned up, so the
+            # connection goes back to the pool for the next poll
+            for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                for label in stream.feed(chunk):
+                    server = Server.from_label(label)
+                    found[server.short_id] = server
+                if stream.done:
+                    break
+            if not stream.done:
+                self.http.invalidate(key)
+                raise ValueError("Truncated server list response")
+        return found
+
+    def check_api_connection(self, timeout=2):
+        """True if the local EchoVR API answers /session"""
+        try:
+            response = self.http.get(f"{self.api_base_url}/session", timeout=timeout)
+            return response.status_code == 200
+        except Exception:
+            return False
+
+    def probe_api(self, ip, port, timeout=2):
+        """GET /session on an arbitrary API address and return the response"""
+        return self.http.get(f"http://{ip}:{port}/session", timeout=timeout)
+
+    def session_stream(self, **kwargs):
+        """A SessionStream (not yet started) on the configured API address"""
+        from echovr.session import SessionStream
+        return SessionStream(self.api_ip, self.api_port, **kwargs)
+
+    def join_session(self, session_id, password="", timeout=5, retry_stale=False):
+        """Ask the local API to join session_id; returns the response
+
+        session_id may be a full label id ('abcd....node') or the short id
+        shown in the browser. The POST goes out on the pooled connection
+        that check_api_connection keeps warm; pass retry_stale when the API
+        is known to be up, so a socket it closed while idle is retried once
+        instead of failing the join.
+        """
+        join_data = {
+            "session_id": session_id.split('.')[0].upper(),
+            "password": password,
+        }
+        return self.http.post(f"{self.api_base_url}/join_session", json=join_data, timeout=timeout,
+                              retry_stale=retry_stale)
+
+    def close(self):
+        self.http.close()
@@ -0,0 +1,151 @@
+"""What changed between two server list snapshots
+
+DeltaEngine remembers the last snapshot by server id and turns each new
+one into a Delta: a version number plus a flat list of events. Both
+snapshots are walked once, so the cost is linear in servers plus players.
+"""
+from collections import namedtuple
+
+# Event kinds
+ADDED = 'added'        # new: the Server
+REMOVED = 'removed'    # old: the Server
+OPEN = 'open'          # old/new: bool
+SCORE = 'score'        # old/new: (blue, orange) or None
+JOINED = 'joined'      # team, player
+LEFT = 'left'          # team, player
+UPDATED = 'updated'    # old/new: the Server; any other shown change (names, order, region)
+
+Event = namedtuple('Event', 'kind server_id team player old new')
+
+
+def _event(kind, server_id, team=None, player=None, old=None, new=None):
+    return Event(kind, server_id, team, player, old, new)
+
+
+def roster(server):
+    """{(player key, team): Player} for a server; the key is user_id, else the name"""
+    return {(p.user_id or p.display_name, p.team): p for p in server.players}
+
+
+def lineup(server):
+    """Ordered (player key, team, name) triples; equal lineups mean no player events"""
+    return tuple([(p.user_id or p.display_name, p.team, p.display_name) for p in server.players])
+
+
+class Delta:
+    """Events that turn snapshot version-1 into snapshot version"""
+    __slots__ = ('version', 'events', 'added', 'removed', 'changed')
+
+    def __init__(self, version, events):
+        self.version = version
+        self.events = events
+        self.added = {e.server_id for e in events if e.kind == ADDED}
+        self.removed = {e.server_id for e in events if e.kind == REMOVED}
+        # Servers present in both snapshots with at least one event
+        self.changed = {e.server_id for e in events} - self.added - self.removed
+
+    def __bool__(self):
+        return bool(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+    def for_server(self, server_id):
+        return [e for e in self.events if e.server_id == server_id]
+
+    def counts(self):
+        """kind -> number of events, with 'opened'/'closed' split out of 'open'"""
+        counts = {}
+        for e in self.events:
+            kind = e.kind
+            if kind == OPEN:
+                kind = 'opened' if e.new else 'closed'
+            counts[kind] = counts.get(kind, 0) + 1
+        return counts
+
+    def summary(self):
+        """Short text such as '2 new, 1 opened, 3 joined', '' when nothing changed"""
+        counts = self.counts()
+        parts = []
+        for kind, label in (('added', 'new'), ('removed', 'gone'), ('opened', 'opened'),
+                            ('closed', 'closed'), ('score', 'scores'), ('joined', 'joined'),
+                            ('left', 'left'), ('updated', 'updated')):
+            if counts.get(kind):
+                parts.append(f"{counts[kind]} {label}")
+        return ", ".join(parts)
+
+    def to_dict(self):
+        events = []
+        for e in self.events:
+            event = {'kind': e.kind, 'server_id': e.server_id}
+            if e.kind in (ADDED, REMOVED, UPDATED):
+                event['server'] = (e.new or e.old).to_dict()
+            elif e.kind in (JOINED, LEFT):
+                event['team'] = e.team
+                event['player'] = {'user_id': e.player.user_id, 'display_name': e.player.display_name}
+            else:
+                event['old'] = list(e.old) if isinstance(e.old, tuple) else e.old
+                event['new'] = list(e.new) if isinstance(e.new, tuple) else e.new
+            events.append(event)
+        return {'version': self.version, 'events': events}
+
+
+class DeltaEngine:
+    """Diffs each snapshot against the previous one"""
+    def __init__(self):
+        self.version = 0
+        self.servers = {}
+        self._lineups = {}
+
+    def apply(self, servers):
+        """Take servers as the new snapshot and return the Delta from the last one"""
+        previous = self.servers
+        previous_lineups = self._lineups
+        current = {}
+        lineups = {}
+        events = []
+        for server in servers:
+            server_id = server.id
+            if server_id in current:
+                continue
+            current[server_id] = server
+            old = previous.get(server_id)
+            if old is None:
+                events.append(_event(ADDED, server_id, new=server))
+                continue
+            if old is server:
+                if server_id in previous_lineups:
+                    lineups[server_id] = previous_lineups[server_id]
+                continue
+            if old.open != server.open:
+                events.append(_event(OPEN, server_id, old=old.open, new=server.open))
+            if old.score != server.score:
+                events.append(_event(SCORE, server_id, old=old.score, new=server.score))
+            updated = (old.mode != server.mode or old.started != server.started
+                       or old.region != server.region or old.endpoint != server.endpoint)
+            old_lineup = previous_lineups.get(server_id)
+            if old_lineup is None:
+                old_lineup = lineup(old)
+            new_lineup = lineups[server_id] = lineup(server)
+            if old_lineup != new_lineup:
+                count = len(events)
+                old_roster = roster(old)
+                new_roster = roster(server)
+                for key, player in old_roster.items():
+                    if key not in new_roster:
+                        events.append(_event(LEFT, server_id, team=key[1], player=player))
+                for key, player in new_roster.items():
+                    if key not in old_roster:
+                        events.append(_event(JOINED, server_id, team=key[1], player=player))
+                # A rename or a reorder within a team keeps every roster key
+                updated = updated or len(events) == count
+            if updated:
+                events.append(_event(UPDATED, server_id, old=old, new=server))
+        for server_id, server in previous.items():
+            if server_id not in current:
+                events.append(_event(REMOVED, server_id, old=server))
+
+        self.servers = current
+        self._lineups = lineups
+        self.version += 1
+        return Delta(self.version, events)
@@ -0,0 +1,353 @@
+"""Every server list the browser has seen, kept in a local SQLite database
+
+A snapshot is stored when a poll returns a different list; unchanged polls
+only extend its span. Snapshots are thinned per DOWNSAMPLE and deleted
+after RETENTION. Tables:
+
+    snapshots     id, time, span, and servers, open servers and players
+    populations   the same counts per snapshot and mode
+    observations  players and open flag per snapshot and server
+    servers       one row per server id: mode, first/last seen, first full
+
+A server is 'censored' if it was already running, with no known start,
+when watching began, and 'ended' once a later poll no longer lists it.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from echovr.cache import default_cache_dir
+
+SCHEMA_VERSION = 1
+HISTORY_FILE = 'history.sqlite3'
+# Buffered snapshots written per transaction, and the longest they wait
+BATCH_SNAPSHOTS = 10
+FLUSH_SECONDS = 300
+# A poll further than this from the previous one means the browser was not
+# watching in between: the last snapshot's span ends at the previous poll
+GAP = 15 * 60
+DAY = 24 * 3600
+# (age, bucket): snapshots older than age keep one per bucket seconds
+DOWNSAMPLE = ((7 * DAY, 10 * 60), (90 * DAY, 3600))
+RETENTION = 180 * DAY
+COMPACT_EVERY = 6 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    time REAL NOT NULL,
+    span REAL NOT NULL,
+    servers INTEGER NOT NULL,
+    open INTEGER NOT NULL,
+    players INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots (time);
+CREATE TABLE IF NOT EXISTS populations (
+    snapshot INTEGER NOT NULL,
+    mode TEXT NOT NULL,
+    servers INTEGER NOT NULL,
+    open INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    PRIMARY KEY (snapshot, mode)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS servers (
+    id INTEGER PRIMARY KEY,
+    server_id TEXT NOT NULL UNIQUE,
+    mode TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    first_full REAL,
+    censored INTEGER NOT NULL,
+    ended INTEGER NOT NULL DEFAULT 0
+);
+-- Covering, so lifetime queries never touch the table itself
+CREATE INDEX IF NOT EXISTS servers_mode ON servers (mode, first_seen, censored, ended, last_seen, first_full);
+CREATE INDEX IF NOT EXISTS servers_first_seen ON servers (first_seen, censored, ended, last_seen, first_full);
+CREATE TABLE IF NOT EXISTS observations (
+    snapshot INTEGER NOT NULL,
+    server INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    open INTEGER NOT NULL,
+    PRIMARY KEY (snapshot, server)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_server ON observations (server, snapshot);
+"""
+
+log = logging.getLogger(__name__)
+
+
+class HistoryError(Exception):
+    """The history database could not be opened or read"""
+
+
+class _Snapshot:
+    """A list waiting in the write buffer"""
+    __slots__ = ('time', 'end', 'rows', 'populations', 'after_gap')
+
+    def __init__(self, when, rows, populations, after_gap):
+        self.time = when
+        # Last poll that still returned this list
+        self.end = when
+        # (server id, mode, players, open, full, started) per server
+        self.rows = rows
+        # {mode: [servers, open servers, players]}
+        self.populations = populations
+        # First list after the browser was not watching
+        self.after_gap = after_gap
+
+
+class HistoryStore:
+    """Append-only store of server lists with downsampling
+
+    The database is opened on first use, so creating a store costs
+    nothing at startup. All methods may be called from any thread.
+    """
+    def __init__(self, path=None, batch=BATCH_SNAPSHOTS):
+        self.path = path or os.path.join(default_cache_dir(), HISTORY_FILE)
+        self.batch = batch
+        self.failed = None
+        self.closed = False
+        self._conn = None
+        self._lock = threading.RLock()
+        self._buffer = []
+        # The newest list; its span grows with every poll that returns it
+        self._current = None
+        self._last_poll = None
+        # Server ids on the last written snapshot, and database row ids
+        self._previous = set()
+        self._ids = {}
+        self._compacted = 0.0
+
+    def _connection(self):
+        if self._conn is not None:
+            return self._conn
+        if self.failed is not None:
+            raise HistoryError(self.failed)
+        if self.closed:
+            raise HistoryError(f"{self.path}: closed")
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version not in (0, SCHEMA_VERSION):
+                conn.close()
+                raise HistoryError(f"schema version {version}, expected {SCHEMA_VERSION}")
+            # Only takes effect before the first table is created
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        except (OSError, sqlite3.Error, HistoryError) as e:
+            self.failed = f"{self.path}: {e}"
+            log.warning("History disabled: %s", self.failed)
+            raise HistoryError(self.failed) from e
+        self._conn = conn
+        return conn
+
+    def append(self, servers, when=None):
+        """Record servers as the list current at when (default now)"""
+        when = time.time() if when is None else when
+        rows = []
+        populations = {}
+        for server in servers:
+            rows.append((server.id, server.mode, server.player_count, server.open,
+                         server.free_slots == 0, server.started))
+            population = populations.get(server.mode)
+            if population is None:
+                population = populations[server.mode] = [0, 0, 0]
+            population[0] += 1
+            population[1] += server.open
+            population[2] += server.player_count
+        with self._lock:
+            if self.closed:
+                return
+            after_gap = self._last_poll is None or when - self._last_poll > GAP
+            self._close_current(when)
+            self._current = _Snapshot(when, rows, populations, after_gap)
+            self._last_poll = when
+            if self._buffer and (len(self._buffer) >= self.batch or when - self._buffer[0].time >= FLUSH_SECONDS):
+                self.flush()
+            if when - self._compacted >= COMPACT_EVERY and self.failed is None:
+                try:
+                    self.compact(when)
+                except (HistoryError, sqlite3.Error) as e:
+                    log.warning("History compaction failed: %s", e)
+
+    def touch(self, when=None):
+        """A poll returned the same list again"""
+        when = time.time() if when is None else when
+        with self._lock:
+            if self.closed:
+                return
+            current = self._current
+            if current is not None and when - current.end > GAP:
+                # Not watched in between: the same list now counts as news
+                self._close_current(when)
+                self._current = _Snapshot(when, current.rows, current.populations, True)
+            elif current is not None:
+                current.end = when
+            self._last_poll = when
+
+    def _close_current(self, when):
+        """Move the newest list to the write buffer; it stood until when"""
+        current, self._current = self._current, None
+        if current is None:
+            return
+        if when - current.end <= GAP:
+            current.end = when
+        self._buffer.append(current)
+
+    def flush(self):
+        """Write the buffered snapshots in one transaction"""
+        with self._lock:
+            snapshots, self._buffer = self._buffer, []
+            if not snapshots:
+                return
+            try:
+                conn = self._connection()
+            except HistoryError:
+                return
+            start = time.perf_counter()
+            try:
+                with conn:
+                    observations = self._write(conn, snapshots)
+            except sqlite3.Error as e:
+                log.warning("History: dropped %d snapshots: %s", len(snapshots), e)
+                # Row ids cached during the rolled back transaction are gone,
+                # and ended servers are only looked up among cached ids
+                self._ids = {}
+                self._previous = set()
+                return
+            log.debug("History: wrote %d snapshots, %d observations in %.1fms", len(snapshots),
+                      observations, (time.perf_counter() - start) * 1000)
+
+    def _row_id(self, conn, server_id, mode, first_seen, censored):
+        row_id = self._ids.get(server_id)
+        if row_id is None:
+            row = conn.execute("SELECT id FROM servers WHERE server_id = ?", (server_id,)).fetchone()
+            if row is None:
+                row_id = conn.execute(
+                    "INSERT INTO servers (server_id, mode, first_seen, last_seen, censored) VALUES (?, ?, ?, ?, ?)",
+                    (server_id, mode, first_seen, first_seen, censored)).lastrowid
+            else:
+                row_id = row[0]
+            self._ids[server_id] = row_id
+        return row_id
+
+    def _write(self, conn, snapshots):
+        observations = []
+        populations = []
+        last_seen = {}
+        first_full = {}
+        ended = []
+        previous = self._previous
+        for snapshot in snapshots:
+            totals = [sum(column) for column in zip(*snapshot.populations.values())] or [0, 0, 0]
+            snapshot_id = conn.execute(
+                "INSERT INTO snapshots (time, span, servers, open, players) VALUES (?, ?, ?, ?, ?)",
+                (snapshot.time, snapshot.end - snapshot.time, *totals)).lastrowid
+            listed = set()
+            for server_id, mode, players, open, full, started in snapshot.rows:
+                # Already running when we started watching, since who knows when
+                censored = not started and snapshot.after_gap
+                row_id = self._row_id(conn, server_id, mode, started or snapshot.time, int(censored))
+                listed.add(server_id)
+                observations.append((snapshot_id, row_id, players, open))
+                last_seen[row_id] = snapshot.end
+                if full and row_id not in first_full:
+                    first_full[row_id] = snapshot.time
+            for mode, (count, open, players) in snapshot.populations.items():
+                populations.append((snapshot_id, mode, count, open, players))
+            if not snapshot.after_gap:
+                ended.extend(self._ids[server_id] for server_id in previous - listed)
+            previous = listed
+
+        conn.executemany("INSERT INTO observations (snapshot, server, players, open) VALUES (?, ?, ?, ?)",
+                         observations)
+        conn.executemany("INSERT INTO populations (snapshot, mode, servers, open, players) VALUES (?, ?, ?, ?, ?)",
+                         populations)
+        conn.executemany("UPDATE servers SET last_seen = max(last_seen, ?) WHERE id = ?",
+                         [(seen, row_id) for row_id, seen in last_seen.items()])
+        conn.executemany("UPDATE servers SET first_full = ? WHERE id = ? AND first_full IS NULL",
+                         [(at, row_id) for row_id, at in first_full.items()])
+        conn.executemany("UPDATE servers SET ended = 1 WHERE id = ?", [(row_id,) for row_id in ended])
+        self._previous = previous
+        # A server that is gone does not come back; only keep ids still listed
+        self._ids = {server_id: self._ids[server_id] for server_id in previous}
+        return len(observations)
+
+    def compact(self, now=None):
+        """Thin out old snapshots and drop expired ones; returns how many were removed"""
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._connection()
+            self._compacted = now
+            start = time.perf_counter()
+            cutoff = now - RETENTION
+            doomed = [row[0] for row in conn.execute("SELECT id FROM snapshots WHERE time < ?", (cutoff,))]
+            spans = []
+            ages = [age for age, _ in DOWNSAMPLE] + [RETENTION]
+            for (age, bucket), older in zip(DOWNSAMPLE, ages[1:]):
+                kept = None
+                for snapshot_id, at, span in conn.execute(
+                        "SELECT id, time, span FROM snapshots WHERE time >= ? AND time < ? ORDER BY time",
+                        (now - older, now - age)):
+                    key = at // bucket
+                    if kept is not None and kept[0] == key:
+                        # Dropped; the snapshot kept for the bucket stands for it too
+                        kept[2] += span
+                        kept[3] = True
+                        doomed.append(snapshot_id)
+                        continue
+                    if kept is not None and kept[3]:
+                        spans.append((kept[2], kept[1]))
+                    kept = [key, snapshot_id, span, False]
+                if kept is not None and kept[3]:
+                    spans.append((kept[2], kept[1]))
+            if doomed:
+                ids = [(snapshot_id,) for snapshot_id in doomed]
+                with conn:
+                    conn.executemany("DELETE FROM observations WHERE snapshot = ?", ids)
+                    conn.executemany("DELETE FROM populations WHERE snapshot = ?", ids)
+                    conn.executemany("DELETE FROM snapshots WHERE id = ?", ids)
+                    conn.executemany("UPDATE snapshots SET span = ? WHERE id = ?", spans)
+                    conn.execute("DELETE FROM servers WHERE last_seen < ?", (cutoff,))
+                conn.execute("PRAGMA incremental_vacuum")
+            log.debug("History: compacted away %d snapshots in %.1fms", len(doomed),
+                      (time.perf_counter() - start) * 1000)
+            return len(doomed)
+
+    def query(self, sql, params=()):
+        """All rows of a read-only query, buffered snapshots included"""
+        with self._lock:
+            self.flush()
+            return self._connection().execute(sql, params).fetchall()
+
+    def stats(self):
+        snapshots, first, last = self.query("SELECT count(*), min(time), max(time) FROM snapshots")[0]
+        servers = self.query("SELECT count(*) FROM servers")[0][0]
+        try:
+            size = sum(os.path.getsize(self.path + suffix) for suffix in ('', '-wal') if os.path.exists(self.path + suffix))
+        except OSError:
+            size = 0
+        return {'path': self.path, 'snapshots': snapshots, 'servers': servers,
+                'first': first, 'last': last, 'bytes': size}
+
+    def close(self):
+        """Write everything still buffered and close the database for good"""
+        with self._lock:
+            if self.closed:
+                return
+            current, self._current = self._current, None
+            if current is not None:
+                self._buffer.append(current)
+            self.flush()
+            self.closed = True
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,134 @@
+"""Shared HTTP client with per-host keep-alive pools and conditional GETs"""
+import threading
+import time
+from collections import deque, namedtuple
+from urllib.parse import urlsplit
+
+# One finished request as seen by the client
+RequestTiming = namedtuple('RequestTiming', 'method url status elapsed size started')
+
+
+class HttpStatusError(Exception):
+    """An upstream answered with a status the caller cannot use"""
+    def __init__(self, status, headers=None):
+        super().__init__(f"API Error: {status}")
+        self.status = status
+        self.headers = headers or {}
+
+
+class HttpClient:
+    """Pool of keep-alive Sessions, one per scheme://host:port
+    
+    Every request goes through the host's Session so the TCP connection
+    (and TLS session for g.echovrce.com) is reused between polls. GETs made
+    with conditional=True remember the ETag/Last-Modified of the last 200
+    and send them back, so an unchanged resource comes back as a bodyless
+    304. Timings of the most recent requests are kept in self.timings.
+    """
+    def __init__(self, pool_maxsize=4, max_timings=200, user_agent="EchoVR-Server-Browser"):
+        self.pool_maxsize = pool_maxsize
+        self.user_agent = user_agent
+        self.timings = deque(maxlen=max_timings)
+        self._sessions = {}
+        self._validators = {}
+        self._lock = threading.Lock()
+
+    def session_for(self, url):
+        """Return the pooled Session for the host of url"""
+        parts = urlsplit(url)
+        key = f"{parts.scheme}://{parts.netloc}"
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                # requests (with urllib3, ssl, certifi) is the heaviest
+                # import in the app; the first request happens on a network
+                # worker, so loading it here keeps it off the startup path.
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                # Each Session only talks to one host, so one pool with a few
+                # sockets covers the poller, the API check and a join at once.
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self.pool_maxsize,
+                                      max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update({
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Connection': 'keep-alive',
+                    'User-Agent': self.user_agent,
+                })
+                self._sessions[key] = session
+            return session
+
+    def get(self, url, timeout, conditional=False, key=None, **kwargs):
+        """GET url, optionally as a conditional request
+        
+        The validators are kept under key (default url), so callers that
+        read the same URL for different purposes do not answer each other's
+        304s.
+        """
+        headers = kwargs.pop('headers', None) or {}
+        key = key or url
+        if conditional:
+            etag, last_modified = self._validators.get(key, (None, None))
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        response = self.request('GET', url, timeout=timeout, headers=headers, **kwargs)
+        if conditional and response.status_code == 200:
+            validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            if any(validators):
+                self._validators[key] = validators
+        return response
+
+    def post(self, url, timeout, **kwargs):
+        """POST to url"""
+        return self.request('POST', url, timeout=timeout, **kwargs)
+
+    def request(self, method, url, timeout, retry_stale=False, **kwargs):
+        """Send a request through the host's Session and record its timing
+        
+        With retry_stale, a request whose connection broke before an answer
+        came back is sent once more: the pooled keep-alive socket it went
+        out on may have been closed by the other end while idle. Connect
+        timeouts are not retried.
+        """
+        session = self.session_for(url)
+        if not retry_stale:
+            return self._send(session, method, url, timeout, kwargs)
+        import requests
+        try:
+            return self._send(session, method, url, timeout, kwargs)
+        except requests.ConnectionError as e:
+            if isinstance(e, requests.ConnectTimeout):
+                raise
+            return self._send(session, method, url, timeout, kwargs)
+
+    def _send(self, session, method, url, timeout, kwargs):
+        started = time.time()
+        start = time.perf_counter()
+        status = None
+        size = 0
+        try:
+            response = session.request(method, url, timeout=timeout, **kwargs)
+            status = response.status_code
+            size = len(response.content) if not kwargs.get('stream') else 0
+            return response
+        finally:
+            self.timings.append(RequestTiming(method, url, status,
+                                              time.perf_counter() - start,
+                                              size, started))
+
+    def invalidate(self, key):
+        """Forget the validators kept under key (a url by default)"""
+        self._validators.pop(key, None)
+
+    def close(self):
+        """Close every pooled Session"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
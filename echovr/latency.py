@@ -0,0 +1,204 @@
+"""Round-trip latency to the servers' regions, probed in parallel
+
+One target is probed per region or endpoint, not per server:
+
+    endpoint   host:port     time to open a TCP connection
+    region     probe URL     time for GET <template with {region}> to answer
+
+Without a probe URL, servers that only carry a region are not measured.
+"""
+import http.client
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+from echovr.netcore import DaemonWorkers
+
+PROBE_WORKERS = 8
+# Probes started per second, on average
+PROBE_RATE = 4.0
+PROBE_SAMPLES = 3
+PROBE_TIMEOUT = 2.0
+# Seconds a measurement is trusted; failures are retried sooner
+PROBE_TTL = 300.0
+FAILED_TTL = 60.0
+
+
+def measure(target, samples=PROBE_SAMPLES, timeout=PROBE_TIMEOUT):
+    """Best round trip to target in seconds; raises OSError or HTTPException if unreachable"""
+    if target.startswith(('http://', 'https://')):
+        return _measure_http(target, samples, timeout)
+    host, _, port = target.rpartition(':')
+    best = None
+    for _ in range(samples):
+        start = time.perf_counter()
+        sock = socket.create_connection((host, int(port)), timeout)
+        rtt = time.perf_counter() - start
+        sock.close()
+        best = rtt if best is None else min(best, rtt)
+    return best
+
+
+def _measure_http(url, samples, timeout):
+    parts = urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = connection_class(parts.netloc, timeout=timeout)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    best = None
+    try:
+        # The first request pays for the connection; min() discards it
+        for _ in range(samples + 1):
+            start = time.perf_counter()
+            conn.request('GET', path)
+            response = conn.getresponse()
+            response.read()
+            rtt = time.perf_counter() - start
+            if response.status >= 400:
+                raise http.client.HTTPException(f"probe answered {response.status}")
+            best = rtt if best is None else min(best, rtt)
+    finally:
+        conn.close()
+    return best
+
+
+def format_latency(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+
+class RateLimiter:
+    """Token bucket: rate calls a second on average, up to burst at once"""
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until a call may go ahead"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Taking a token the bucket does not have yet reserves the next
+            # one, so waiting callers go in order, 1/rate apart
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+
+
+class Latency:
+    """One probe result; rtt is None if the target did not answer"""
+    __slots__ = ('rtt', 'error', 'measured')
+
+    def __init__(self, rtt, error, measured):
+        self.rtt = rtt
+        self.error = error
+        self.measured = measured
+
+
+class LatencyProber:
+    """Measures and caches latency per region or endpoint
+
+    probe() may be called on every refresh; it only queues targets that
+    have no fresh result and are not already being probed. on_result is
+    called on a probe thread with (key, Latency) after each probe.
+    """
+    def __init__(self, template=None, workers=PROBE_WORKERS, rate=PROBE_RATE, ttl=PROBE_TTL,
+                 samples=PROBE_SAMPLES, timeout=PROBE_TIMEOUT, on_result=None):
+        self.template = template
+        self.ttl = ttl
+        self.samples = samples
+        self.timeout = timeout
+        self.on_result = on_result
+        self.results = {}
+        self.probes = 0
+        self.failures = 0
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._limiter = RateLimiter(rate, burst=workers)
+        self._workers = DaemonWorkers(workers, 'latency')
+        self._started = False
+
+    def target(self, server):
+        """(cache key, probe target) for server, or None if it cannot be probed"""
+        if server.endpoint:
+            return server.endpoint, server.endpoint
+        if self.template and server.region:
+            return server.region, self.template.format(region=server.region)
+        return None
+
+    def result(self, server):
+        """Latest Latency for server's target, fresh or not, or None"""
+        target = self.target(server)
+        return self.results.get(target[0]) if target is not None else None
+
+    def annotate(self, servers):
+        """Copy cached round trips onto server.latency; returns how many changed"""
+        results = self.results
+        changed = 0
+        for server in servers:
+            target = self.target(server)
+            result = results.get(target[0]) if target is not None else None
+            rtt = result.rtt if result is not None else None
+            if server.latency != rtt:
+                server.latency = rtt
+                changed += 1
+        return changed
+
+    def probe(self, servers):
+        """Queue a probe for each target of servers without a fresh result; returns how many"""
+        now = time.monotonic()
+        due = {}
+        with self._lock:
+            for server in servers:
+                target = self.target(server)
+                if target is None or target[0] in self._pending or target[0] in due:
+                    continue
+                result = self.results.get(target[0])
+                if result is not None and now - result.measured < (self.ttl if result.rtt is not None else FAILED_TTL):
+                    continue
+                due[target[0]] = target[1]
+            self._pending.update(due)
+        if due and not self._started:
+            self._workers.start()
+            self._started = True
+        for key, target in due.items():
+            self._workers.submit(self._probe, (key, target), {})
+        return len(due)
+
+    def _probe(self, key, target):
+        self._limiter.wait()
+        try:
+            rtt, error = measure(target, self.samples, self.timeout), None
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            rtt, error = None, str(e) or type(e).__name__
+        result = Latency(rtt, error, time.monotonic())
+        with self._lock:
+            self.results[key] = result
+            self._pending.discard(key)
+            self.probes += 1
+            self.failures += rtt is None
+        if self.on_result is not None:
+            self.on_result(key, result)
+
+    def wait(self, timeout=None):
+        """Block until nothing is queued or being probed; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        return {'targets': len(self.results), 'pending': len(self._pending),
+                'probes': self.probes, 'failures': self.failures}
+
+    def close(self):
+        if self._started:
+            self._workers.shutdown()
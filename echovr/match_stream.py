@@ -0,0 +1,183 @@
+"""Incremental decoding of the /status/matches body
+
+The response is a single JSON object whose "labels" array holds one object
+per server. Instead of materializing the whole document, LabelStream scans
+the raw bytes for the boundaries of each label object and only hands the
+ones whose mode is wanted to the JSON decoder. Labels for private, social
+and other modes are skipped as raw bytes, so peak memory is bounded by the
+kept servers plus the largest single label. The same goes for labels
+outside a set of sessions, which is how the auto-join watcher decodes
+only the few servers it is waiting on.
+"""
+import json
+import re
+
+# Start of the labels array in the top-level object
+_LABELS_START = re.compile(rb'"labels"\s*:\s*\[')
+# Characters that matter while scanning an object outside of a string
+_STRUCTURAL = re.compile(rb'[{}"]')
+# Characters that matter inside a string
+_STRING_SPECIAL = re.compile(rb'[\\"]')
+# A complete JSON string
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+
+
+def _object_pattern(depth):
+    """Regex for a complete object nested at most depth levels deep"""
+    inner = _STRING
+    if depth > 1:
+        inner = rb'(?:' + _STRING + rb'|' + _object_pattern(depth - 1) + rb')'
+    return rb'\{[^{}"]*(?:' + inner + rb'[^{}"]*)*\}'
+
+
+# Whole label objects in one C-level match. Labels nest player and
+# game_state objects two deep; anything deeper, or a label split across
+# chunks, falls back to the byte scanner below.
+_LABEL_OBJECT = re.compile(_object_pattern(4))
+# Every "mode": "<value>" pair in a raw label, nested ones included
+_MODE_VALUE = re.compile(rb'"mode"\s*:\s*"([^"\\]*)"')
+# Every "id": "<session>[.node]" pair, capturing the session part
+_ID_SESSION = re.compile(rb'"id"\s*:\s*"([^".\\]*)')
+
+_WHITESPACE = b' \t\r\n,'
+
+
+class LabelStream:
+    """Push parser that turns body chunks into decoded label objects
+
+    Feed it the response body piece by piece; each call returns the labels
+    completed by that piece. With modes set, labels whose top-level "mode"
+    is not in modes are dropped before they are decoded; with sessions (a
+    set of short ids, as Server.short_id) so are labels of other sessions.
+    """
+    def __init__(self, modes=None, loads=json.loads, sessions=None):
+        self.modes = None if modes is None else {m.encode() for m in modes}
+        self.sessions = None if sessions is None else {s.upper().encode() for s in sessions}
+        self.loads = loads
+        self.seen = 0
+        self.kept = 0
+        self.done = False
+        self._buffer = bytearray()
+        self._in_array = False
+        self._object_start = None
+        self._scan_pos = 0
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, data):
+        """Consume a chunk of the body and return the labels it completed"""
+        if self.done:
+            return []
+        self._buffer += data
+        labels = []
+
+        if not self._in_array:
+            match = _LABELS_START.search(self._buffer)
+            if match is None:
+                # Keep enough of the tail to match a key split across chunks
+                del self._buffer[:-32]
+                return labels
+            del self._buffer[:match.end()]
+            self._in_array = True
+
+        buf = self._buffer
+        pos = self._scan_pos
+        end = len(buf)
+        while True:
+            if self._object_start is None:
+                while pos < end and buf[pos] in _WHITESPACE:
+                    pos += 1
+                if pos >= end:
+                    break
+                if buf[pos] == 0x5D:  # ]
+                    self.done = True
+                    pos += 1
+                    break
+                if buf[pos] != 0x7B:  # {
+                    raise ValueError(f"Unexpected byte {bytes(buf[pos:pos + 1])!r} in labels array")
+                match = _LABEL_OBJECT.match(buf, pos)
+                if match is not None:
+                    label = self._decode(buf, pos, match.end())
+                    if label is not None:
+                        labels.append(label)
+                    pos = match.end()
+                    continue
+                self._object_start = pos
+                self._depth = 1
+                pos += 1
+
+            pos = self._scan_object(buf, pos, end)
+            if self._depth:
+                break
+
+            label = self._decode(buf, self._object_start, pos)
+            if label is not None:
+                labels.append(label)
+            self._object_start = None
+
+        # Drop everything before the object still being scanned
+        consumed = pos if self._object_start is None else self._object_start
+        del buf[:consumed]
+        self._scan_pos = pos - consumed
+        if self._object_start is not None:
+            self._object_start = 0
+        return labels
+
+    def _scan_object(self, buf, pos, end):
+        """Advance through the current object; returns the resume position"""
+        while self._depth:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buf, pos)
+                if match is None:
+                    return end
+                pos = match.start()
+                if buf[pos] == 0x5C:  # backslash escapes the next byte
+                    if pos + 1 >= end:
+                        return pos
+                    pos += 2
+                    continue
+                self._in_string = False
+                pos += 1
+                continue
+
+            match = _STRUCTURAL.search(buf, pos)
+            if match is None:
+                return end
+            pos = match.end()
+            char = buf[match.start()]
+            if char == 0x22:  # "
+                self._in_string = True
+            elif char == 0x7B:  # {
+                self._depth += 1
+            else:
+                self._depth -= 1
+        return pos
+
+    def _decode(self, buf, start, end):
+        """Decode one raw label, or return None if its mode or session is not wanted"""
+        self.seen += 1
+        raw = bytes(buf[start:end])
+        # Nested "mode" or "id" keys can only cause a label to be decoded
+        # and checked, never a wanted label to be dropped.
+        modes = self.modes
+        if modes is not None and not any(m.group(1) in modes for m in _MODE_VALUE.finditer(raw)):
+            return None
+        sessions = self.sessions
+        if sessions is not None and not any(m.group(1).upper() in sessions for m in _ID_SESSION.finditer(raw)):
+            return None
+        label = self.loads(raw)
+        if modes is not None and label.get('mode', '').encode() not in modes:
+            return None
+        if sessions is not None and label.get('id', '').split('.')[0].upper().encode() not in sessions:
+            return None
+        self.kept += 1
+        return label
+
+
+def iter_labels(chunks, modes=None, loads=json.loads, sessions=None):
+    """Yield labels one at a time from an iterable of body chunks"""
+    stream = LabelStream(modes, loads, sessions)
+    for chunk in chunks:
+        yield from stream.feed(chunk)
+        if stream.done:
+            return
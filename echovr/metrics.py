@@ -0,0 +1,177 @@
+"""Per-refresh timing traces kept in a bounded ring buffer, and latency histograms"""
+import io
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+# Stages of one refresh, in pipeline order. Mode filtering happens inside
+# the streaming decoder, so it is part of 'decode'.
+STAGES = ('connect', 'transfer', 'decode', 'build', 'sort', 'render')
+# Upper edges of the join (click to API answer) buckets in seconds; one
+# more open-ended bucket catches everything slower
+JOIN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def percentile(values, q):
+    """Linear-interpolated q-th percentile of values (0-100)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+class RefreshTrace:
+    """Timings and counters collected while one snapshot is fetched and drawn
+
+    connect is the time until response headers arrive, which covers DNS,
+    TCP and TLS whenever the pooled connection had to be re-opened.
+    """
+    __slots__ = ('started', 'stages', 'status', 'bytes', 'labels_seen', 'labels_kept',
+                 'widgets', 'stall', 'render_wall', 'error', 'superseded')
+
+    def __init__(self):
+        self.started = time.time()
+        self.stages = {}
+        self.status = None
+        self.bytes = 0
+        self.labels_seen = 0
+        self.labels_kept = 0
+        self.widgets = None
+        self.stall = None
+        self.render_wall = None
+        self.error = None
+        self.superseded = False
+
+    def add(self, stage, seconds):
+        """Accumulate seconds spent in stage"""
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @property
+    def total(self):
+        return sum(self.stages.values())
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class MetricsRecorder:
+    """Ring buffer of the most recent RefreshTraces, safe to share across threads"""
+    def __init__(self, capacity=500):
+        self.traces = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def record(self, trace):
+        with self._lock:
+            self.traces.append(trace)
+
+    def snapshot(self):
+        """Copy of the buffered traces, oldest first"""
+        with self._lock:
+            return list(self.traces)
+
+    def summary(self):
+        """last/p50/p95 for every stage and counter over the buffer"""
+        traces = [t for t in self.snapshot() if t.error is None]
+        series = {stage: [t.stages[stage] for t in traces if stage in t.stages] for stage in STAGES}
+        series['total'] = [t.total for t in traces]
+        series['render_wall'] = [t.render_wall for t in traces if t.render_wall is not None]
+        series['stall'] = [t.stall for t in traces if t.stall is not None]
+        series['bytes'] = [t.bytes for t in traces if t.bytes]
+        series['labels_seen'] = [t.labels_seen for t in traces if t.labels_seen]
+        series['labels_kept'] = [t.labels_kept for t in traces if t.status == 200]
+        series['widgets'] = [t.widgets for t in traces if t.widgets is not None]
+        return {name: {'last': values[-1] if values else None,
+                       'p50': percentile(values, 50),
+                       'p95': percentile(values, 95),
+                       'count': len(values)}
+                for name, values in series.items()}
+
+    def export_json(self, path, extra=None):
+        """Write the summary and every buffered trace to path"""
+        document = {
+            'exported': time.time(),
+            'summary': self.summary(),
+            'traces': [t.to_dict() for t in self.snapshot()],
+        }
+        if extra:
+            document.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, indent=2)
+
+
+class LatencyHistogram:
+    """Durations counted into fixed buckets, plus recent samples for percentiles
+
+    Safe to record into from any thread.
+    """
+    def __init__(self, edges, capacity=500):
+        self.edges = tuple(edges)
+        self.counts = [0] * (len(self.edges) + 1)
+        self.samples = deque(maxlen=capacity)
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds, ok=True):
+        with self._lock:
+            self.counts[bisect_left(self.edges, seconds)] += 1
+            self.samples.append(seconds)
+            if not ok:
+                self.failures += 1
+
+    def summary(self):
+        with self._lock:
+            samples = list(self.samples)
+            counts = list(self.counts)
+            failures = self.failures
+        return {
+            'count': sum(counts),
+            'failures': failures,
+            'last': samples[-1] if samples else None,
+            'p50': percentile(samples, 50),
+            'p95': percentile(samples, 95),
+            # [upper edge in seconds or None for the open bucket, count]
+            'buckets': [[edge, count] for edge, count in zip(self.edges + (None,), counts)],
+        }
+
+    def lines(self, width=30):
+        """Text rows of the histogram, one per bucket, bars scaled to width"""
+        buckets = self.summary()['buckets']
+        most = max(count for _, count in buckets) or 1
+        rows = []
+        lower = 0.0
+        for edge, count in buckets:
+            label = f"{lower * 1000:g}-{edge * 1000:g}ms" if edge is not None else f">{lower * 1000:g}ms"
+            rows.append(f"{label:>12} {'#' * round(count / most * width):<{width}} {count}")
+            lower = edge
+        return rows
+
+
+class ProfileCapture:
+    """cProfile session for the calling thread that can be toggled on and off"""
+    def __init__(self):
+        self.profile = None
+
+    @property
+    def running(self):
+        return self.profile is not None
+
+    def start(self):
+        import cProfile
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def stop(self, path=None, top=25):
+        """Stop profiling, optionally dump raw stats to path, return a text report"""
+        profile, self.profile = self.profile, None
+        profile.disable()
+        if path:
+            profile.dump_stats(path)
+        import pstats
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats('cumulative').print_stats(top)
+        return out.getvalue()
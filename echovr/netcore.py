@@ -0,0 +1,174 @@
+"""Background asyncio loop that owns the browser's network work
+
+All polling, joining and API checks run as tasks on one event loop in a
+daemon thread. Blocking HTTP calls (requests) are handed to a small fixed
+pool of daemon worker threads, which bounds how many run at once; the
+awaiting task can still be cancelled or timed out at any moment, and an
+abandoned call simply finishes in the background without keeping the
+process alive. One more worker is kept for run_urgent(), so a call the
+user is waiting on never queues behind a slow fetch. Results travel back
+to the UI thread through one thread-safe queue that the UI drains on its
+own schedule.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+
+log = logging.getLogger(__name__)
+
+
+class DaemonWorkers:
+    """Fixed pool of daemon threads running blocking calls"""
+    def __init__(self, count, name):
+        self._jobs = queue.SimpleQueue()
+        self._threads = [threading.Thread(target=self._work, name=f"{name}-{i}", daemon=True)
+                         for i in range(count)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, func, args, kwargs):
+        """Queue func(*args, **kwargs) and return a concurrent Future for it"""
+        future = concurrent.futures.Future()
+        self._jobs.put((future, func, args, kwargs))
+        return future
+
+    def shutdown(self):
+        """Ask every worker to exit once its current call returns"""
+        for _ in self._threads:
+            self._jobs.put(None)
+
+    def _work(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            future, func, args, kwargs = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+
+class NetCore:
+    """Event loop thread plus the channel back to the UI
+
+    submit() and post() may be called from any thread. Coroutines run on
+    the loop; callbacks handed to post() are returned by drain() on
+    whichever thread calls it (the Tk thread).
+    """
+    def __init__(self, workers=4, name="netcore"):
+        self.name = name
+        self.loop = asyncio.new_event_loop()
+        self.results = queue.SimpleQueue()
+        self._workers = DaemonWorkers(workers, f"{name}-worker")
+        self._urgent = DaemonWorkers(1, f"{name}-urgent")
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._tasks = set()
+        self._named = {}
+        self._stopped = False
+
+    def start(self):
+        """Start the loop thread and the worker pool"""
+        self._workers.start()
+        self._urgent.start()
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro, name=None):
+        """Schedule coro on the loop
+
+        Submitting a task under a name that is still running cancels the
+        older task first, so repeated clicks supersede rather than pile up.
+        """
+        if self._stopped:
+            coro.close()
+            return
+        self.loop.call_soon_threadsafe(self._create_task, coro, name)
+
+    def _create_task(self, coro, name):
+        if self._stopped:
+            coro.close()
+            return
+        if name is not None:
+            previous = self._named.get(name)
+            if previous is not None:
+                previous.cancel()
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        if name is not None:
+            self._named[name] = task
+        task.add_done_callback(lambda t, n=name: self._task_done(t, n))
+
+    def _task_done(self, task, name):
+        self._tasks.discard(task)
+        if name is not None and self._named.get(name) is task:
+            del self._named[name]
+        if not task.cancelled() and task.exception() is not None:
+            log.error("Network task failed", exc_info=task.exception())
+
+    def call_soon(self, callback, *args):
+        """Run a plain callback on the loop thread"""
+        if not self._stopped:
+            self.loop.call_soon_threadsafe(callback, *args)
+
+    def cancel(self, name):
+        """Cancel the running task submitted under name, if any"""
+        def _cancel():
+            task = self._named.get(name)
+            if task is not None:
+                task.cancel()
+        self.loop.call_soon_threadsafe(_cancel)
+
+    async def run_blocking(self, func, *args, timeout=None, **kwargs):
+        """Run a blocking call on the worker pool and await its result"""
+        future = asyncio.wrap_future(self._workers.submit(func, args, kwargs), loop=self.loop)
+        return await asyncio.wait_for(future, timeout)
+
+    async def run_urgent(self, func, *args, timeout=None, **kwargs):
+        """run_blocking on the worker reserved for calls the user is waiting on"""
+        future = asyncio.wrap_future(self._urgent.submit(func, args, kwargs), loop=self.loop)
+        return await asyncio.wait_for(future, timeout)
+
+    def post(self, callback, *args):
+        """Queue callback(*args) for the UI thread"""
+        self.results.put((callback, args))
+
+    def drain(self, limit=200):
+        """Return up to limit queued (callback, args) pairs without blocking"""
+        items = []
+        while len(items) < limit:
+            try:
+                items.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        return items
+
+    def stop(self):
+        """Cancel every task and stop the loop without waiting on workers"""
+        if self._stopped:
+            return
+        self._stopped = True
+
+        def _shutdown():
+            for task in list(self._tasks):
+                task.cancel()
+            # Give cancelled tasks one pass to unwind before stopping
+            self.loop.call_soon(self.loop.stop)
+
+        try:
+            self.loop.call_soon_threadsafe(_shutdown)
+        except RuntimeError:
+            pass
+        self._workers.shutdown()
+        self._urgent.shutdown()
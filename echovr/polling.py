@@ -0,0 +1,100 @@
+"""Adaptive poll intervals for the server list and local API checks"""
+import random
+import time
+
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    # email pulls in a sizeable package; HTTP dates in Retry-After are rare
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if now is None:
+        now = time.time()
+    return max(0.0, when.timestamp() - now)
+
+
+class PollScheduler:
+    """Decides how long to wait before the next poll
+
+    The base interval is used while the window is focused and nothing
+    special is going on. It shrinks to `fast` while snapshots keep changing
+    or the user has a server selected, relaxes to `idle` after several
+    unchanged polls, and stretches to `unfocused`/`hidden` when the window
+    loses focus or is iconified. Failures back off exponentially from the
+    base up to max_backoff, never sooner than a Retry-After the server
+    asked for. Every interval gets +/- jitter so a fleet of clients does
+    not poll in lockstep.
+    """
+    # Unchanged polls in a row before relaxing to the idle interval
+    IDLE_AFTER = 3
+
+    def __init__(self, base, fast=None, idle=None, unfocused=None, hidden=None,
+                 max_backoff=600, jitter=0.1, rng=None):
+        self.base = base
+        self.fast = fast if fast is not None else base
+        self.idle = idle if idle is not None else base
+        self.unfocused = unfocused if unfocused is not None else base * 2
+        self.hidden = hidden if hidden is not None else base * 10
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+
+        self.failures = 0
+        self.retry_after = None
+        self.changing = False
+        self.unchanged_streak = 0
+        self.active = False
+        self.visible = True
+        self.focused = True
+        self.interval = base
+        self.reason = "normal"
+
+    def record_success(self, changed):
+        """Note a successful poll and whether it brought new data"""
+        self.failures = 0
+        self.retry_after = None
+        self.changing = changed
+        self.unchanged_streak = 0 if changed else self.unchanged_streak + 1
+
+    def record_failure(self, retry_after=None):
+        """Note a failed poll (network error, 429, 5xx, ...)"""
+        self.failures += 1
+        self.retry_after = retry_after
+
+    def set_window_state(self, visible, focused):
+        """Update what the UI reports about the window"""
+        self.visible = visible
+        self.focused = focused
+
+    def next_interval(self):
+        """Compute, remember and return the delay before the next poll"""
+        if self.failures:
+            interval = min(self.max_backoff, self.base * 2 ** (self.failures - 1))
+            reason = f"backoff x{self.failures}"
+        elif not self.visible:
+            interval, reason = self.hidden, "minimized"
+        elif not self.focused:
+            interval, reason = self.unfocused, "background"
+        elif self.changing or self.active:
+            interval, reason = self.fast, "active"
+        elif self.unchanged_streak >= self.IDLE_AFTER:
+            interval, reason = self.idle, "idle"
+        else:
+            interval, reason = self.base, "normal"
+
+        if self.jitter:
+            interval *= 1 + self.rng.uniform(-self.jitter, self.jitter)
+        if self.retry_after is not None and interval < self.retry_after:
+            interval, reason = self.retry_after, "retry-after"
+
+        self.interval = interval
+        self.reason = reason
+        return interval
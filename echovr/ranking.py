@@ -0,0 +1,159 @@
+"""Sort orders for the server list, kept up to date across snapshots
+
+Each order is a key function over a Server. Keys end with the server id,
+so they are unique and two servers never swap places for no reason.
+
+RankIndex holds one order as a sorted list of keys. On every snapshot
+only the servers whose key changed are taken out and bisected back in,
+so a score change moves one entry instead of re-sorting the list.
+Ranking keeps a RankIndex per order that has been asked for, which
+makes switching back and forth between orders free after the first time.
+"""
+from bisect import bisect_left, insort
+
+
+def _open_first(s):
+    return (not s.open, -s.player_count, s.id)
+
+
+def _most_players(s):
+    return (-s.player_count, not s.open, s.id)
+
+
+def _closest_score(s):
+    # Matches without a score go last
+    if s.score is None:
+        return (1, 0, 0, s.id)
+    blue, orange = s.score
+    return (0, abs(blue - orange), -(blue + orange), s.id)
+
+
+def _fewest_free_slots(s):
+    return (not s.open, s.free_slots, s.id)
+
+
+def _newest(s):
+    return (-s.started, s.id)
+
+
+def _lowest_latency(s):
+    # Unmeasured servers go last; 10ms steps keep probe jitter from
+    # reshuffling servers in the same region
+    latency = s.latency
+    if latency is None:
+        return (1, 0, not s.open, -s.player_count, s.id)
+    return (0, round(latency * 100), not s.open, -s.player_count, s.id)
+
+
+# name -> (label shown in the UI, key function)
+ORDERS = {
+    'open_first': ("Open first", _open_first),
+    'most_players': ("Most players", _most_players),
+    'closest_score': ("Closest score", _closest_score),
+    'fewest_free_slots': ("Fewest free slots", _fewest_free_slots),
+    'newest': ("Newest", _newest),
+    'lowest_latency': ("Lowest latency", _lowest_latency),
+}
+DEFAULT_ORDER = 'open_first'
+
+
+def longest_increasing(values):
+    """Set of values forming one longest strictly increasing subsequence
+
+    Used on the old positions of cards listed in their new order: the
+    cards in this subsequence are already in the right relative order and
+    can stay put, every other card has to move.
+    """
+    tails = []
+    tail_index = []
+    parent = [None] * len(values)
+    for i, value in enumerate(values):
+        j = bisect_left(tails, value)
+        if j == len(tails):
+            tails.append(value)
+            tail_index.append(i)
+        else:
+            tails[j] = value
+            tail_index[j] = i
+        parent[i] = tail_index[j - 1] if j else None
+    result = set()
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        result.add(values[i])
+        i = parent[i]
+    return result
+
+
+def sort_key(order):
+    """Key function for the named order"""
+    return ORDERS[order][1]
+
+
+class RankIndex:
+    """Servers kept sorted by one key, updated incrementally"""
+    def __init__(self, key):
+        self.key = key
+        self.entries = []
+        self.keys = {}
+        self.servers = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update(self, servers):
+        """Apply a snapshot; returns the number of entries that moved"""
+        keys = self.keys
+        seen = set()
+        changed = []
+        for server in servers:
+            server_id = server.id
+            if server_id in seen:
+                continue
+            seen.add(server_id)
+            self.servers[server_id] = server
+            key = self.key(server)
+            old = keys.get(server_id)
+            if old != key:
+                changed.append((old, key))
+                keys[server_id] = key
+        removed = [sid for sid in keys if sid not in seen]
+        for server_id in removed:
+            changed.append((keys.pop(server_id), None))
+            del self.servers[server_id]
+
+        entries = self.entries
+        if len(changed) > len(entries) // 8 + 64:
+            # First snapshot or a big reshuffle: one sort beats many inserts
+            self.entries = sorted(keys.values())
+            return len(changed)
+        for old, key in changed:
+            if old is not None:
+                del entries[bisect_left(entries, old)]
+            if key is not None:
+                insort(entries, key)
+        return len(changed)
+
+    def ordered(self):
+        """Servers in rank order"""
+        servers = self.servers
+        return [servers[key[-1]] for key in self.entries]
+
+
+class Ranking:
+    """A RankIndex for every order in use, all fed the same snapshots"""
+    def __init__(self):
+        self.indexes = {}
+        self.snapshot = []
+
+    def update(self, servers):
+        self.snapshot = servers
+        for index in self.indexes.values():
+            index.update(servers)
+
+    def ordered(self, order=DEFAULT_ORDER):
+        """Servers of the last snapshot in the named order"""
+        index = self.indexes.get(order)
+        if index is None:
+            index = self.indexes[order] = RankIndex(sort_key(order))
+            index.update(self.snapshot)
+        return index.ordered()
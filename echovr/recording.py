@@ -0,0 +1,372 @@
+"""Recordings of /session frames: compact on disk, seekable, replayable
+
+    header   MAGIC, version, start time, metadata (JSON)
+    chunk    CHUNK header, then zlib-compressed FRAME headers and raw bodies
+    ...
+    index    one INDEX_ENTRY per chunk, then TRAILER pointing back at it
+
+Opening a recording reads only the index, which is rebuilt from the chunk
+headers if the recorder died before writing it. A chunk is decompressed
+when one of its frames is asked for.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left, bisect_right
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MAGIC = b'ECHOREC\x00'
+VERSION = 1
+# magic, version, wall-clock start, metadata length
+HEADER = struct.Struct('<8sHdI')
+# magic, compressed length, frames, first/last time, first/last clock, first/last round
+CHUNK = struct.Struct('<4sIIddffII')
+CHUNK_MAGIC = b'CHNK'
+# time since the first frame, game clock, round, body length
+FRAME = struct.Struct('<dfII')
+# chunk header offset, then the CHUNK fields after the magic
+INDEX_ENTRY = struct.Struct('<QIIddffII')
+# index offset, chunk count, magic
+TRAILER = struct.Struct('<QI8s')
+TRAILER_MAGIC = b'ECHOIDX\x00'
+
+# A chunk is compressed once it holds this many frames or seconds
+CHUNK_FRAMES = 256
+CHUNK_SECONDS = 4.0
+COMPRESS_LEVEL = 6
+
+
+class RecordingError(Exception):
+    """A file that is not a recording, or one from a newer version"""
+
+
+class Recorder:
+    """Appends frames to a new recording file
+
+    add() may be called from the stream thread while close() is called
+    from another one.
+    """
+    def __init__(self, path, metadata=None):
+        self.path = path
+        self.frames = 0
+        self.chunks = []
+        self.round = 0
+        self.raw_bytes = 0
+        self._file = open(path, 'wb')
+        self._lock = threading.Lock()
+        self._first = None
+        self._last_clock = None
+        self._buffer = bytearray()
+        self._pending = []
+        meta = json.dumps(metadata or {}).encode()
+        self._file.write(HEADER.pack(MAGIC, VERSION, time.time(), len(meta)))
+        self._file.write(meta)
+
+    def add_frame(self, body, frame):
+        """SessionStream tap: record body with the clock decoded into frame"""
+        self.add(body, frame.received, frame.clock)
+
+    def add(self, body, received, clock):
+        """Append one frame; received is any monotonic clock in seconds"""
+        with self._lock:
+            if self._file is None:
+                return
+            if self._first is None:
+                self._first = received
+            if self._last_clock is not None and clock > self._last_clock:
+                # The game clock only counts down; going up starts a round
+                self.round += 1
+            self._last_clock = clock
+            t = received - self._first
+            self._buffer += FRAME.pack(t, clock, self.round, len(body))
+            self._buffer += body
+            self._pending.append((t, clock, self.round))
+            self.frames += 1
+            self.raw_bytes += len(body)
+            first_t = self._pending[0][0]
+            if len(self._pending) >= CHUNK_FRAMES or t - first_t >= CHUNK_SECONDS:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        data = zlib.compress(bytes(self._buffer), COMPRESS_LEVEL)
+        (t0, clock0, round0), (t1, clock1, round1) = self._pending[0], self._pending[-1]
+        fields = (len(data), len(self._pending), t0, t1, clock0, clock1, round0, round1)
+        self.chunks.append((self._file.tell(),) + fields)
+        self._file.write(CHUNK.pack(CHUNK_MAGIC, *fields))
+        self._file.write(data)
+        self._file.flush()
+        self._buffer.clear()
+        self._pending.clear()
+
+    @property
+    def size(self):
+        with self._lock:
+            return self._file.tell() if self._file is not None else os.path.getsize(self.path)
+
+    def close(self):
+        """Write the last chunk and the index"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush()
+            index_offset = self._file.tell()
+            for entry in self.chunks:
+                self._file.write(INDEX_ENTRY.pack(*entry))
+            self._file.write(TRAILER.pack(index_offset, len(self.chunks), TRAILER_MAGIC))
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Recording:
+    """Read-only view of a recording file, memory-mapped"""
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise RecordingError(f"{path} is empty")
+        try:
+            self._read_header()
+            self.indexed = self._read_index()
+            if not self.indexed:
+                self._scan_chunks()
+        except (RecordingError, struct.error):
+            self.close()
+            raise
+        # Keys of each chunk's first frame, for the bisects in seek_*
+        self._chunk_times = [entry[3] for entry in self.chunks]
+        self._chunk_keys = [(entry[7], -entry[5]) for entry in self.chunks]
+        self._starts = []
+        total = 0
+        for entry in self.chunks:
+            self._starts.append(total)
+            total += entry[2]
+        self.frames = total
+        self._cached = (None, None)
+
+    def _read_header(self):
+        if len(self._map) < HEADER.size:
+            raise RecordingError(f"{self.path} is not a recording")
+        magic, version, started, meta_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise RecordingError(f"{self.path} is not a recording")
+        if version != VERSION:
+            raise RecordingError(f"{self.path} is recording format {version}, expected {VERSION}")
+        self.started = started
+        self._data_start = HEADER.size + meta_length
+        self.metadata = json.loads(self._map[HEADER.size:self._data_start] or b'{}')
+
+    def _read_index(self):
+        """Load the index from the trailer; False if there is none"""
+        size = len(self._map)
+        if size < self._data_start + TRAILER.size:
+            return False
+        index_offset, count, magic = TRAILER.unpack_from(self._map, size - TRAILER.size)
+        if magic != TRAILER_MAGIC or index_offset + count * INDEX_ENTRY.size != size - TRAILER.size:
+            return False
+        self.chunks = list(INDEX_ENTRY.iter_unpack(self._map[index_offset:size - TRAILER.size]))
+        return True
+
+    def _scan_chunks(self):
+        """Rebuild the index of an unfinished recording from its chunk headers"""
+        self.chunks = []
+        pos = self._data_start
+        size = len(self._map)
+        while pos + CHUNK.size <= size:
+            magic, length, *fields = CHUNK.unpack_from(self._map, pos)
+            if magic != CHUNK_MAGIC or pos + CHUNK.size + length > size:
+                # The tail of a chunk that was being written
+                break
+            self.chunks.append((pos, length, *fields))
+            pos += CHUNK.size + length
+
+    @property
+    def duration(self):
+        return self.chunks[-1][4] if self.chunks else 0.0
+
+    @property
+    def rounds(self):
+        return self.chunks[-1][8] + 1 if self.chunks else 0
+
+    @property
+    def size(self):
+        return len(self._map)
+
+    def _chunk(self, index):
+        """([(t, clock, round)], [body]) of chunk index, decompressing it if needed"""
+        cached_index, frames = self._cached
+        if cached_index == index:
+            return frames
+        offset, length = self.chunks[index][:2]
+        start = offset + CHUNK.size
+        view = memoryview(self._map)
+        try:
+            data = zlib.decompress(view[start:start + length])
+        finally:
+            view.release()
+        keys = []
+        bodies = []
+        pos = 0
+        while pos < len(data):
+            t, clock, round, body_length = FRAME.unpack_from(data, pos)
+            pos += FRAME.size
+            keys.append((t, clock, round))
+            bodies.append(data[pos:pos + body_length])
+            pos += body_length
+        frames = (keys, bodies)
+        self._cached = (index, frames)
+        return frames
+
+    def frame(self, position):
+        """(t, clock, round, body) of frame number position"""
+        index = bisect_right(self._starts, position) - 1
+        keys, bodies = self._chunk(index)
+        i = position - self._starts[index]
+        return keys[i] + (bodies[i],)
+
+    def iter_frames(self, position=0):
+        """(t, clock, round, body) from frame number position to the end"""
+        index = max(0, bisect_right(self._starts, position) - 1)
+        skip = position - self._starts[index] if self.chunks else 0
+        for index in range(index, len(self.chunks)):
+            keys, bodies = self._chunk(index)
+            for i in range(skip, len(keys)):
+                yield keys[i] + (bodies[i],)
+            skip = 0
+
+    def seek_time(self, t):
+        """Number of the first frame at or after t seconds into the recording"""
+        if not self.chunks:
+            return 0
+        # The last chunk starting before t; the frame may still be the
+        # first one of the chunk after it, which is where i == len(keys) lands
+        index = max(0, bisect_left(self._chunk_times, t) - 1)
+        keys, _ = self._chunk(index)
+        i = bisect_left([key[0] for key in keys], t)
+        return self._starts[index] + i
+
+    def seek_clock(self, clock, round=0):
+        """Number of the first frame of round whose game clock is at or below clock"""
+        if not self.chunks:
+            return 0
+        wanted = (round, -clock)
+        index = max(0, bisect_left(self._chunk_keys, wanted) - 1)
+        keys, _ = self._chunk(index)
+        i = bisect_left([(key[2], -key[1]) for key in keys], wanted)
+        return min(self._starts[index] + i, self.frames)
+
+    def summary(self):
+        return {
+            'path': self.path,
+            'started': self.started,
+            'metadata': self.metadata,
+            'frames': self.frames,
+            'chunks': len(self.chunks),
+            'rounds': self.rounds,
+            'duration': self.duration,
+            'bytes': self.size,
+            'indexed': self.indexed,
+        }
+
+    def close(self):
+        self._cached = (None, None)
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Replay:
+    """Plays a Recording back in real time, or speed times faster
+
+    current() returns the body of the frame that is due now. Frames are
+    read in order from a sequential cursor, so each chunk is decompressed
+    once per pass.
+    """
+    def __init__(self, recording, speed=1.0, position=0, loop=False):
+        self.recording = recording
+        self.speed = speed
+        self.loop = loop
+        self.start_position = position
+        self._lock = threading.Lock()
+        self._restart()
+
+    def _restart(self):
+        self._frames = self.recording.iter_frames(self.start_position)
+        self._current = next(self._frames, None)
+        self._next = next(self._frames, None)
+        self._origin_t = self._current[0] if self._current else 0.0
+        self._origin = time.monotonic()
+        self.finished = self._current is None
+
+    def current(self):
+        """The due frame's /session body, None for an empty recording"""
+        with self._lock:
+            if self._current is None:
+                return None
+            due = self._origin_t + (time.monotonic() - self._origin) * self.speed
+            while self._next is not None and self._next[0] <= due:
+                self._current = self._next
+                self._next = next(self._frames, None)
+            if self._next is None:
+                if self.loop:
+                    body = self._current[3]
+                    self._restart()
+                    return body
+                self.finished = True
+            return self._current[3]
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    replay = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/session':
+            self._send(404, b'{"error":"not found"}')
+            return
+        body = self.replay.current()
+        if body is None:
+            self._send(404, b'{"error":"empty recording"}')
+            return
+        self._send(200, body)
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def serve_replay(replay, host='127.0.0.1', port=6721):
+    """Answer GET /session from replay on host:port in a daemon thread"""
+    handler = type('ReplayHandler', (_ReplayHandler,), {'replay': replay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='replay', daemon=True).start()
+    return server
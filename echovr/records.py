@@ -0,0 +1,153 @@
+"""Compact server/player records decoded from /status/matches labels
+
+Labels are turned into __slots__ objects once, with every display string
+the GUI needs computed at decode time. Strings that repeat across the whole
+list (modes, teams, mode titles) are interned so each distinct value is
+stored once.
+"""
+import sys
+
+try:
+    import orjson
+    loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        import msgspec
+        loads = msgspec.json.Decoder().decode
+        JSON_BACKEND = 'msgspec'
+    except ImportError:
+        import json
+        loads = json.loads
+        JSON_BACKEND = 'json'
+
+_intern = sys.intern
+_MODE_TITLES = {}
+# Blue plus orange seats in a match; spectators do not take one
+TEAM_SLOTS = 8
+
+
+def mode_title(mode):
+    """'echo_arena' -> 'Echo Arena', computed once per distinct mode"""
+    title = _MODE_TITLES.get(mode)
+    if title is None:
+        title = _MODE_TITLES[mode] = _intern(mode.replace('_', ' ').title())
+    return title
+
+
+def parse_start_time(value):
+    """Epoch seconds for a label's ISO-8601 start_time, 0.0 if missing or malformed"""
+    if not value:
+        return 0.0
+    # Off the import path; labels without a start_time never load datetime
+    from datetime import datetime
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Player:
+    """One player in a server label"""
+    __slots__ = ('user_id', 'display_name', 'team')
+
+    def __init__(self, user_id, display_name, team):
+        self.user_id = user_id
+        self.display_name = display_name
+        self.team = team
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Player from its label entry"""
+        return cls(data.get('user_id', ''),
+                   data.get('display_name', 'Unknown'),
+                   _intern(data.get('team') or ''))
+
+    def __repr__(self):
+        return f"Player({self.display_name!r}, team={self.team!r})"
+
+
+class GameState:
+    """Score of a running match"""
+    __slots__ = ('blue_score', 'orange_score')
+
+    def __init__(self, blue_score, orange_score):
+        self.blue_score = blue_score
+        self.orange_score = orange_score
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a GameState from the label's game_state object"""
+        return cls(data.get('blue_score', 0), data.get('orange_score', 0))
+
+    def __repr__(self):
+        return f"GameState({self.blue_score}-{self.orange_score})"
+
+
+class Server:
+    """One server label with its display fields precomputed"""
+    __slots__ = ('id', 'short_id', 'mode', 'mode_title', 'title', 'open',
+                 'players', 'player_count', 'free_slots', 'game_state', 'score', 'started',
+                 'region', 'endpoint', 'latency')
+
+    def __init__(self, id, mode, open, players, game_state, started=0.0, region=None, endpoint=None):
+        self.id = id
+        session, _, node = id.partition('.')
+        self.short_id = session.upper()
+        self.mode = _intern(mode)
+        self.mode_title = mode_title(mode)
+        self.title = f"{self.mode_title} - {self.short_id}"
+        self.open = open
+        self.players = players
+        self.player_count = len(players)
+        self.free_slots = max(0, TEAM_SLOTS - sum(1 for p in players if p.team in ('blue', 'orange')))
+        self.game_state = game_state
+        self.score = None if game_state is None else (game_state.blue_score, game_state.orange_score)
+        self.started = started
+        # Region from the label, else the node suffix of the id ('nakama-us-east')
+        self.region = _intern(region or node) if region or node else None
+        self.endpoint = endpoint
+        # Round trip to the region in seconds, set by latency.LatencyProber
+        self.latency = None
+
+    @property
+    def joinable(self):
+        """True if the server takes players right now"""
+        return self.open and self.free_slots > 0
+
+    @classmethod
+    def from_label(cls, label):
+        """Build a Server from a decoded label dict"""
+        game_state = label.get('game_state')
+        return cls(label.get('id', 'N/A'),
+                   label.get('mode', 'unknown'),
+                   bool(label.get('open', False)),
+                   tuple(Player.from_dict(p) for p in label.get('players') or ()),
+                   GameState.from_dict(game_state) if game_state else None,
+                   parse_start_time(label.get('start_time')),
+                   label.get('region'),
+                   label.get('endpoint'))
+
+    def to_dict(self):
+        """Plain JSON-friendly view, as printed by the CLI"""
+        return {
+            'id': self.id,
+            'short_id': self.short_id,
+            'mode': self.mode,
+            'open': self.open,
+            'player_count': self.player_count,
+            'players': [{'user_id': p.user_id, 'display_name': p.display_name, 'team': p.team}
+                        for p in self.players],
+            'score': list(self.score) if self.score is not None else None,
+            'free_slots': self.free_slots,
+            'started': self.started,
+            'region': self.region,
+            'latency': self.latency,
+        }
+
+    def team(self, team):
+        """Players on the given team"""
+        return [p for p in self.players if p.team == team]
+
+    def __repr__(self):
+        return f"Server({self.short_id}, {self.mode}, open={self.open}, players={self.player_count})"
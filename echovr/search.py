@@ -0,0 +1,203 @@
+"""Incremental inverted index for searching servers and players
+
+Every server contributes a handful of lowercase terms: its short id, its
+mode and mode title, and each player's display name. Terms map to the
+ids of the servers that carry them, and the index keeps two views of
+the term set:
+
+- a sorted list, so a prefix is one bisect plus a slice
+- a trigram table, so a substring of three or more characters only has
+  to be checked against terms sharing all of its trigrams
+
+update() diffs each server's terms against what is already indexed, so
+a refresh where a few players moved touches a few postings instead of
+rebuilding the whole index.
+"""
+from bisect import bisect_left
+
+# Queries shorter than this match term prefixes only; a one- or two-letter
+# substring would match most of the index anyway.
+MIN_SUBSTRING = 3
+
+
+def server_terms(server):
+    """The set of lowercase terms a server is found by"""
+    terms = {server.short_id.lower(), server.mode, server.mode_title.lower()}
+    for player in server.players:
+        if player.display_name:
+            terms.add(player.display_name.lower())
+    return frozenset(terms)
+
+
+def trigrams(term):
+    return {term[i:i + 3] for i in range(len(term) - 2)}
+
+
+class SearchIndex:
+    """Term -> server ids, maintained across snapshots"""
+    def __init__(self):
+        self.postings = {}
+        self.sorted_terms = []
+        self.grams = {}
+        self.server_terms = {}
+        # Server id -> the fields its terms are made from (see update)
+        self.server_keys = {}
+        self.version = 0
+        # Terms that appeared or vanished during the current update()
+        self._born = []
+        self._dead = []
+        # (version, {word: (terms, ids)}) of the last search
+        self._last_search = (None, {})
+
+    def __len__(self):
+        return len(self.server_terms)
+
+    def _add_term(self, term, server_id):
+        ids = self.postings.get(term)
+        if ids is None:
+            self.postings[term] = {server_id}
+            self._born.append(term)
+            grams = self.grams
+            for gram in trigrams(term):
+                # Not setdefault(): that builds a throwaway set for every
+                # trigram already indexed, which is nearly all of them
+                terms = grams.get(gram)
+                if terms is None:
+                    grams[gram] = {term}
+                else:
+                    terms.add(term)
+        else:
+            ids.add(server_id)
+
+    def _remove_term(self, term, server_id):
+        ids = self.postings[term]
+        ids.discard(server_id)
+        if ids:
+            return
+        del self.postings[term]
+        self._dead.append(term)
+        for gram in trigrams(term):
+            terms = self.grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self.grams[gram]
+
+    def update(self, servers):
+        """Bring the index in line with servers; returns the number of servers re-indexed"""
+        seen = set()
+        touched = 0
+        server_keys = self.server_keys
+        for server in servers:
+            seen.add(server.id)
+            # On a refresh most servers are new records with the same names;
+            # comparing the raw fields is far cheaper than rebuilding terms
+            key = [player.display_name for player in server.players]
+            key.append(server.mode)
+            if server_keys.get(server.id) == key:
+                continue
+            server_keys[server.id] = key
+            terms = server_terms(server)
+            old = self.server_terms.get(server.id)
+            if old == terms:
+                continue
+            old = old or frozenset()
+            for term in old - terms:
+                self._remove_term(term, server.id)
+            for term in terms - old:
+                self._add_term(term, server.id)
+            self.server_terms[server.id] = terms
+            touched += 1
+        for server_id in [sid for sid in self.server_terms if sid not in seen]:
+            del server_keys[server_id]
+            for term in self.server_terms.pop(server_id):
+                self._remove_term(term, server_id)
+            touched += 1
+        self._update_sorted_terms()
+        if touched:
+            self.version += 1
+        return touched
+
+    def _update_sorted_terms(self):
+        """Apply this update's term changes to sorted_terms
+
+        A handful of changes is patched in place; after a large change
+        (first snapshot, reconnect) one sort is cheaper than many inserts.
+        """
+        born, dead = self._born, self._dead
+        self._born, self._dead = [], []
+        if len(born) + len(dead) > len(self.sorted_terms) // 8 + 64:
+            self.sorted_terms = sorted(self.postings)
+            return
+        terms = self.sorted_terms
+        # A term can die and be reborn (or the reverse) within one update,
+        # so check the list before touching it.
+        for term in dead:
+            index = bisect_left(terms, term)
+            if term not in self.postings and index < len(terms) and terms[index] == term:
+                del terms[index]
+        for term in born:
+            index = bisect_left(terms, term)
+            if term in self.postings and (index == len(terms) or terms[index] != term):
+                terms.insert(index, term)
+
+    def matching_terms(self, word):
+        """Indexed terms that start with word, or contain it if it is long enough"""
+        if len(word) < MIN_SUBSTRING:
+            start = bisect_left(self.sorted_terms, word)
+            end = bisect_left(self.sorted_terms, word + '\uffff', start)
+            return self.sorted_terms[start:end]
+        grams = sorted(trigrams(word), key=lambda g: len(self.grams.get(g, ())))
+        candidates = self.grams.get(grams[0])
+        if not candidates:
+            return []
+        if len(grams) > 1:
+            candidates = candidates.intersection(*[self.grams.get(gram, ()) for gram in grams[1:]])
+        if len(word) == MIN_SUBSTRING:
+            # The word is its only trigram, so every candidate contains it
+            return list(candidates)
+        return [term for term in candidates if word in term]
+
+    def search(self, query):
+        """Ids of servers matching every whitespace-separated word of query
+
+        Returns None for an empty query, meaning "no filter". Typing only
+        extends the last word, so a word that extends one of the previous
+        query is narrowed down from that word's matches.
+        """
+        words = query.lower().split()
+        if not words:
+            return None
+        version, previous = self._last_search
+        if version != self.version:
+            previous = {}
+        matches = {}
+        result = None
+        for word in sorted(set(words), key=len, reverse=True):
+            terms, ids = matches[word] = self._word_matches(word, previous)
+            # Copied, so the caller cannot change the remembered matches
+            result = set(ids) if result is None else result & ids
+            if not result:
+                break
+        self._last_search = (self.version, matches)
+        return result
+
+    def _word_matches(self, word, previous):
+        """(terms, server ids) matching word, from a previous word it extends if any"""
+        substring = len(word) >= MIN_SUBSTRING
+        for old, (terms, ids) in previous.items():
+            if old == word:
+                return terms, ids
+            if substring and len(old) >= MIN_SUBSTRING and old in word:
+                narrowed = [term for term in terms if word in term]
+            elif not substring and word.startswith(old):
+                narrowed = [term for term in terms if term.startswith(word)]
+            else:
+                continue
+            if len(narrowed) == len(terms):
+                return narrowed, ids
+            terms = narrowed
+            break
+        else:
+            terms = self.matching_terms(word)
+        postings = self.postings
+        return terms, set().union(*[postings[term] for term in terms])
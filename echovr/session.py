@@ -0,0 +1,330 @@
+"""Live match state from the /session endpoint of the local EchoVR API
+
+SessionStream polls /session on its own thread at MIN_RATE to MAX_RATE Hz
+and decodes each answer into a SessionRing of preallocated frames. A
+consumer that falls behind loses the oldest frames, counted as dropped.
+"""
+import http.client
+import logging
+import threading
+import time
+from array import array
+
+from echovr import records
+
+MIN_RATE = 10
+MAX_RATE = 60
+DEFAULT_RATE = 30
+RING_SIZE = 64
+# Blue and orange players kept per frame; spectators are not tracked
+MAX_PLAYERS = 16
+# Wait between polls while the API is unreachable or not in a match (seconds)
+RETRY_DELAY = 1.0
+
+# The API lists teams in this order, followed by the spectators
+TEAMS = ('blue', 'orange')
+
+# SessionStream.state values
+CONNECTING = 'connecting'
+STREAMING = 'streaming'
+IDLE = 'idle'          # API answers but the game is not in a match
+OFFLINE = 'offline'    # API unreachable
+
+log = logging.getLogger(__name__)
+
+
+def format_clock(seconds):
+    """125.5 -> '02:05.50'"""
+    minutes, seconds = divmod(max(0.0, seconds), 60)
+    return f"{int(minutes):02d}:{seconds:05.2f}"
+
+
+def clamp_rate(rate):
+    return max(MIN_RATE, min(MAX_RATE, int(rate)))
+
+
+def _position(player):
+    """[x, y, z] of a player: head position, or 'position' on older builds"""
+    head = player.get('head')
+    if head:
+        return head.get('position')
+    return player.get('position')
+
+
+class SessionFrame:
+    """One decoded /session answer; SessionRing reuses these in place"""
+    __slots__ = ('seq', 'received', 'session_id', 'status', 'clock', 'clock_display',
+                 'blue_points', 'orange_points', 'disc', 'player_count', 'names', 'teams',
+                 'positions', 'possessor')
+
+    def __init__(self):
+        self.seq = 0
+        self.received = 0.0
+        self.session_id = ''
+        self.status = ''
+        self.clock = 0.0
+        self.clock_display = ''
+        self.blue_points = 0
+        self.orange_points = 0
+        self.disc = array('d', [0.0]) * 3
+        self.player_count = 0
+        self.names = [''] * MAX_PLAYERS
+        self.teams = [''] * MAX_PLAYERS
+        # x, y, z of player i at 3*i
+        self.positions = array('d', [0.0]) * (3 * MAX_PLAYERS)
+        # Index of the player holding the disc, -1 for nobody
+        self.possessor = -1
+
+    def fill(self, doc, received):
+        """Overwrite this frame with a decoded /session document"""
+        self.received = received
+        self.session_id = doc.get('sessionid') or ''
+        self.status = doc.get('game_status') or ''
+        self.clock = float(doc.get('game_clock') or 0.0)
+        self.clock_display = doc.get('game_clock_display') or format_clock(self.clock)
+        self.blue_points = doc.get('blue_points') or 0
+        self.orange_points = doc.get('orange_points') or 0
+
+        disc = self.disc
+        position = (doc.get('disc') or {}).get('position')
+        if position and len(position) == 3:
+            disc[0], disc[1], disc[2] = position
+        else:
+            disc[0] = disc[1] = disc[2] = 0.0
+
+        names = self.names
+        teams = self.teams
+        positions = self.positions
+        count = 0
+        possessor = -1
+        for team, entry in zip(TEAMS, doc.get('teams') or ()):
+            for player in entry.get('players') or ():
+                if count == MAX_PLAYERS:
+                    break
+                names[count] = player.get('name', '')
+                teams[count] = team
+                position = _position(player)
+                i = 3 * count
+                if position and len(position) == 3:
+                    positions[i], positions[i + 1], positions[i + 2] = position
+                else:
+                    positions[i] = positions[i + 1] = positions[i + 2] = 0.0
+                if player.get('possession'):
+                    possessor = count
+                count += 1
+        self.player_count = count
+        self.possessor = possessor
+
+    @property
+    def possession(self):
+        """(team, name) of the disc holder, or None"""
+        i = self.possessor
+        return None if i < 0 else (self.teams[i], self.names[i])
+
+    def position(self, i):
+        return tuple(self.positions[3 * i:3 * i + 3])
+
+    def to_dict(self):
+        return {
+            'seq': self.seq,
+            'session_id': self.session_id,
+            'status': self.status,
+            'clock': self.clock,
+            'clock_display': self.clock_display,
+            'score': [self.blue_points, self.orange_points],
+            'possession': list(self.possession) if self.possessor >= 0 else None,
+            'disc': list(self.disc),
+            'players': [{'name': self.names[i], 'team': self.teams[i], 'position': list(self.position(i))}
+                        for i in range(self.player_count)],
+        }
+
+
+class SessionRing:
+    """Fixed ring of SessionFrames written by one thread, read by another
+
+    A frame handed out by latest() or get() stays intact until the writer
+    has published capacity - 1 newer frames, which at MAX_RATE is about a
+    second with the default size.
+    """
+    def __init__(self, capacity=RING_SIZE):
+        self.capacity = capacity
+        self.frames = [SessionFrame() for _ in range(capacity)]
+        # Number of frames published so far; frame n lives in slot n % capacity
+        self.seq = 0
+
+    def write(self, doc, received):
+        seq = self.seq + 1
+        frame = self.frames[seq % self.capacity]
+        frame.fill(doc, received)
+        frame.seq = seq
+        self.seq = seq
+        return frame
+
+    def get(self, seq):
+        """Frame number seq if it is still held, else None"""
+        if seq <= 0 or self.seq - seq >= self.capacity - 1:
+            return None
+        frame = self.frames[seq % self.capacity]
+        return frame if frame.seq == seq else None
+
+    def latest(self):
+        return self.get(self.seq)
+
+
+class SessionStream:
+    """Polls /session at a fixed rate on a daemon thread
+
+    notify() is called on the stream thread when a frame arrives and no
+    earlier notification is still waiting for take(). Every callable in
+    taps is called there too, with the raw body and the decoded frame of
+    every frame (a Recorder, say); taps must keep up with the poll rate.
+    """
+    def __init__(self, host, port, rate=DEFAULT_RATE, notify=None, ring=None, timeout=1.0):
+        self.host = host
+        self.port = int(port)
+        self.rate = clamp_rate(rate)
+        self.notify = notify
+        self.ring = ring or SessionRing()
+        self.timeout = timeout
+        self.taps = []
+        self.state = CONNECTING
+        self.last_error = None
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        # Smoothed seconds between frames and per request
+        self.interval = 0.0
+        self.poll_time = 0.0
+        self._last_received = None
+        self._taken = 0
+        self._pending = False
+        self._conn = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def set_rate(self, rate):
+        self.rate = clamp_rate(rate)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='session-stream', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Ask the thread to exit; it closes its connection on the way out"""
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def take(self):
+        """The newest frame not taken yet, or None
+
+        Frames published since the previous take() other than the newest
+        one are counted as dropped.
+        """
+        # Clear first, so a frame landing during this call notifies again
+        self._pending = False
+        seq = self.ring.seq
+        if seq <= self._taken:
+            return None
+        self.dropped += seq - self._taken - 1
+        self._taken = seq
+        return self.ring.get(seq)
+
+    def _run(self):
+        next_poll = time.perf_counter()
+        try:
+            while not self._stop.is_set():
+                try:
+                    published = self.poll()
+                except Exception as e:
+                    # Unreachable API, a broken answer or undecodable JSON
+                    self._failed(e)
+                    published = False
+                if not published:
+                    self._stop.wait(RETRY_DELAY)
+                    next_poll = time.perf_counter()
+                    continue
+                next_poll += 1.0 / self.rate
+                delay = next_poll - time.perf_counter()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    # A slow answer: start over from now rather than
+                    # firing the missed polls back to back
+                    next_poll = time.perf_counter()
+        finally:
+            self._close()
+
+    def _request(self):
+        conn = self._conn
+        if conn is None:
+            conn = self._conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        conn.request('GET', '/session')
+        response = conn.getresponse()
+        return response.status, response.read()
+
+    def poll(self):
+        """Fetch and publish one frame; False if there was nothing to publish"""
+        start = time.perf_counter()
+        reused = self._conn is not None
+        try:
+            status, body = self._request()
+        except (ConnectionError, http.client.BadStatusLine):
+            if not reused:
+                raise
+            # The API closed the idle keep-alive connection; reopen once
+            self._close()
+            status, body = self._request()
+        received = time.perf_counter()
+        self.poll_time = 0.8 * self.poll_time + 0.2 * (received - start) if self.poll_time else received - start
+
+        doc = records.loads(body) if status == 200 else None
+        if not doc or not doc.get('sessionid'):
+            # 404 or an empty session: the game is up but not in a match
+            self.state = IDLE
+            return False
+
+        frame = self.ring.write(doc, received)
+        for tap in list(self.taps):
+            try:
+                tap(body, frame)
+            except Exception:
+                log.exception("Session stream tap %r failed, removing it", tap)
+                self.taps.remove(tap)
+        self.state = STREAMING
+        self.received += 1
+        if self._last_received is not None:
+            gap = received - self._last_received
+            self.interval = 0.9 * self.interval + 0.1 * gap if self.interval else gap
+        self._last_received = received
+        if not self._pending and self.notify is not None:
+            self._pending = True
+            self.notify()
+        return True
+
+    def _failed(self, error):
+        self.errors += 1
+        if self.state != OFFLINE:
+            log.info("Session stream from %s:%d lost: %s", self.host, self.port, error)
+        self.state = OFFLINE
+        self.last_error = str(error)
+        self._last_received = None
+        self._close()
+
+    def _close(self):
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.close()
+
+    def stats(self):
+        return {
+            'state': self.state,
+            'rate': self.rate,
+            'measured_hz': 1.0 / self.interval if self.interval else 0.0,
+            'received': self.received,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'poll_ms': self.poll_time * 1000,
+        }
@@ -0,0 +1,37 @@
+"""Wall-clock marks for the phases of application startup"""
+import time
+
+
+class StartupTimer:
+    """Named marks measured from a common origin
+
+    The GUI creates one with the perf_counter value taken on the first
+    line of its module, so the first phase covers its imports.
+    """
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter()))
+
+    def has(self, name):
+        return any(mark == name for mark, _ in self.marks)
+
+    def phases(self):
+        """[(name, seconds in this phase, seconds since origin)] in mark order"""
+        result = []
+        previous = self.origin
+        for name, at in self.marks:
+            result.append((name, at - previous, at - self.origin))
+            previous = at
+        return result
+
+    def to_dict(self):
+        return {name: {'phase': phase, 'total': total} for name, phase, total in self.phases()}
+
+    def report(self):
+        lines = [f"{'startup':<14}{'phase':>10}{'total':>10}"]
+        for name, phase, total in self.phases():
+            lines.append(f"{name:<14}{phase * 1000:>8.1f}ms{total * 1000:>8.1f}ms")
+        return "\n".join(lines)
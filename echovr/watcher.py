@@ -0,0 +1,199 @@
+"""Auto-join: wait for full or locked servers and join the first that opens
+
+JoinWatcher keeps a short list of servers the user wants to get into. Its
+poll() fetches the match list far more often than the list refresh does,
+as a conditional GET so an unchanged list costs a bodyless 304. It decodes
+only the watched labels (LabelStream skips the rest as raw bytes) and
+sends /join_session as soon as one of them is open with a free slot.
+Watches run out after a timeout, at most MAX_WATCHES run at once, and
+failed fetches back off through a PollScheduler (honouring Retry-After),
+so a watch left running cannot hammer the match list.
+
+poll() blocks; the GUI runs it on the network loop's workers, the CLI
+calls it directly. add() and remove() may be called from any thread.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+
+from echovr.http_client import HttpStatusError
+from echovr.polling import PollScheduler, parse_retry_after
+
+# Seconds between polls while something is watched (the list refresh is
+# 30); intervals asked for below MIN_INTERVAL are raised to it
+WATCH_INTERVAL = 3.0
+MIN_INTERVAL = 1.0
+# A watch is dropped after this many seconds without a slot opening
+WATCH_TIMEOUT = 600
+MAX_WATCHES = 3
+MAX_BACKOFF = 120
+
+# WatchEvent.outcome values
+JOINED = 'joined'
+JOIN_FAILED = 'join_failed'
+GONE = 'gone'            # the server is no longer listed
+EXPIRED = 'expired'      # WATCH_TIMEOUT passed
+SUPERSEDED = 'superseded'  # another watched server was joined first
+
+WatchEvent = namedtuple('WatchEvent', 'watch outcome detail')
+
+log = logging.getLogger(__name__)
+
+
+class WatchError(Exception):
+    """A watch that cannot be added"""
+
+
+class Watch:
+    """One server being waited on"""
+    __slots__ = ('short_id', 'title', 'added', 'deadline', 'polls')
+
+    def __init__(self, short_id, title, added, deadline):
+        self.short_id = short_id
+        self.title = title
+        self.added = added
+        self.deadline = deadline
+        self.polls = 0
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class JoinWatcher:
+    """Polls the watched servers and joins the first one with a free slot"""
+    def __init__(self, core, interval=WATCH_INTERVAL, timeout=WATCH_TIMEOUT, max_watches=MAX_WATCHES,
+                 password=""):
+        self.core = core
+        self.timeout = timeout
+        self.max_watches = max_watches
+        self.password = password
+        self.scheduler = PollScheduler(max(MIN_INTERVAL, interval), max_backoff=MAX_BACKOFF)
+        # short id -> Watch, in the order they were added
+        self.watches = {}
+        self.polls = 0
+        self.unchanged = 0
+        self.last_error = None
+        # (sessions, found) of the last list decoded, reused on a 304
+        self._last = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.watches)
+
+    def watching(self, server):
+        return server.short_id in self.watches
+
+    def add(self, server, now=None):
+        """Start waiting on server; raises WatchError when MAX_WATCHES are running"""
+        now = time.time() if now is None else now
+        with self._lock:
+            watch = self.watches.get(server.short_id)
+            if watch is not None:
+                return watch
+            if len(self.watches) >= self.max_watches:
+                raise WatchError(f"Already waiting on {self.max_watches} servers")
+            watch = self.watches[server.short_id] = Watch(server.short_id, server.title, now,
+                                                          now + self.timeout)
+            return watch
+
+    def remove(self, server):
+        """Stop waiting on server; returns its Watch, or None"""
+        with self._lock:
+            return self.watches.pop(server.short_id, None)
+
+    def clear(self):
+        with self._lock:
+            self.watches.clear()
+
+    def next_interval(self):
+        return self.scheduler.next_interval()
+
+    def poll(self, now=None):
+        """Check the watched servers once; returns the WatchEvents that ended watches
+
+        At most one join is sent per poll, to the watched server added
+        first; once it is accepted every other watch ends as SUPERSEDED.
+        A failed fetch ends nothing and only lengthens the next interval.
+        """
+        now = time.time() if now is None else now
+        events = []
+        with self._lock:
+            for short_id, watch in list(self.watches.items()):
+                if now >= watch.deadline:
+                    del self.watches[short_id]
+                    events.append(WatchEvent(watch, EXPIRED, None))
+            sessions = set(self.watches)
+        if not sessions:
+            return events
+
+        self.polls += 1
+        try:
+            found = self.core.fetch_sessions(sessions, conditional=True)
+            if found is not None:
+                self._last = (sessions, found)
+            elif self._last is not None and self._last[0] == sessions:
+                self.unchanged += 1
+                found = self._last[1]
+            else:
+                # A 304 for a list decoded by someone else
+                found = self.core.fetch_sessions(sessions)
+                self._last = (sessions, found)
+        except HttpStatusError as e:
+            self.scheduler.record_failure(parse_retry_after(e.headers.get('Retry-After')))
+            self.last_error = str(e)
+            return events
+        except Exception as e:
+            # Network errors and truncated bodies; the watches keep running
+            self.scheduler.record_failure()
+            self.last_error = str(e)
+            log.info("Watch poll failed: %s", e)
+            return events
+        self.scheduler.record_success(changed=False)
+        self.last_error = None
+
+        with self._lock:
+            for short_id in sessions:
+                watch = self.watches.get(short_id)
+                if watch is None:
+                    # Removed while the list was being fetched
+                    continue
+                watch.polls += 1
+                if short_id not in found:
+                    del self.watches[short_id]
+                    events.append(WatchEvent(watch, GONE, None))
+            # First added first
+            ready = [watch for short_id, watch in self.watches.items()
+                     if short_id in found and found[short_id].joinable]
+        if not ready:
+            return events
+
+        watch = ready[0]
+        events.append(self._join(watch, found[watch.short_id]))
+        if events[-1].outcome == JOINED:
+            with self._lock:
+                events.extend(WatchEvent(other, SUPERSEDED, None) for other in self.watches.values())
+                self.watches.clear()
+        return events
+
+    def _join(self, watch, server):
+        """Send the join and end watch, whatever the answer"""
+        with self._lock:
+            self.watches.pop(watch.short_id, None)
+        try:
+            response = self.core.join_session(server.id, self.password, retry_stale=True)
+        except Exception as e:
+            return WatchEvent(watch, JOIN_FAILED, f"Cannot connect to EchoVR API: {e}")
+        if response.status_code != 200:
+            return WatchEvent(watch, JOIN_FAILED, response.text)
+        return WatchEvent(watch, JOINED, server)
+
+    def stats(self):
+        return {
+            'watching': [watch.to_dict() for watch in list(self.watches.values())],
+            'polls': self.polls,
+            'unchanged': self.unchanged,
+            'interval': self.scheduler.interval,
+            'reason': self.scheduler.reason,
+            'last_error': self.last_error,
+        }